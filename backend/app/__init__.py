@@ -6,9 +6,12 @@ from flask_cors import CORS
 from config import config_by_name, get_current_config, get_config_name, Config
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+from .utils.replica_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession}) # Routes eligible reads to SQLALCHEMY_BINDS replicas
+
+# Set by gunicorn.conf.py: create_app must not start background threads in the pre-fork master
+PREFORK_SERVER_ENV = 'STRATEGIC_BEEPER_PREFORK_SERVER'
 
 
 def create_app(config_name_override: str = None) -> Flask:
@@ -21,28 +24,31 @@ def create_app(config_name_override: str = None) -> Flask:
 
     app = Flask(__name__)
     app.config.from_object(current_config_obj)
+    from .utils.json_provider import TimingJSONProvider
+    app.json = TimingJSONProvider(app)
 
+    from .utils.db_pool import configure_engine_options, register_pool_listeners
+    configure_engine_options(app)
     db.init_app(app)
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    from .utils.replica_routing import replica_router
+    replica_router.init_app(app)
+    from .utils.credential_cache import credential_cache
+    credential_cache.init_app(app)
+    from .utils.password_hashing import password_hasher
+    password_hasher.init_app(app)
+    from .utils.rate_limit import login_rate_limiter
+    login_rate_limiter.init_app(app)
+    from .services.catalog_cache import catalog_cache
+    catalog_cache.init_app(app)
+    from .services.activation_jobs import activation_job_runner
+    activation_job_runner.init_app(app)
+    from .services.ops_events import ops_events
+    ops_events.init_app(app)
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=["X-Total-Count"]) # Readable by browser clients of count_only/HEAD
 
     if not app.debug and not app.testing:
-        if not os.path.exists('logs'):
-            try:
-                os.mkdir('logs')
-            except OSError as e:
-                app.logger.error(f"Could not create logs directory: {e}")
-
-        log_file_path = 'logs/strategic_beeper.log'
-        try:
-            file_handler = RotatingFileHandler(log_file_path, maxBytes=10240, backupCount=10)
-            file_handler.setFormatter(logging.Formatter(
-                '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-            ))
-            file_handler.setLevel(logging.INFO)
-            app.logger.addHandler(file_handler)
-        except Exception as e:
-            app.logger.error(f"Could not set up file logging to {log_file_path}: {e}. Logging to stdout.")
-
+        from .utils.log_pipeline import log_pipeline
+        log_pipeline.init_app(app)
         app.logger.setLevel(logging.INFO)
         app.logger.info(f'Strategic Beeper backend starting in {effective_config_name} mode')
     else:
@@ -57,25 +63,64 @@ def create_app(config_name_override: str = None) -> Flask:
     app.register_blueprint(shop_bp)
     app.register_blueprint(ops_bp)
 
+    from .utils.metrics import request_metrics
+    with app.app_context():
+        request_metrics.init_app(app, db.engines.values()) # Primary and any read replicas
+    # Registered after metrics so its after_request runs first (Flask runs them in reverse): metrics see wire sizes
+    from .utils.compression import response_compressor
+    response_compressor.init_app(app)
+
+    from .migrations import register_cli, run_migrations
+    register_cli(app)
+
     with app.app_context():
         from . import models
+        for engine in db.engines.values(): # Primary and any read replicas
+            register_pool_listeners(engine)
         try:
             inspector = db.inspect(db.engine)
-            if not inspector.has_table(models.User.__tablename__):
-                app.logger.info("Database tables not found or schema is incomplete. Attempting to create all tables...")
-                db.create_all()
-                app.logger.info("Database tables created/verified.")
-                seed_initial_data(app)
-            else:
-                app.logger.info("Database tables appear to exist. Skipping create_all.")
+            is_fresh_database = not inspector.has_table(models.User.__tablename__)
+            if app.config['DB_AUTO_MIGRATE']:
+                applied = run_migrations(db.engine, app.logger,
+                                         use_advisory_lock=not app.config['DB_PGBOUNCER_TRANSACTION_MODE'])
+                app.logger.info(f"Database schema up to date ({applied} migration(s) applied).")
+                if is_fresh_database:
+                    seed_initial_data(app)
+            elif is_fresh_database:
+                app.logger.warning("Database tables not found and DB_AUTO_MIGRATE is off. Run 'flask db-upgrade'.")
+            # Keeps upcoming months of a partitioned sold_beepers created; `flask db-partitions` does the same from cron
+            from .services.partitioning import ensure_sold_beeper_partitions
+            ensure_sold_beeper_partitions(db.engine, app.config['DB_PARTITION_MONTHS_AHEAD'], app.logger)
         except Exception as e:
-            app.logger.error(f"CRITICAL: Error during database table check/creation: {str(e)}")
+            app.logger.error(f"CRITICAL: Error during database migration: {str(e)}")
             app.logger.error(
                 "Please ensure your database server is running, accessible, and credentials in .env are correct.")
             app.logger.error(f"Attempted Database URI was: {app.config.get('SQLALCHEMY_DATABASE_URI', 'Not Set')}")
+
+    # Pre-fork servers (gunicorn.conf.py) start background threads in each worker after fork instead.
+    # With the debug reloader, only the serving child process (WERKZEUG_RUN_MAIN) runs them.
+    if os.environ.get(PREFORK_SERVER_ENV) != '1' and (not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        start_background_services(app)
     return app
 
 
+def start_background_services(app: Flask) -> None:
+    """
+    Starts this process's background threads (log listener, ops event listener, activation job
+    workers) and the password hashing processes. Threads do not survive fork(), so pre-fork
+    servers call this from their post-fork hook.
+    """
+    from .services.activation_jobs import activation_job_runner
+    from .utils.log_pipeline import log_pipeline
+    from .utils.password_hashing import password_hasher
+    from .services.ops_events import ops_events
+    password_hasher.start() # Enables this process's hashing pool; its processes start on first use
+    log_pipeline.start() # No-op unless init_app configured it and this is a new process
+    ops_events.start()
+    if app.config['ACTIVATION_JOB_AUTOSTART']:
+        activation_job_runner.start()
+
+
 def seed_initial_data(app_instance: Flask) -> None:
     """
     Seeds initial data (Default Operator, BeeperModels) if the database is empty.
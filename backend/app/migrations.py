@@ -0,0 +1,243 @@
+# backend/app/migrations.py
+# -*- coding: utf-8 -*-
+"""
+Minimal versioned schema migrations.
+
+Applied versions are recorded in the `schema_migrations` table. Each migration runs once, in
+order, inside its own transaction, unless it is marked non-transactional. That is needed on
+PostgreSQL for CREATE INDEX CONCURRENTLY, which cannot run inside a transaction block.
+To add a schema change, append a Migration with the next version number. Never edit one that
+has already shipped.
+"""
+import datetime
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Set
+
+import click
+from flask import Flask
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from . import db
+from .models import SoldBeeperArchive, SoldBeeperStat
+from .services.archival import archive_activated_units
+from .services.partitioning import (convert_sold_beepers_to_partitioned, ensure_partition_id_indexes,
+                                    ensure_sold_beeper_partitions)
+from .services.sold_beeper_stats import rebuild_stats
+
+# Arbitrary constant used as the PostgreSQL advisory lock key, so only one worker migrates at a time
+MIGRATION_LOCK_KEY = 721_500_418
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+    transactional: bool = True
+
+
+def _create_baseline_schema(conn: Connection) -> None:
+    # create_all skips existing tables, so this both bootstraps fresh databases and adopts
+    # databases created by the old create_all-on-startup logic.
+    db.metadata.create_all(conn)
+
+
+def _index_ddl(conn: Connection, name: str, table_and_columns: str) -> str:
+    concurrently = 'CONCURRENTLY ' if conn.dialect.name == 'postgresql' else ''
+    return f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table_and_columns}"
+
+
+def _add_hot_column_indexes(conn: Connection) -> None:
+    for name, table_and_columns in (
+        ('ix_sold_beepers_status_purchase_ts', 'sold_beepers (status, purchase_timestamp DESC)'),
+        ('ix_sold_beepers_user_purchase_ts', 'sold_beepers (user_id, purchase_timestamp)'),
+        ('ix_sold_beepers_model_purchase_ts', 'sold_beepers (model_id, purchase_timestamp)'),
+        ('ix_sold_beepers_purchase_ts_id', 'sold_beepers (purchase_timestamp, id)'),
+        ('ix_cart_items_user_added_at', 'cart_items (user_id, added_at)'),
+    ):
+        conn.execute(text(_index_ddl(conn, name, table_and_columns)))
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text("ANALYZE sold_beepers"))
+        conn.execute(text("ANALYZE cart_items"))
+
+
+def _add_sold_beeper_stats(conn: Connection) -> None:
+    # Fresh databases already got the table from the baseline create_all; backfill is a no-op there
+    SoldBeeperStat.__table__.create(conn, checkfirst=True)
+    rebuild_stats(conn)
+
+
+
+def _sold_beeper_ids_to_uuid(conn: Connection) -> None:
+    # Databases created before GUID stored ids as VARCHAR(36) text; fresh ones already have the new type
+    if conn.dialect.name == 'postgresql':
+        data_type = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'sold_beepers' AND column_name = 'id'"
+        )).scalar()
+        if data_type != 'uuid':
+            # Rewrites the table and its indexes under an exclusive lock: run in a maintenance window on big tables
+            conn.execute(text("ALTER TABLE sold_beepers ALTER COLUMN id TYPE uuid USING id::uuid"))
+            conn.execute(text("ANALYZE sold_beepers"))
+        return
+    # SQLite cannot change a column's type, but a BLOB stored in a TEXT-affinity column is kept as-is,
+    # so converting the values is enough for the GUID type to read and match them
+    conn.connection.driver_connection.create_function(
+        'uuid_text_to_blob', 1, lambda value: uuid.UUID(value).bytes, deterministic=True
+    )
+    conn.execute(text("UPDATE sold_beepers SET id = uuid_text_to_blob(id) WHERE typeof(id) = 'text'"))
+
+
+
+def _partition_sold_beepers(conn: Connection) -> None:
+    # PostgreSQL only; elsewhere sold_beepers stays a plain table. The primary key becomes
+    # (id, purchase_timestamp), so id is unique per partition only (migration 7, partitioning.py)
+    convert_sold_beepers_to_partitioned(conn, months_ahead=3)
+
+
+def _add_sold_beepers_archive(conn: Connection) -> None:
+    SoldBeeperArchive.__table__.create(conn, checkfirst=True)
+
+
+def _add_partition_id_indexes(conn: Connection) -> None:
+    # Migration 5 left id unique only together with purchase_timestamp (the partitioned primary key);
+    # routes and activation look units up by id alone. Unique per partition, not across them.
+    ensure_partition_id_indexes(conn)
+
+
+def _shard_sold_beeper_stats(conn: Connection) -> None:
+    # Adds `shard` to the rollup's primary key; fresh databases got it from the baseline create_all
+    if 'shard' in {column['name'] for column in inspect(conn).get_columns('sold_beeper_stats')}:
+        return
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text("ALTER TABLE sold_beeper_stats ADD COLUMN shard smallint NOT NULL DEFAULT 0"))
+        conn.execute(text("ALTER TABLE sold_beeper_stats DROP CONSTRAINT sold_beeper_stats_pkey"))
+        conn.execute(text("ALTER TABLE sold_beeper_stats ADD PRIMARY KEY (model_id, status, purchase_hour, shard)"))
+        return
+    # SQLite cannot change a primary key; the rollup is derived data, so recreate and refill it
+    SoldBeeperStat.__table__.drop(conn)
+    SoldBeeperStat.__table__.create(conn)
+    rebuild_stats(conn)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'Baseline schema', _create_baseline_schema),
+    Migration(2, 'Indexes on sold_beepers/cart_items hot columns', _add_hot_column_indexes, transactional=False),
+    Migration(3, 'sold_beeper_stats rollup table, backfilled from sold_beepers', _add_sold_beeper_stats),
+    Migration(4, 'sold_beepers.id as native uuid (PostgreSQL) or 16-byte blob', _sold_beeper_ids_to_uuid),
+    Migration(5, 'Partition sold_beepers by month of purchase_timestamp (PostgreSQL)', _partition_sold_beepers),
+    Migration(6, 'sold_beepers_archive table', _add_sold_beepers_archive),
+    Migration(7, 'Unique index on id in each sold_beepers partition (PostgreSQL)', _add_partition_id_indexes,
+              transactional=False),
+    Migration(8, 'sold_beeper_stats counters split over shard rows', _shard_sold_beeper_stats),
+]
+
+
+def _ensure_migrations_table(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description VARCHAR(255) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def applied_versions(engine: Engine) -> Set[int]:
+    _ensure_migrations_table(engine)
+    with engine.connect() as conn:
+        return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+        {'v': migration.version, 'd': migration.description, 't': datetime.datetime.now(datetime.timezone.utc)}
+    )
+
+
+def run_migrations(engine: Engine, logger: logging.Logger, use_advisory_lock: bool = True) -> int:
+    """
+    Applies all pending migrations in version order. Returns how many were applied.
+    Behind PgBouncer transaction pooling a session-level advisory lock is not held reliably, so callers
+    pass use_advisory_lock=False and must ensure only one process migrates (e.g. `flask db-upgrade`).
+    """
+    _ensure_migrations_table(engine)
+    take_lock = engine.dialect.name == 'postgresql' and use_advisory_lock
+    if not use_advisory_lock:
+        logger.warning("Running schema migrations without the advisory lock (PgBouncer transaction mode).")
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as lock_conn:
+        if take_lock:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:k)"), {'k': MIGRATION_LOCK_KEY})
+        try:
+            done = applied_versions(engine) # Re-read under the lock: another worker may have just migrated
+            applied = 0
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                if migration.version in done:
+                    continue
+                logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+                if migration.transactional:
+                    with engine.begin() as conn:
+                        migration.upgrade(conn)
+                        _record(conn, migration)
+                else:
+                    # Statements must be idempotent: a failure part-way leaves earlier ones applied
+                    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                        migration.upgrade(conn)
+                        _record(conn, migration)
+                applied += 1
+            return applied
+        finally:
+            if take_lock:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {'k': MIGRATION_LOCK_KEY})
+
+
+def register_cli(app: Flask) -> None:
+    """Adds `flask db-upgrade`, `db-status`, `db-partitions`, `archive-sold-beepers` and `stats-rebuild` commands."""
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade_command() -> None:
+        """Apply pending schema migrations."""
+        applied = run_migrations(db.engine, app.logger,
+                                 use_advisory_lock=not app.config['DB_PGBOUNCER_TRANSACTION_MODE'])
+        click.echo(f"Applied {applied} migration(s).")
+
+    @app.cli.command('db-status')
+    def db_status_command() -> None:
+        """List schema migrations and whether each has been applied."""
+        done = applied_versions(db.engine)
+        for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+            state = 'applied' if migration.version in done else 'pending'
+            click.echo(f"{migration.version:>4}  {state:<8} {migration.description}")
+
+    @app.cli.command('stats-rebuild')
+    def stats_rebuild_command() -> None:
+        """Recompute the sold_beeper_stats rollup from sold_beepers."""
+        with db.engine.begin() as conn:
+            rebuild_stats(conn)
+        click.echo("Rebuilt sold_beeper_stats.")
+
+    @app.cli.command('db-partitions')
+    @click.option('--months-ahead', type=int, default=None, help='Defaults to DB_PARTITION_MONTHS_AHEAD.')
+    def db_partitions_command(months_ahead: Optional[int]) -> None:
+        """Create upcoming monthly partitions of sold_beepers (PostgreSQL; run e.g. daily from cron)."""
+        ahead = months_ahead if months_ahead is not None else app.config['DB_PARTITION_MONTHS_AHEAD']
+        created = ensure_sold_beeper_partitions(db.engine, ahead, app.logger)
+        click.echo(f"Created {len(created)} partition(s).")
+
+    @app.cli.command('archive-sold-beepers')
+    @click.option('--older-than-days', type=int, default=None,
+                  help='Archive units purchased more than this many days ago. Defaults to ARCHIVE_MIN_AGE_DAYS.')
+    @click.option('--to-file', 'path', default=None,
+                  help='Append to this NDJSON file (.gz to compress) instead of the sold_beepers_archive table.')
+    @click.option('--batch-size', type=int, default=None, help='Units per transaction. Defaults to ARCHIVE_BATCH_SIZE.')
+    def archive_sold_beepers_command(older_than_days: Optional[int], path: Optional[str],
+                                     batch_size: Optional[int]) -> None:
+        """Move old, activated units out of sold_beepers."""
+        days = older_than_days if older_than_days is not None else app.config['ARCHIVE_MIN_AGE_DAYS']
+        before = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - datetime.timedelta(days=days)
+        moved = archive_activated_units(before, batch_size or app.config['ARCHIVE_BATCH_SIZE'], path=path,
+                                        progress=lambda count: click.echo(f"  {count} archived...", err=True))
+        click.echo(f"Archived {moved} activated unit(s) purchased before {before.isoformat()}"
+                   f" to {path or 'sold_beepers_archive'}.")
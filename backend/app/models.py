@@ -1,11 +1,11 @@
 # backend/app/models.py
 # -*- coding: utf-8 -*-
 from . import db # Import db from the app package's __init__.py
-from werkzeug.security import generate_password_hash, check_password_hash
 import datetime
-import uuid
 from typing import Dict, Any, Optional, List # For type hinting
 from sqlalchemy.orm import Mapped, mapped_column, relationship # Import Mapped and relationship
+from .utils.password_hashing import password_hasher
+from .utils.guid import GUID, uuid7
 
 # Note: For SQLAlchemy 2.0 style, db.Column is often replaced by mapped_column,
 # and type hints become the primary way to define column types.
@@ -39,7 +39,7 @@ class BeeperModel(db.Model):
 class SoldBeeper(db.Model):
     """Model for individual beeper units that have been 'sold'."""
     __tablename__ = 'sold_beepers'
-    id: Mapped[str] = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = db.Column(GUID(), primary_key=True, default=lambda: str(uuid7())) # Time-ordered: inserts append to the PK index
     model_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey('beeper_models.id'), nullable=False)
     purchase_timestamp: Mapped[datetime.datetime] = db.Column(db.DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
     status: Mapped[str] = db.Column(db.String(20), nullable=False, default='active')
@@ -50,6 +50,15 @@ class SoldBeeper(db.Model):
     # Relationship to User (Many-to-One)
     purchasing_user: Mapped["User"] = relationship(back_populates='sold_beepers')
 
+    # Hot-path indexes for the ops listing filters and (purchase_timestamp, id) keyset ordering.
+    # Existing databases receive these through app/migrations.py.
+    __table_args__ = (
+        db.Index('ix_sold_beepers_status_purchase_ts', 'status', db.text('purchase_timestamp DESC')),
+        db.Index('ix_sold_beepers_user_purchase_ts', 'user_id', 'purchase_timestamp'),
+        db.Index('ix_sold_beepers_model_purchase_ts', 'model_id', 'purchase_timestamp'),
+        db.Index('ix_sold_beepers_purchase_ts_id', 'purchase_timestamp', 'id'),
+    )
+
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -61,6 +70,16 @@ class SoldBeeper(db.Model):
             'user_id': self.user_id
         }
 
+class SoldBeeperArchive(db.Model):
+    """Activated units moved out of sold_beepers by `flask archive-sold-beepers` (see services/archival.py)."""
+    __tablename__ = 'sold_beepers_archive'
+    id: Mapped[str] = db.Column(GUID(), primary_key=True)
+    model_id: Mapped[int] = db.Column(db.Integer, nullable=False)
+    purchase_timestamp: Mapped[datetime.datetime] = db.Column(db.DateTime, nullable=False)
+    status: Mapped[str] = db.Column(db.String(20), nullable=False)
+    user_id: Mapped[int] = db.Column(db.Integer, nullable=False)
+    archived_at: Mapped[datetime.datetime] = db.Column(db.DateTime, nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
 class User(db.Model):
     """Model for registered shop users."""
     __tablename__ = 'users'
@@ -75,10 +94,10 @@ class User(db.Model):
     cart_items: Mapped[List["CartItem"]] = relationship(back_populates='user_cart_owner', lazy='dynamic', cascade="all, delete-orphan")
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        self.password_hash = password_hasher.hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify_password(self.password_hash, password)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -98,10 +117,10 @@ class Operator(db.Model):
     favorites: Mapped[List["OperatorFavorite"]] = relationship(back_populates='operator_info', lazy='dynamic', cascade="all, delete-orphan")
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        self.password_hash = password_hasher.hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify_password(self.password_hash, password)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -123,7 +142,11 @@ class CartItem(db.Model):
     model_info: Mapped["BeeperModel"] = relationship(back_populates='cart_items_ref')
 
 
-    __table_args__ = (db.UniqueConstraint('user_id', 'model_id', name='_user_model_cart_uc'),)
+    # The unique constraint's index already serves user_id lookups; the second index serves the ordered cart listing
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'model_id', name='_user_model_cart_uc'),
+        db.Index('ix_cart_items_user_added_at', 'user_id', 'added_at'),
+    )
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -148,3 +171,70 @@ class OperatorFavorite(db.Model):
 
     __table_args__ = (db.UniqueConstraint('operator_id', 'model_id', name='_operator_model_favorite_uc'),)
 
+
+class SoldBeeperStat(db.Model):
+    """
+    Rollup of sold_beepers: unit counts per model, status and purchase hour (UTC), split over a few
+    `shard` rows per key that readers sum. Kept current by the purchase and activation paths in the
+    same transaction; see services/sold_beeper_stats.py.
+    """
+    __tablename__ = 'sold_beeper_stats'
+    model_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey('beeper_models.id'), primary_key=True)
+    status: Mapped[str] = db.Column(db.String(20), primary_key=True)
+    purchase_hour: Mapped[datetime.datetime] = db.Column(db.DateTime, primary_key=True)
+    shard: Mapped[int] = db.Column(db.SmallInteger, primary_key=True, default=0, server_default='0')
+    unit_count: Mapped[int] = db.Column(db.BigInteger, nullable=False, default=0)
+
+    # Serves the purchases-per-hour/day series, which ranges over purchase_hour across all models
+    __table_args__ = (db.Index('ix_sold_beeper_stats_purchase_hour', 'purchase_hour'),)
+
+
+class ActivationJob(db.Model):
+    """
+    Background activation job submitted by an operator. The table doubles as the job queue:
+    workers claim rows, process them in batches and commit progress with every batch.
+    """
+    __tablename__ = 'activation_jobs'
+    id: Mapped[int] = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    operator_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey('operators.id'), nullable=False)
+    status: Mapped[str] = db.Column(db.String(20), nullable=False, default='queued', index=True) # queued, running, completed, failed
+    mode: Mapped[str] = db.Column(db.String(10), nullable=False) # 'ids' or 'filter'
+    beeper_ids: Mapped[Optional[List[str]]] = db.Column(db.JSON, nullable=True) # De-duplicated IDs ('ids' mode)
+    filters: Mapped[Optional[Dict[str, Any]]] = db.Column(db.JSON, nullable=True) # status/model_id/user_id ('filter' mode)
+    id_cursor: Mapped[int] = db.Column(db.Integer, nullable=False, default=0) # Next offset into beeper_ids
+    total_count: Mapped[Optional[int]] = db.Column(db.Integer, nullable=True) # Estimated at submit time for 'filter' mode
+    processed_count: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    activated_count: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    error_count: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    batches_completed: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    batch_errors: Mapped[List[Dict[str, Any]]] = db.Column(db.JSON, nullable=False, default=list) # Most recent batches with issues
+    failed_attempts: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = db.Column(db.Text, nullable=True)
+    worker_id: Mapped[Optional[str]] = db.Column(db.String(100), nullable=True)
+    created_at: Mapped[datetime.datetime] = db.Column(db.DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    started_at: Mapped[Optional[datetime.datetime]] = db.Column(db.DateTime, nullable=True)
+    heartbeat_at: Mapped[Optional[datetime.datetime]] = db.Column(db.DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime.datetime]] = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed_until = self.finished_at or self.heartbeat_at
+        elapsed_seconds = (elapsed_until - self.started_at).total_seconds() if self.started_at and elapsed_until else None
+        return {
+            'id': self.id,
+            'operator_id': self.operator_id,
+            'status': self.status,
+            'mode': self.mode,
+            'filters': self.filters,
+            'total_count': self.total_count,
+            'processed_count': self.processed_count,
+            'activated_count': self.activated_count,
+            'error_count': self.error_count,
+            'batches_completed': self.batches_completed,
+            'progress': round(min(self.processed_count / self.total_count, 1.0), 4) if self.total_count else None,
+            'throughput_per_second': round(self.processed_count / elapsed_seconds, 2) if elapsed_seconds else None,
+            'batch_errors': self.batch_errors,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -4,6 +4,8 @@ from flask import Blueprint, request, jsonify, current_app
 from ..models import User, Operator # Import User and Operator models
 from .. import db # Import the db instance from app package
 from ..utils.auth_helpers import check_user_credentials, check_operator_credentials # Simplified credential checkers
+from ..utils.credential_cache import USER_KIND, OPERATOR_KIND
+from ..utils.tokens import issue_tokens, verify_refresh_token, password_fingerprint
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -26,9 +28,9 @@ def register_user_route():
         current_app.logger.info(f"Registration attempt failed: Username '{username}' or email '{email}' already exists.")
         return jsonify({"error": "Username or email already exists."}), 409 # Conflict
 
+    new_user = User(username=username, email=email)
+    new_user.set_password(password) # Hashed by the password hasher; raises PasswordHasherBusy (503) when saturated
     try:
-        new_user = User(username=username, email=email)
-        new_user.set_password(password) # Password is hashed here
         db.session.add(new_user)
         db.session.commit()
         current_app.logger.info(f"New user registered: {username}")
@@ -56,12 +58,13 @@ def login_user_route():
 
     if user:
         current_app.logger.info(f"User '{user.username}' logged in successfully.")
-        # For this simplified auth, frontend will store credentials if needed for subsequent Basic Auth.
-        # Backend just confirms success and returns user info.
+        # Subsequent requests send the access token as 'Authorization: Bearer <token>'
+        # (Basic Auth is still accepted for older clients).
         return jsonify({
             "message": "משתמש התחבר בהצלחה.",
             "user": user.to_dict(), # Contains id, username, email
-            "role": "user"
+            "role": "user",
+            **issue_tokens(USER_KIND, user)
         }), 200
     else:
         current_app.logger.warning(f"Failed user login attempt for: {identifier}")
@@ -88,8 +91,34 @@ def login_operator_route():
         return jsonify({
             "message": "מפעיל התחבר בהצלחה.",
             "operator": operator.to_dict(), # Contains id, username
-            "role": "operator"
+            "role": "operator",
+            **issue_tokens(OPERATOR_KIND, operator)
         }), 200
     else:
         current_app.logger.warning(f"Failed operator login attempt for username: {username}")
         return jsonify({"error": "Invalid operator credentials."}), 401
+
+# --- Token Refresh ---
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh_tokens_route():
+    """Exchanges a valid refresh token for a new access/refresh token pair. Expects 'refresh_token' in JSON body."""
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Request body must be JSON."}), 400
+
+    refresh_token = data.get('refresh_token')
+    if not refresh_token or not isinstance(refresh_token, str):
+        return jsonify({"error": "refresh_token is required."}), 400
+
+    claims = verify_refresh_token(refresh_token)
+    if claims is None:
+        return jsonify({"error": "Invalid or expired refresh token."}), 401
+
+    model = User if claims['role'] == USER_KIND else Operator
+    principal = db.session.get(model, claims['sub'])
+    # A password change alters the fingerprint, revoking refresh tokens issued before it
+    if principal is None or claims.get('pwf') != password_fingerprint(principal.password_hash):
+        current_app.logger.warning(f"Rejected refresh token for {claims['role']} id {claims['sub']}.")
+        return jsonify({"error": "Invalid or expired refresh token."}), 401
+
+    return jsonify({"role": claims['role'], **issue_tokens(claims['role'], principal)}), 200
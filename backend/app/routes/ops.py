@@ -1,9 +1,24 @@
 # backend/app/routes/ops.py
 # -*- coding: utf-8 -*-
-from flask import Blueprint, request, jsonify, current_app
-from ..models import SoldBeeper, BeeperModel, Operator, OperatorFavorite
+import datetime
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context, url_for
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.orm import defer
+from ..models import SoldBeeper, BeeperModel, Operator, OperatorFavorite, ActivationJob
 from .. import db
-from ..utils.auth_helpers import operator_basic_auth_required # Using Basic Auth for operator
+from ..utils.pagination import parse_limit, encode_cursor, decode_cursor, count_requested, count_response
+from ..utils.guid import normalize_guid
+from ..utils.row_serializers import SOLD_BEEPER_ROW, parse_fields
+from ..utils.streaming import iter_json_array, iter_csv, iter_ndjson
+from ..utils.compression import iter_compressed
+from ..utils.sold_beeper_filters import parse_sold_beeper_filters, apply_sold_beeper_filters, parse_utc_datetime
+from ..services.activation import activate_beepers_by_ids
+from ..services.activation_jobs import submit_activation_job, activation_job_runner
+from ..services.ops_events import ops_events
+from ..services.sold_beeper_stats import hour_bucket, query_stats
+from ..utils.auth_helpers import operator_basic_auth_required, allow_query_token # Using Basic Auth for operator
+from ..utils.credential_cache import credential_cache
+from ..utils.db_pool import pool_metrics
 
 ops_bp = Blueprint('ops', __name__, url_prefix='/api/ops')
 
@@ -12,36 +27,103 @@ ops_bp = Blueprint('ops', __name__, url_prefix='/api/ops')
 @ops_bp.route('/beepers', methods=['GET'])
 @operator_basic_auth_required # Operator must be logged in (sends Basic Auth header)
 def get_sold_beepers_route(current_operator_obj: Operator): # Decorator injects current_operator_obj
-    """Returns all sold beepers, with optional filtering."""
-    try:
-        query = db.session.query(SoldBeeper, BeeperModel.name.label("model_name"))\
-            .join(BeeperModel, SoldBeeper.model_id == BeeperModel.id)
+    """
+    Returns sold beepers, newest first, with optional filtering (status, model_id, user_id and a
+    purchase_timestamp range via since/until, which keeps recent-data queries to recent partitions).
 
+    Pagination (keyset on purchase_timestamp, id): pass `limit` and/or `after` (the
+    `next_cursor` of the previous page) to get {"items", "next_cursor", "limit"}.
+    Without them the full list is returned as a plain JSON array, as before.
+    `stream=true` streams the JSON array from a server-side cursor instead of building it in memory.
+    `fields=id,status` selects and returns only those keys (any of SOLD_BEEPER_ROW.keys).
+    `count_only=true` or a HEAD request returns just the number of matching units ({"total_count"} /
+    X-Total-Count); limit and after do not apply to it.
+    """
+    try:
         # Filtering options
-        status_filter = request.args.get('status')
-        model_id_filter = request.args.get('model_id')
-        user_id_filter = request.args.get('user_id') # Filter by purchasing user ID
+        filters, filter_error = parse_sold_beeper_filters(request.args)
+        if filter_error:
+            return jsonify({"error": filter_error}), 400
 
-        if status_filter:
-            query = query.filter(SoldBeeper.status == status_filter)
-        if model_id_filter:
+        if count_requested():
+            # sold_beepers alone: the model join never drops a row, and the filter indexes cover the COUNT
+            total = db.session.scalar(apply_sold_beeper_filters(select(func.count()).select_from(SoldBeeper), filters))
+            current_app.logger.info(f"Operator {current_operator_obj.username} counted {total} sold beepers.")
+            return count_response(total)
+
+        try:
+            fields = parse_fields(request.args.get('fields'), SOLD_BEEPER_ROW.keys)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        serializer = SOLD_BEEPER_ROW.project(fields) if fields is not None else SOLD_BEEPER_ROW
+
+        limit_arg = request.args.get('limit')
+        after_arg = request.args.get('after')
+        stream_requested = request.args.get('stream', '').lower() in ('1', 'true')
+        paginated = limit_arg is not None or after_arg is not None
+
+        # Plain columns instead of entities: rows become dicts without ORM objects or identity map entries
+        columns = serializer.columns
+        if paginated: # The cursor needs both keyset columns even when they are not returned
+            keyset_columns = {'purchase_timestamp': SoldBeeper.purchase_timestamp, 'id': SoldBeeper.id}
+            columns += tuple(column for key, column in keyset_columns.items() if key not in serializer.keys)
+        statement = select(*columns).select_from(SoldBeeper)
+        if 'model_name' in serializer.keys:
+            statement = statement.join(SoldBeeper.model_info)
+        statement = apply_sold_beeper_filters(statement, filters)
+
+        if after_arg:
             try:
-                query = query.filter(SoldBeeper.model_id == int(model_id_filter))
+                after_timestamp, after_id = decode_cursor(after_arg)
             except ValueError:
-                return jsonify({"error": "Invalid model_id format for filtering."}), 400
-        if user_id_filter:
+                return jsonify({"error": "Invalid 'after' cursor."}), 400
+            if normalize_guid(after_id) is None:
+                return jsonify({"error": "Invalid 'after' cursor."}), 400
+            # Row-value comparison lets the (purchase_timestamp, id) ordering be served by an index range scan
+            statement = statement.where(tuple_(SoldBeeper.purchase_timestamp, SoldBeeper.id) < tuple_(after_timestamp, literal(after_id, SoldBeeper.id.type)))
+            # Plain bound as well: partition pruning does not look inside row-value comparisons
+            statement = statement.where(SoldBeeper.purchase_timestamp <= after_timestamp)
+
+        statement = statement.order_by(SoldBeeper.purchase_timestamp.desc(), SoldBeeper.id.desc())
+
+        limit = None
+        if paginated:
             try:
-                query = query.filter(SoldBeeper.user_id == int(user_id_filter))
+                limit = parse_limit(limit_arg, current_app.config['OPS_BEEPERS_PAGE_DEFAULT_LIMIT'],
+                                    current_app.config['OPS_BEEPERS_PAGE_MAX_LIMIT'])
             except ValueError:
-                return jsonify({"error": "Invalid user_id format for filtering."}), 400
-        
-        sold_beepers_with_model_name = query.order_by(SoldBeeper.purchase_timestamp.desc()).all()
+                return jsonify({"error": "Invalid 'limit'. Must be a positive integer."}), 400
+
+        if stream_requested:
+            if limit is not None:
+                statement = statement.limit(limit)
+            batch_size = current_app.config['OPS_BEEPERS_STREAM_BATCH_SIZE']
+
+            def generate_rows():
+                # Runs lazily inside the streamed response's re-pushed context, so the query is executed
+                # on a live session. yield_per switches to a server-side cursor (psycopg2 named cursor).
+                rows = db.session.execute(statement.execution_options(yield_per=batch_size))
+                yield from serializer.to_dicts(rows)
+
+            current_app.logger.info(f"Operator {current_operator_obj.username} streaming sold beepers list.")
+            return Response(
+                stream_with_context(iter_json_array(generate_rows(), batch_size=batch_size)),
+                mimetype='application/json'
+            )
+
+        if paginated:
+            page_rows = db.session.execute(statement.limit(limit + 1)).all() # One extra row tells us whether another page exists
+            has_more = len(page_rows) > limit
+            page_rows = page_rows[:limit]
+            items = list(serializer.to_dicts(page_rows))
+            next_cursor = None
+            if has_more:
+                last_row = page_rows[-1]
+                next_cursor = encode_cursor(last_row.purchase_timestamp, last_row.id)
+            current_app.logger.info(f"Operator {current_operator_obj.username} fetched a page of {len(items)} sold beepers.")
+            return jsonify({"items": items, "next_cursor": next_cursor, "limit": limit})
 
-        result = []
-        for beeper, model_name_str in sold_beepers_with_model_name:
-            beeper_dict = beeper.to_dict()
-            beeper_dict['model_name'] = model_name_str
-            result.append(beeper_dict)
+        result = list(serializer.to_dicts(db.session.execute(statement)))
         
         current_app.logger.info(f"Operator {current_operator_obj.username} fetched sold beepers list.")
         return jsonify(result)
@@ -49,10 +131,100 @@ def get_sold_beepers_route(current_operator_obj: Operator): # Decorator injects
         current_app.logger.error(f"Error fetching sold beepers for operator {current_operator_obj.username}: {str(e)}")
         return jsonify({"error": "Internal server error fetching sold beepers."}), 500
 
+EXPORT_COLUMNS = ('id', 'model_id', 'model_name', 'user_id', 'status', 'purchase_timestamp')
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+@ops_bp.route('/beepers/export', methods=['GET'])
+@operator_basic_auth_required
+def export_sold_beepers_route(current_operator_obj: Operator):
+    """
+    Downloads sold beepers, newest first, as `format=csv` (default) or `format=ndjson`, with the same
+    `status`/`model_id`/`user_id` filters as GET /beepers. Rows are read from a server-side cursor and
+    encoded batch by batch, so memory use does not grow with the export. `gzip=1` sends a .gz file
+    compressed on the fly.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({"error": "Invalid 'format'. Must be 'csv' or 'ndjson'."}), 400
+    filters, filter_error = parse_sold_beeper_filters(request.args)
+    if filter_error:
+        return jsonify({"error": filter_error}), 400
+    gzip_requested = request.args.get('gzip', '').lower() in ('1', 'true')
+
+    # Plain columns instead of entities: no ORM objects or identity map entries per row
+    statement = select(SoldBeeper.id, SoldBeeper.model_id, BeeperModel.name, SoldBeeper.user_id,
+                       SoldBeeper.status, SoldBeeper.purchase_timestamp)\
+        .join(SoldBeeper.model_info)
+    statement = apply_sold_beeper_filters(statement, filters)\
+        .order_by(SoldBeeper.purchase_timestamp.desc(), SoldBeeper.id.desc())
+    batch_size = current_app.config['OPS_BEEPERS_STREAM_BATCH_SIZE']
+
+    def generate_rows():
+        # Executed lazily inside the streamed response, like GET /beepers?stream=true
+        rows = db.session.execute(statement.execution_options(yield_per=batch_size))
+        for beeper_id, model_id, model_name, user_id, status, purchase_timestamp in rows:
+            yield (beeper_id, model_id, model_name, user_id, status,
+                   purchase_timestamp.isoformat() if purchase_timestamp else None)
+
+    if export_format == 'csv':
+        body = iter_csv(EXPORT_COLUMNS, generate_rows(), batch_size=batch_size)
+    else:
+        body = iter_ndjson((dict(zip(EXPORT_COLUMNS, row)) for row in generate_rows()), batch_size=batch_size)
+
+    filename = f"sold_beepers_{datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.{export_format}"
+    mimetype = EXPORT_MIMETYPES[export_format]
+    if gzip_requested:
+        body = iter_compressed(body, 'gzip', current_app.config['OPS_BEEPERS_EXPORT_GZIP_LEVEL'])
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    current_app.logger.info(f"Operator {current_operator_obj.username} exporting sold beepers as {export_format}"
+                            f"{' (gzip)' if gzip_requested else ''}.")
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no' # Let the first bytes through reverse proxies right away
+    return response
+
+@ops_bp.route('/stats', methods=['GET'])
+@operator_basic_auth_required
+def get_ops_stats_route(current_operator_obj: Operator):
+    """
+    Unit counts by model and status, and units purchased per `granularity` (day, default, or hour)
+    between `since` and `until` (ISO 8601, UTC). Served from the sold_beeper_stats rollup, so the
+    cost depends on the number of models and hours, not on the number of units sold.
+    """
+    granularity = request.args.get('granularity', 'day').lower()
+    if granularity not in ('day', 'hour'):
+        return jsonify({"error": "Invalid 'granularity'. Must be 'day' or 'hour'."}), 400
+    try:
+        model_id = int(request.args['model_id']) if request.args.get('model_id') else None
+    except ValueError:
+        return jsonify({"error": "Invalid model_id format for filtering."}), 400
+    try:
+        until = parse_utc_datetime(request.args['until']) if request.args.get('until') else \
+            hour_bucket(datetime.datetime.now(datetime.timezone.utc)) + datetime.timedelta(hours=1)
+        if request.args.get('since'):
+            since = parse_utc_datetime(request.args['since'])
+        elif granularity == 'day':
+            since = until.replace(hour=0) - datetime.timedelta(days=current_app.config['OPS_STATS_DEFAULT_DAYS'] - 1)
+        else:
+            since = until - datetime.timedelta(hours=current_app.config['OPS_STATS_DEFAULT_HOURS'])
+    except ValueError:
+        return jsonify({"error": "Invalid 'since' or 'until'. Use ISO 8601, e.g. 2024-05-01T00:00:00Z."}), 400
+    if since >= until:
+        return jsonify({"error": "'since' must be before 'until'."}), 400
+
+    try:
+        stats = query_stats(granularity, since, until, model_id=model_id)
+    except Exception as e:
+        current_app.logger.error(f"Error fetching ops stats for operator {current_operator_obj.username}: {str(e)}")
+        return jsonify({"error": "Internal server error fetching stats."}), 500
+    return jsonify(stats)
+
 @ops_bp.route('/beepers/activate', methods=['POST'])
 @operator_basic_auth_required
 def activate_beepers_route(current_operator_obj: Operator):
-    """Activates selected beepers."""
+    """Activates selected beepers with chunked, set-based UPDATEs (see services/activation.py)."""
     data = request.get_json()
     if not data:
         return jsonify({"error": "Request body must be JSON."}), 400
@@ -64,29 +236,14 @@ def activate_beepers_route(current_operator_obj: Operator):
     if not beeper_ids_to_activate: # Empty list
         return jsonify({"message": "No beeper IDs provided for activation.", "activated_ids": [], "errors": None}), 200
 
-    activated_count = 0
-    errors_list = []
-    successfully_activated_ids = []
-
     try:
-        beepers_to_process = SoldBeeper.query.filter(SoldBeeper.id.in_(beeper_ids_to_activate)).all()
-        beeper_map = {b.id: b for b in beepers_to_process}
-
-        for beeper_id_str in beeper_ids_to_activate:
-            beeper = beeper_map.get(str(beeper_id_str)) # Ensure ID is string for UUID comparison
-            if not beeper:
-                errors_list.append(f"Beeper with id {beeper_id_str} not found.")
-            elif beeper.status == 'activated':
-                errors_list.append(f"Beeper with id {beeper_id_str} is already activated.")
-            elif beeper.status == 'active':
-                beeper.status = 'activated'
-                db.session.add(beeper)
-                activated_count += 1
-                successfully_activated_ids.append(beeper.id)
-            else:
-                errors_list.append(f"Beeper with id {beeper_id_str} has an unexpected status: {beeper.status}.")
+        result = activate_beepers_by_ids(beeper_ids_to_activate, current_app.config['ACTIVATION_CHUNK_SIZE'])
+        activated_count = result.activated_count
+        successfully_activated_ids = result.activated_ids
+        errors_list = result.errors
         
         if activated_count > 0:
+            ops_events.publish_units_activated(successfully_activated_ids)
             db.session.commit()
             current_app.logger.info(f"Operator {current_operator_obj.username} activated {activated_count} beepers: {successfully_activated_ids}")
         else:
@@ -107,6 +264,68 @@ def activate_beepers_route(current_operator_obj: Operator):
         current_app.logger.error(f"Error activating beepers for operator {current_operator_obj.username}: {str(e)}")
         return jsonify({"error": "Internal server error during activation."}), 500
 
+@ops_bp.route('/jobs/activate', methods=['POST'])
+@operator_basic_auth_required
+def submit_activation_job_route(current_operator_obj: Operator):
+    """
+    Queues a background activation job for fleet-wide activations.
+    Expects either 'beeper_ids' (list) or 'filters' (object with status/model_id/user_id) in the JSON body.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Request body must be JSON."}), 400
+
+    beeper_ids = data.get('beeper_ids')
+    raw_filters = data.get('filters')
+    if (beeper_ids is None) == (raw_filters is None):
+        return jsonify({"error": "Provide exactly one of 'beeper_ids' (list) or 'filters' (object)."}), 400
+    if beeper_ids is not None and (not isinstance(beeper_ids, list) or not beeper_ids):
+        return jsonify({"error": "'beeper_ids' must be a non-empty list."}), 400
+
+    filters = None
+    if raw_filters is not None:
+        if not isinstance(raw_filters, dict):
+            return jsonify({"error": "'filters' must be an object."}), 400
+        filters, filter_error = parse_sold_beeper_filters(raw_filters)
+        if filter_error:
+            return jsonify({"error": filter_error}), 400
+
+    try:
+        job = submit_activation_job(current_operator_obj.id, beeper_ids=beeper_ids, filters=filters)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error submitting activation job for operator {current_operator_obj.username}: {str(e)}")
+        return jsonify({"error": "Internal server error submitting activation job."}), 500
+
+    activation_job_runner.notify()
+    current_app.logger.info(f"Operator {current_operator_obj.username} queued activation job {job.id} ({job.mode}, ~{job.total_count} units).")
+    return jsonify(job.to_dict()), 202, {"Location": url_for('ops.get_activation_job_route', job_id=job.id)}
+
+@ops_bp.route('/jobs', methods=['GET'])
+@operator_basic_auth_required
+def list_activation_jobs_route(current_operator_obj: Operator):
+    """Returns the most recent activation jobs (optionally filtered by 'status'), newest first."""
+    try:
+        query = ActivationJob.query.options(defer(ActivationJob.beeper_ids))
+        status_filter = request.args.get('status')
+        if status_filter:
+            query = query.filter(ActivationJob.status == status_filter)
+        jobs = query.order_by(ActivationJob.id.desc()).limit(50).all()
+        return jsonify([job.to_dict() for job in jobs])
+    except Exception as e:
+        current_app.logger.error(f"Error listing activation jobs for operator {current_operator_obj.username}: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@ops_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@operator_basic_auth_required
+def get_activation_job_route(current_operator_obj: Operator, job_id: int):
+    """Returns progress, throughput and per-batch errors for one activation job."""
+    job = db.session.get(ActivationJob, job_id, options=[defer(ActivationJob.beeper_ids)])
+    if not job:
+        return jsonify({"error": f"Activation job {job_id} not found."}), 404
+    return jsonify(job.to_dict())
+
 @ops_bp.route('/favorites', methods=['GET'])
 @operator_basic_auth_required
 def get_operator_favorites_route(current_operator_obj: Operator):
@@ -159,3 +378,32 @@ def remove_operator_favorite_route(current_operator_obj: Operator, model_id: int
         db.session.rollback()
         current_app.logger.error(f"Error removing favorite for operator {current_operator_obj.username}, model {model_id}: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
+
+@ops_bp.route('/auth-cache', methods=['GET'])
+@operator_basic_auth_required
+def get_credential_cache_stats_route(current_operator_obj: Operator):
+    """Returns hit/miss counters and sizing info for the verified-credential cache."""
+    return jsonify(credential_cache.stats())
+
+@ops_bp.route('/pool', methods=['GET'])
+@operator_basic_auth_required
+def get_db_pool_stats_route(current_operator_obj: Operator):
+    """Returns this worker process's database connection pool gauges and wait-time counters."""
+    return jsonify(pool_metrics.snapshot_all(db.engines))
+
+@ops_bp.route('/events', methods=['GET'])
+@operator_basic_auth_required
+@allow_query_token # EventSource cannot send headers: accepts ?access_token=<token>
+def ops_events_stream_route(current_operator_obj: Operator):
+    """
+    Server-Sent Events stream of sales and activation deltas (units_purchased, units_activated, reset).
+    Resumes after the Last-Event-ID header (or ?last_event_id=) from the in-memory buffer.
+    """
+    if not ops_events.try_open_stream():
+        return jsonify({"error": "Too many open event streams on this server. Retry shortly."}), 503
+    db.session.remove() # The stream never queries; hand the connection back before it starts
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    response = Response(ops_events.stream(last_event_id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no' # Disable proxy buffering (nginx)
+    return response
@@ -1,19 +1,46 @@
 # backend/app/routes/shop.py
 # -*- coding: utf-8 -*-
 from flask import Blueprint, request, jsonify, current_app
-from ..models import BeeperModel, SoldBeeper, CartItem, User
+from ..models import SoldBeeper, User
 from .. import db
 from ..utils.auth_helpers import user_basic_auth_required # Using Basic Auth for protected user routes
-import uuid # For SoldBeeper ID generation
+from ..utils.pagination import count_requested, count_response
+from ..utils.compression import response_compressor
+from ..utils.row_serializers import parse_fields
+from ..services.purchase_engine import purchase_cart
+from ..services.catalog_cache import catalog_cache
+from ..services.ops_events import ops_events
+from ..services.cart import (CART_ITEM_FIELDS, add_to_cart, cart_item_dict, cart_item_dicts, count_cart_lines,
+                             remove_from_cart, set_cart_quantities, unknown_model_ids, update_cart_quantity)
 
 shop_bp = Blueprint('shop', __name__, url_prefix='/api/shop')
 
 @shop_bp.route('/models', methods=['GET'])
 def get_beeper_models_route():
-    """Returns all available beeper models (public endpoint)."""
+    """
+    Returns all available beeper models (public endpoint).
+    Served from the in-process catalog cache with a strong ETag; If-None-Match gets a 304.
+    Compressed representations are cached on the snapshot too, each with its own ETag.
+    """
     try:
-        models = BeeperModel.query.order_by(BeeperModel.name).all()
-        return jsonify([model.to_dict() for model in models])
+        snapshot = catalog_cache.get()
+        encoding = response_compressor.negotiate() if len(snapshot.body) >= response_compressor.min_size else None
+        body, etag = snapshot.encoded_body(encoding) if encoding else (snapshot.body, snapshot.etag)
+        cache_control = f"public, max-age={current_app.config['CATALOG_HTTP_MAX_AGE']}"
+        # If-None-Match uses weak comparison (RFC 9110); any representation of this snapshot is current
+        if request.if_none_match.contains_weak(etag) or request.if_none_match.contains_weak(snapshot.etag):
+            not_modified = current_app.response_class(status=304)
+            not_modified.set_etag(etag)
+            not_modified.headers['Cache-Control'] = cache_control
+            not_modified.vary.add('Accept-Encoding')
+            return not_modified
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
     except Exception as e:
         current_app.logger.error(f"Error fetching beeper models: {str(e)}")
         return jsonify({"error": "Internal server error fetching models."}), 500
@@ -23,18 +50,66 @@ def get_beeper_models_route():
 @shop_bp.route('/cart', methods=['GET'])
 @user_basic_auth_required # User must be logged in (sends Basic Auth header)
 def get_cart_route(current_user_obj: User): # Decorator injects current_user_obj
-    """Gets the current authenticated user's cart."""
+    """
+    Gets the current authenticated user's cart.
+    `fields=model_id,quantity` returns only those keys per line (see CART_ITEM_FIELDS).
+    `count_only=true` or a HEAD request returns just the number of lines ({"total_count"} / X-Total-Count).
+    """
     try:
-        cart_items = CartItem.query.filter_by(user_id=current_user_obj.id).order_by(CartItem.added_at).all()
-        return jsonify([item.to_dict() for item in cart_items])
+        if count_requested():
+            return count_response(count_cart_lines(current_user_obj.id))
+        try:
+            fields = parse_fields(request.args.get('fields'), CART_ITEM_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(cart_item_dicts(current_user_obj.id, fields))
     except Exception as e:
         current_app.logger.error(f"Error fetching cart for user {current_user_obj.username}: {str(e)}")
         return jsonify({"error": "Failed to fetch cart."}), 500
 
+@shop_bp.route('/cart', methods=['PUT'])
+@user_basic_auth_required
+def set_cart_items_route(current_user_obj: User):
+    """
+    Sets the quantities of several cart lines at once.
+    Expects {"items": [{"model_id": int, "quantity": int}, ...]}; quantity 0 removes the line and
+    models not listed are left unchanged. Returns the whole updated cart, as GET /cart does.
+    """
+    data = request.get_json(silent=True)
+    items = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Request body must be JSON with a non-empty 'items' list."}), 400
+    max_items = current_app.config['CART_BATCH_MAX_ITEMS']
+    if len(items) > max_items:
+        return jsonify({"error": f"Too many items. At most {max_items} per request."}), 400
+
+    quantities = {} # Later entries for the same model win
+    for item in items:
+        model_id = item.get('model_id') if isinstance(item, dict) else None
+        quantity = item.get('quantity') if isinstance(item, dict) else None
+        if isinstance(model_id, bool) or isinstance(quantity, bool) or not isinstance(model_id, int) \
+                or not isinstance(quantity, int) or quantity < 0:
+            return jsonify({"error": "Each item needs an int 'model_id' and a non-negative int 'quantity'."}), 400
+        quantities[model_id] = quantity
+
+    missing = unknown_model_ids(model_id for model_id, quantity in quantities.items() if quantity > 0)
+    if missing:
+        return jsonify({"error": f"Beeper model(s) not found: {', '.join(str(model_id) for model_id in missing)}."}), 404
+
+    try:
+        set_cart_quantities(current_user_obj.id, quantities)
+        db.session.commit()
+        current_app.logger.info(f"User {current_user_obj.username} set {len(quantities)} cart line(s).")
+        return jsonify(cart_item_dicts(current_user_obj.id))
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error setting cart items for user {current_user_obj.username}: {str(e)}")
+        return jsonify({"error": "Failed to update cart."}), 500
+
 @shop_bp.route('/cart/add', methods=['POST'])
 @user_basic_auth_required
 def add_to_cart_route(current_user_obj: User):
-    """Adds an item to the current user's cart or increments quantity."""
+    """Adds an item to the current user's cart or increments quantity (one atomic upsert)."""
     data = request.get_json()
     if not data:
         return jsonify({"error": "Request body must be JSON."}), 400
@@ -45,22 +120,15 @@ def add_to_cart_route(current_user_obj: User):
     if not model_id or not isinstance(model_id, int) or not isinstance(quantity_to_add, int) or quantity_to_add < 1:
         return jsonify({"error": "Invalid 'model_id' (must be int) or 'quantity' (must be positive int)."}), 400
 
-    beeper_model_exists = BeeperModel.query.get(model_id)
-    if not beeper_model_exists:
+    if unknown_model_ids([model_id]):
         return jsonify({"error": f"Beeper model with id {model_id} not found."}), 404
 
     try:
-        cart_item = CartItem.query.filter_by(user_id=current_user_obj.id, model_id=model_id).first()
-        if cart_item:
-            cart_item.quantity += quantity_to_add
-        else:
-            cart_item = CartItem(user_id=current_user_obj.id, model_id=model_id, quantity=quantity_to_add)
-            db.session.add(cart_item)
-        
+        cart_row = add_to_cart(current_user_obj.id, model_id, quantity_to_add)
         db.session.commit()
         current_app.logger.info(f"User {current_user_obj.username} updated cart for model {model_id}.")
         # Return the updated cart item
-        return jsonify(cart_item.to_dict()), 200 # 200 OK for update, 201 if always new
+        return jsonify(cart_item_dict(cart_row)), 200 # 200 OK for update, 201 if always new
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error adding to cart for user {current_user_obj.username}: {str(e)}")
@@ -80,20 +148,18 @@ def update_cart_item_quantity_route(current_user_obj: User, model_id: int):
         return jsonify({"error": "Invalid 'quantity'. Must be a non-negative integer."}), 400
 
     try:
-        cart_item = CartItem.query.filter_by(user_id=current_user_obj.id, model_id=model_id).first()
-        if not cart_item:
-            return jsonify({"error": "Item not found in cart."}), 404
-
         if new_quantity == 0:
-            db.session.delete(cart_item)
-            current_app.logger.info(f"User {current_user_obj.username} removed model {model_id} from cart (quantity set to 0).")
+            if not remove_from_cart(current_user_obj.id, model_id):
+                return jsonify({"error": "Item not found in cart."}), 404
             db.session.commit()
+            current_app.logger.info(f"User {current_user_obj.username} removed model {model_id} from cart (quantity set to 0).")
             return jsonify({"message": f"Item model {model_id} removed from cart."}), 200
-        else:
-            cart_item.quantity = new_quantity
-            db.session.commit()
-            current_app.logger.info(f"User {current_user_obj.username} updated quantity for model {model_id} to {new_quantity}.")
-            return jsonify(cart_item.to_dict()), 200
+        cart_row = update_cart_quantity(current_user_obj.id, model_id, new_quantity)
+        if cart_row is None:
+            return jsonify({"error": "Item not found in cart."}), 404
+        db.session.commit()
+        current_app.logger.info(f"User {current_user_obj.username} updated quantity for model {model_id} to {new_quantity}.")
+        return jsonify(cart_item_dict(cart_row)), 200
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error updating cart quantity for user {current_user_obj.username}: {str(e)}")
@@ -104,9 +170,7 @@ def update_cart_item_quantity_route(current_user_obj: User, model_id: int):
 def remove_from_cart_route(current_user_obj: User, model_id: int):
     """Removes an item completely from the user's cart, regardless of quantity."""
     try:
-        cart_item = CartItem.query.filter_by(user_id=current_user_obj.id, model_id=model_id).first()
-        if cart_item:
-            db.session.delete(cart_item)
+        if remove_from_cart(current_user_obj.id, model_id):
             db.session.commit()
             current_app.logger.info(f"User {current_user_obj.username} explicitly removed model {model_id} from cart.")
             return jsonify({"message": "Item removed from cart successfully."}), 200
@@ -122,48 +186,31 @@ def remove_from_cart_route(current_user_obj: User, model_id: int):
 def purchase_beepers_route(current_user_obj: User):
     """
     Processes the purchase of items currently in the user's cart.
-    Creates SoldBeeper records and then clears the user's cart.
+    Bulk-inserts one SoldBeeper per unit and clears the cart in the same transaction,
+    returning the created unit IDs. The IDs come back from INSERT ... RETURNING and are all
+    held in memory anyway (events and the stats rollup need them before the commit), so the
+    body is encoded in one go rather than streamed.
     """
-    user_cart_items = CartItem.query.filter_by(user_id=current_user_obj.id).all()
-
-    if not user_cart_items:
-        return jsonify({"error": "Your cart is empty. Nothing to purchase."}), 400
-
-    purchased_beepers_info = []
     try:
-        for cart_item_db in user_cart_items:
-            for _ in range(cart_item_db.quantity):
-                new_sold_beeper = SoldBeeper(
-                    model_id=cart_item_db.model_id,
-                    user_id=current_user_obj.id
-                )
-                db.session.add(new_sold_beeper)
-                # We need to flush to get the ID if we want to return it immediately,
-                # but it's safer to commit once at the end.
-                # If returning detailed info of each sold beeper, flush might be needed here.
-            
-            # Remove item from cart after processing for purchase
-            db.session.delete(cart_item_db)
-
-        db.session.commit() # Commit all sold beepers and cart deletions together
-        
-        # Fetch the newly created SoldBeeper objects to return their details
-        # This is a bit inefficient but ensures we return the generated IDs and timestamps
-        # A more optimized way might involve collecting IDs during creation if needed.
-        # For now, let's just confirm the count.
-        # To get details, you'd query SoldBeeper for this user from this transaction.
-        # This part is simplified to avoid complex queries post-commit for this example.
-
-        current_app.logger.info(f"User {current_user_obj.username} completed purchase of items from cart.")
-        # Ideally, you'd return the list of 'SoldBeeper' objects created.
-        # For simplicity, we'll return a success message.
-        # To return purchased_beepers_info, you'd need to .to_dict() them *after* commit or flush carefully.
-        return jsonify({
-            "message": "רכישה בוצעה בהצלחה! הביפרים שלך בדרך.",
-            "items_purchased_count": len(user_cart_items) # This is count of cart entries, not total beeper units
-        }), 201
-
+        result = purchase_cart(current_user_obj.id)
+        if result.cart_lines_count == 0:
+            db.session.rollback()
+            return jsonify({"error": "Your cart is empty. Nothing to purchase."}), 400
+
+        model_names = {model_id: model['name'] for model_id, model in catalog_cache.get().models_by_id.items()}
+        ops_events.publish_units_purchased(current_user_obj.id, result.units[0].purchase_timestamp,
+                                           [(unit.id, unit.model_id) for unit in result.units], model_names)
+        db.session.commit() # Commit all sold beepers and cart deletions together (events are delivered on commit)
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error processing purchase for user {current_user_obj.username}: {str(e)}")
         return jsonify({"error": "Internal server error during purchase processing."}), 500
+
+    current_app.logger.info(f"User {current_user_obj.username} completed purchase of {result.units_count} unit(s) from cart.")
+    response_head = {
+        "message": "רכישה בוצעה בהצלחה! הביפרים שלך בדרך.",
+        "items_purchased_count": result.cart_lines_count, # Count of cart entries
+        "units_purchased_count": result.units_count, # Count of individual beeper units created
+        "purchase_timestamp": result.units[0].purchase_timestamp.isoformat() if result.units else None
+    }
+    return jsonify({**response_head, "purchased_unit_ids": [unit.id for unit in result.units]}), 201
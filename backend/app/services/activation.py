@@ -0,0 +1,100 @@
+# backend/app/services/activation.py
+# -*- coding: utf-8 -*-
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import String, any_, bindparam, case, cast, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+from .. import db
+from ..models import SoldBeeper
+from ..utils.guid import normalize_guid
+from .sold_beeper_stats import record_activated_units
+
+NOT_FOUND = 'not_found'
+ALREADY_ACTIVATED = 'already_activated'
+UNEXPECTED_STATUS = 'unexpected_status'
+
+
+@dataclass
+class ActivationResult:
+    """Per-request activation outcome, in the same shape the activate endpoint has always returned."""
+    activated_ids: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def activated_count(self) -> int:
+        return len(self.activated_ids)
+
+
+def _id_match(ids: Sequence[str]) -> Any:
+    # PostgreSQL gets a single array parameter (id = ANY(:ids)) so large chunks never hit bind-parameter limits
+    if db.session.get_bind().dialect.name == 'postgresql':
+        ids_param = bindparam('ids', value=list(ids), type_=ARRAY(String))
+        return SoldBeeper.id == any_(cast(ids_param, ARRAY(UUID(as_uuid=False))))
+    return SoldBeeper.id.in_(ids)
+
+
+def activate_chunk(ids: Sequence[str]) -> Tuple[Set[str], Dict[str, Tuple[str, str]]]:
+    """
+    Activates one chunk of unique IDs with a single set-based UPDATE ... RETURNING and moves the
+    activated units in the stats rollup.
+    Returns (activated IDs, {id: (classification, status)} for IDs that exist but were not active).
+    IDs missing from both are not found, as are strings that are not UUIDs. Runs in the caller's transaction.
+    """
+    ids = [beeper_id for beeper_id in ids if normalize_guid(beeper_id) is not None]
+    if not ids:
+        return set(), {}
+    activated_rows = db.session.execute(
+        update(SoldBeeper)
+        .where(SoldBeeper.status == 'active', _id_match(ids))
+        .values(status='activated')
+        .returning(SoldBeeper.id, SoldBeeper.model_id, SoldBeeper.purchase_timestamp),
+        execution_options={'synchronize_session': False}
+    ).all()
+    activated = {row.id for row in activated_rows}
+    record_activated_units((row.model_id, row.purchase_timestamp) for row in activated_rows)
+
+    remaining = [beeper_id for beeper_id in ids if beeper_id not in activated]
+    skipped: Dict[str, Tuple[str, str]] = {}
+    if remaining:
+        classification = case(
+            (SoldBeeper.status == 'activated', ALREADY_ACTIVATED),
+            else_=UNEXPECTED_STATUS
+        )
+        rows = db.session.execute(select(SoldBeeper.id, classification, SoldBeeper.status).where(_id_match(remaining)))
+        skipped = {row[0]: (row[1], row[2]) for row in rows}
+    return activated, skipped
+
+
+def activate_beepers_by_ids(requested_ids: Sequence[Any], chunk_size: int) -> ActivationResult:
+    """
+    Activates the requested beepers in chunks of `chunk_size` within the current transaction.
+    Results keep the request order; an ID repeated after it was activated reports as already activated.
+    The caller commits or rolls back.
+    """
+    # Canonical spelling, so IDs match what the database returns; anything else is reported as not found
+    id_strings = [normalize_guid(beeper_id) or str(beeper_id) for beeper_id in requested_ids]
+    unique_ids = list(dict.fromkeys(id_strings))
+
+    activated: Set[str] = set()
+    skipped: Dict[str, Tuple[str, str]] = {}
+    for start in range(0, len(unique_ids), chunk_size):
+        chunk_activated, chunk_skipped = activate_chunk(unique_ids[start:start + chunk_size])
+        activated.update(chunk_activated)
+        skipped.update(chunk_skipped)
+
+    result = ActivationResult()
+    reported_activated: Set[str] = set()
+    for beeper_id in id_strings:
+        outcome: Optional[Tuple[str, str]] = skipped.get(beeper_id)
+        if beeper_id in activated and beeper_id not in reported_activated:
+            reported_activated.add(beeper_id)
+            result.activated_ids.append(beeper_id)
+        elif beeper_id in activated or (outcome and outcome[0] == ALREADY_ACTIVATED):
+            result.errors.append(f"Beeper with id {beeper_id} is already activated.")
+        elif outcome is None:
+            result.errors.append(f"Beeper with id {beeper_id} not found.")
+        else:
+            result.errors.append(f"Beeper with id {beeper_id} has an unexpected status: {outcome[1]}.")
+    return result
@@ -0,0 +1,237 @@
+# backend/app/services/activation_jobs.py
+# -*- coding: utf-8 -*-
+import atexit
+import datetime
+import os
+import socket
+import threading
+from typing import Any, List, Optional, Sequence
+
+from flask import Flask
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import defer
+
+from .. import db
+from ..models import ActivationJob, SoldBeeper
+from ..utils.guid import normalize_guid
+from ..utils.sold_beeper_filters import SoldBeeperFilters, apply_sold_beeper_filters
+from .activation import NOT_FOUND, activate_chunk
+from .ops_events import ops_events
+
+MAX_BATCH_ERROR_ENTRIES = 50 # Batches with issues kept on a job (oldest dropped first)
+MAX_ERRORS_PER_BATCH_ENTRY = 20 # Individual ID issues recorded per batch entry
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def submit_activation_job(operator_id: int, beeper_ids: Optional[Sequence[Any]] = None,
+                          filters: Optional[SoldBeeperFilters] = None) -> ActivationJob:
+    """
+    Queues an activation job for an explicit ID list or for every active unit matching `filters`.
+    The job is added to the current session; the caller commits and then notifies the runner.
+    """
+    if beeper_ids is not None:
+        unique_ids = list(dict.fromkeys(normalize_guid(beeper_id) or str(beeper_id) for beeper_id in beeper_ids))
+        job = ActivationJob(operator_id=operator_id, mode='ids', beeper_ids=unique_ids,
+                            total_count=len(unique_ids), batch_errors=[])
+    else:
+        count_query = apply_sold_beeper_filters(
+            select(func.count()).select_from(SoldBeeper).where(SoldBeeper.status == 'active'), filters or {}
+        )
+        job = ActivationJob(operator_id=operator_id, mode='filter', filters=filters or {},
+                            total_count=db.session.scalar(count_query), batch_errors=[])
+    db.session.add(job)
+    return job
+
+
+def _claimable(stale_before: datetime.datetime) -> Any:
+    # Queued jobs, plus running jobs whose worker stopped heartbeating (crashed or restarted)
+    return or_(
+        ActivationJob.status == 'queued',
+        and_(ActivationJob.status == 'running', ActivationJob.heartbeat_at < stale_before)
+    )
+
+
+def claim_next_job(worker_id: str, stale_after_seconds: int) -> Optional[int]:
+    """
+    Atomically claims the oldest claimable job for `worker_id` and returns its id, or None.
+    The conditional UPDATE re-checks claimability, so concurrent workers never share a job.
+    """
+    now = _utcnow()
+    claimable = _claimable(now - datetime.timedelta(seconds=stale_after_seconds))
+    candidate_ids = db.session.scalars(
+        select(ActivationJob.id).where(claimable).order_by(ActivationJob.id).limit(5)
+    ).all()
+    for job_id in candidate_ids:
+        claimed = db.session.execute(
+            update(ActivationJob)
+            .where(ActivationJob.id == job_id, claimable)
+            .values(status='running', worker_id=worker_id, heartbeat_at=now,
+                    started_at=func.coalesce(ActivationJob.started_at, now))
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+    return None
+
+
+def _next_batch(job: ActivationJob, beeper_ids: Optional[List[str]], batch_size: int) -> List[str]:
+    if job.mode == 'ids':
+        return (beeper_ids or [])[job.id_cursor:job.id_cursor + batch_size]
+    # Filter jobs re-select from the start each time: activated units drop out of status='active',
+    # so the remaining work is always what the query returns (and survives restarts for free).
+    batch_query = apply_sold_beeper_filters(
+        select(SoldBeeper.id).where(SoldBeeper.status == 'active'), job.filters or {}
+    ).order_by(SoldBeeper.id).limit(batch_size)
+    return list(db.session.scalars(batch_query))
+
+
+def process_next_batch(job: ActivationJob, beeper_ids: Optional[List[str]], batch_size: int) -> bool:
+    """
+    Activates the job's next batch and records progress on the job, in the caller's transaction.
+    Returns True when there is nothing left to process.
+    """
+    batch = _next_batch(job, beeper_ids, batch_size)
+    if not batch:
+        return True
+
+    activated, skipped = activate_chunk(batch)
+    issues = []
+    for beeper_id in batch:
+        if beeper_id in activated:
+            continue
+        reason, status = skipped.get(beeper_id, (NOT_FOUND, None))
+        issues.append({'id': beeper_id, 'reason': reason, 'status': status})
+
+    if activated:
+        ops_events.publish_units_activated(sorted(activated)) # Delivered when the batch commits
+    if job.mode == 'ids':
+        job.id_cursor += len(batch)
+    job.processed_count += len(batch)
+    job.activated_count += len(activated)
+    job.error_count += len(issues)
+    job.batches_completed += 1
+    if issues:
+        entry = {'batch': job.batches_completed, 'error_count': len(issues),
+                 'errors': issues[:MAX_ERRORS_PER_BATCH_ENTRY]}
+        job.batch_errors = (list(job.batch_errors or []) + [entry])[-MAX_BATCH_ERROR_ENTRIES:]
+    return False
+
+
+class ActivationJobRunner:
+    """
+    In-process worker pool that drains the activation_jobs table.
+    The table is the queue (no broker needed): each batch's activations and the job's progress
+    commit together, so a job picked up again after a restart resumes exactly where it stopped.
+    """
+
+    def __init__(self) -> None:
+        self._app: Optional[Flask] = None
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._exit_hook_registered = False
+
+    def init_app(self, app: Flask) -> None:
+        self._app = app
+        app.extensions['activation_job_runner'] = self
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> None:
+        """Starts ACTIVATION_JOB_WORKERS daemon threads in this process (no-op if already running)."""
+        if self._app is None or self.running:
+            return
+        self._stopping.clear()
+        worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._threads = []
+        for index in range(self._app.config['ACTIVATION_JOB_WORKERS']):
+            thread = threading.Thread(target=self._worker_loop, args=(f"{worker_prefix}:{index}",),
+                                      name=f"activation-job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._app.logger.info(f"Started {len(self._threads)} activation job worker(s).")
+        if not self._exit_hook_registered:
+            # Single-process servers; gunicorn workers also call stop() from the worker_exit hook
+            atexit.register(self.stop)
+            self._exit_hook_registered = True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Asks workers to finish their current batch, requeue their job and exit. Called when the
+        process exits; a job left claimed would otherwise wait ACTIVATION_JOB_STALE_SECONDS to be reclaimed.
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wakes idle workers after a job was submitted, instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    def _worker_loop(self, worker_id: str) -> None:
+        app = self._app
+        poll_seconds = app.config['ACTIVATION_JOB_POLL_SECONDS']
+        while not self._stopping.is_set():
+            job_id = None
+            with app.app_context():
+                try:
+                    job_id = claim_next_job(worker_id, app.config['ACTIVATION_JOB_STALE_SECONDS'])
+                    if job_id is not None:
+                        self._run_job(job_id, worker_id)
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"Activation job worker {worker_id} error: {str(e)}")
+            if job_id is None:
+                self._wakeup.wait(poll_seconds)
+                self._wakeup.clear()
+
+    def _run_job(self, job_id: int, worker_id: str) -> None:
+        app = self._app
+        batch_size = app.config['ACTIVATION_JOB_BATCH_SIZE']
+        job = db.session.get(ActivationJob, job_id)
+        if job is None:
+            return
+        beeper_ids = job.beeper_ids # Loaded once; per-batch reloads defer this potentially large column
+        app.logger.info(f"Worker {worker_id} processing activation job {job_id} from batch {job.batches_completed + 1}.")
+
+        while True:
+            job = db.session.get(ActivationJob, job_id, options=[defer(ActivationJob.beeper_ids)])
+            if job is None or job.status != 'running' or job.worker_id != worker_id:
+                return # Claim was lost (e.g. reclaimed after a stall)
+            if self._stopping.is_set():
+                job.status = 'queued' # Hand back cleanly; the next start resumes from the saved cursor
+                job.worker_id = None
+                db.session.commit()
+                return
+            try:
+                finished = process_next_batch(job, beeper_ids, batch_size)
+                job.heartbeat_at = _utcnow()
+                if finished:
+                    job.status = 'completed'
+                    job.finished_at = job.heartbeat_at
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(ActivationJob, job_id, options=[defer(ActivationJob.beeper_ids)])
+                job.failed_attempts += 1
+                job.last_error = str(e)
+                job.heartbeat_at = _utcnow()
+                finished = job.failed_attempts >= app.config['ACTIVATION_JOB_MAX_ATTEMPTS']
+                if finished:
+                    job.status = 'failed'
+                    job.finished_at = job.heartbeat_at
+                db.session.commit()
+                app.logger.error(f"Activation job {job_id} batch failed (attempt {job.failed_attempts}): {str(e)}")
+            if finished:
+                app.logger.info(f"Activation job {job_id} {job.status}: {job.activated_count} activated, {job.error_count} issue(s).")
+                return
+
+
+activation_job_runner = ActivationJobRunner()
@@ -0,0 +1,80 @@
+# backend/app/services/archival.py
+# -*- coding: utf-8 -*-
+"""
+Moves old, activated units out of sold_beepers, either into the sold_beepers_archive table or into
+NDJSON files on local disk (gzip-compressed when the path ends in .gz). Units are moved in batches,
+each deleted and archived in one transaction. The stats rollup keeps counting archived units.
+"""
+import datetime
+import gzip
+import json
+import os
+from typing import IO, Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select
+
+from .. import db
+from ..models import SoldBeeper, SoldBeeperArchive
+
+_ARCHIVED_COLUMNS = (SoldBeeper.id, SoldBeeper.model_id, SoldBeeper.purchase_timestamp, SoldBeeper.status,
+                     SoldBeeper.user_id)
+
+
+def _take_batch(before: datetime.datetime, batch_size: int) -> List[Dict[str, Any]]:
+    """Deletes up to `batch_size` archivable units, oldest first, and returns them (in the current transaction)."""
+    candidates = select(SoldBeeper.id)\
+        .where(SoldBeeper.status == 'activated', SoldBeeper.purchase_timestamp < before)\
+        .order_by(SoldBeeper.purchase_timestamp)\
+        .limit(batch_size)
+    rows = db.session.execute(
+        # The repeated timestamp bound lets PostgreSQL prune partitions for the DELETE itself
+        delete(SoldBeeper)
+        .where(SoldBeeper.id.in_(candidates), SoldBeeper.purchase_timestamp < before)
+        .returning(*_ARCHIVED_COLUMNS),
+        execution_options={'synchronize_session': False}
+    ).all()
+    return [row._asdict() for row in rows]
+
+
+def archive_activated_units(before: datetime.datetime, batch_size: int, path: Optional[str] = None,
+                            progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Archives activated units purchased before `before`. Returns how many were moved.
+    With `path`, each batch is appended to the file and flushed to disk before its DELETE commits,
+    so a crash can at worst leave a batch in the file that is still in the table (re-archived next run).
+    """
+    archive_file: Optional[IO[str]] = None
+    if path:
+        archive_file = gzip.open(path, 'at', encoding='utf-8') if path.endswith('.gz') \
+            else open(path, 'a', encoding='utf-8')
+    moved = 0
+    try:
+        while True:
+            units = _take_batch(before, batch_size)
+            if not units:
+                db.session.rollback()
+                break
+            if archive_file is not None:
+                archive_file.write(''.join(json.dumps(unit, default=_json_default) + '\n' for unit in units))
+                archive_file.flush() # gzip: a sync flush, so everything written so far is decompressible
+                os.fsync(archive_file.fileno())
+            else:
+                archived_at = datetime.datetime.now(datetime.timezone.utc)
+                db.session.execute(insert(SoldBeeperArchive), [dict(unit, archived_at=archived_at) for unit in units])
+            db.session.commit()
+            moved += len(units)
+            if progress is not None:
+                progress(moved)
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if archive_file is not None:
+            archive_file.close()
+    return moved
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return str(value)
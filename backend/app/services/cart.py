@@ -0,0 +1,115 @@
+# backend/app/services/cart.py
+# -*- coding: utf-8 -*-
+"""
+Cart writes as single upsert statements on the (user_id, model_id) unique constraint, so concurrent
+requests for the same cart line never lose an update and never hit the constraint.
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+
+from .. import db
+from ..models import BeeperModel, CartItem
+from ..utils.row_serializers import CART_ITEM_ROW
+from .catalog_cache import catalog_cache
+
+# Everything GET /api/shop/cart can return per line, for `fields=`
+CART_ITEM_FIELDS = CART_ITEM_ROW.keys + ('model_details',)
+
+
+def _insert() -> Any:
+    dialect_insert = postgresql.insert if db.session.get_bind().dialect.name == 'postgresql' else sqlite.insert
+    return dialect_insert(CartItem)
+
+
+def cart_item_dict(row: Row) -> Dict[str, Any]:
+    """Same shape as CartItem.to_dict(), with model details from the catalog cache instead of a join."""
+    item = CART_ITEM_ROW.to_dict(row)
+    item['model_details'] = catalog_cache.get().models_by_id.get(row.model_id)
+    return item
+
+
+def cart_item_dicts(user_id: int, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    The user's cart lines, oldest first, limited to `fields` (default: all of CART_ITEM_FIELDS).
+    Only the needed cart_items columns are selected; model_details comes from the catalog cache.
+    """
+    serializer = CART_ITEM_ROW.project(fields) if fields is not None else CART_ITEM_ROW
+    with_details = fields is None or 'model_details' in fields
+    columns = serializer.columns
+    if with_details and 'model_id' not in serializer.keys:
+        columns += (CartItem.model_id,) # Read for the catalog lookup, not returned
+    rows = db.session.execute(select(*columns).where(CartItem.user_id == user_id).order_by(CartItem.added_at))
+    if not with_details:
+        return list(serializer.to_dicts(rows))
+    models_by_id = catalog_cache.get().models_by_id
+    items = []
+    for row in rows:
+        item = serializer.to_dict(row)
+        item['model_details'] = models_by_id.get(row.model_id)
+        items.append(item)
+    return items
+
+
+def count_cart_lines(user_id: int) -> int:
+    return db.session.scalar(select(func.count()).select_from(CartItem).where(CartItem.user_id == user_id))
+
+
+def unknown_model_ids(model_ids: Iterable[int]) -> List[int]:
+    """Model IDs that do not exist. Checked against the catalog cache; only cache misses go to the database."""
+    models_by_id = catalog_cache.get().models_by_id
+    missing = [model_id for model_id in model_ids if model_id not in models_by_id]
+    if missing: # Possibly created in another process since the snapshot was built
+        found = set(db.session.scalars(select(BeeperModel.id).where(BeeperModel.id.in_(missing))))
+        missing = [model_id for model_id in missing if model_id not in found]
+    return missing
+
+
+def add_to_cart(user_id: int, model_id: int, quantity: int) -> Row:
+    """Adds `quantity` units to the cart line (creating it if needed). Returns the resulting line."""
+    statement = _insert().values(user_id=user_id, model_id=model_id, quantity=quantity)
+    statement = statement.on_conflict_do_update(
+        index_elements=[CartItem.user_id, CartItem.model_id],
+        set_={'quantity': CartItem.quantity + statement.excluded.quantity}
+    ).returning(*CART_ITEM_ROW.columns)
+    return db.session.execute(statement).one()
+
+
+def update_cart_quantity(user_id: int, model_id: int, quantity: int) -> Optional[Row]:
+    """Sets the quantity of an existing cart line in one UPDATE. Returns the updated line, or None if there is none."""
+    statement = update(CartItem).where(CartItem.user_id == user_id, CartItem.model_id == model_id)\
+        .values(quantity=quantity).returning(*CART_ITEM_ROW.columns)
+    return db.session.execute(statement, execution_options={'synchronize_session': False}).one_or_none()
+
+
+def remove_from_cart(user_id: int, model_id: int) -> bool:
+    """Deletes the cart line in one DELETE. Returns whether there was one."""
+    result = db.session.execute(
+        delete(CartItem).where(CartItem.user_id == user_id, CartItem.model_id == model_id),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount > 0
+
+
+def set_cart_quantities(user_id: int, quantities: Mapping[int, int]) -> None:
+    """
+    Sets the quantity of every listed model in one upsert; quantity 0 removes the line (one DELETE).
+    Lines not listed are left alone. Runs in the caller's transaction.
+    """
+    rows = [{'user_id': user_id, 'model_id': model_id, 'quantity': quantity}
+            for model_id, quantity in sorted(quantities.items()) if quantity > 0]
+    removed = [model_id for model_id, quantity in quantities.items() if quantity == 0]
+    if rows:
+        statement = _insert().values(rows)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[CartItem.user_id, CartItem.model_id],
+            set_={'quantity': statement.excluded.quantity}
+        ))
+    if removed:
+        db.session.execute(
+            delete(CartItem).where(CartItem.user_id == user_id, CartItem.model_id.in_(removed)),
+            execution_options={'synchronize_session': False}
+        )
+
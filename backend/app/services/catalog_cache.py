@@ -0,0 +1,121 @@
+# backend/app/services/catalog_cache.py
+# -*- coding: utf-8 -*-
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .. import db
+from ..models import BeeperModel
+from ..utils.compression import MAX_LEVELS, response_compressor
+from ..utils.row_serializers import BEEPER_MODEL_ROW
+
+_DIRTY_FLAG = 'beeper_catalog_dirty'
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One serialized version of the beeper catalog."""
+    version: int
+    body: bytes # Pre-encoded JSON array, exactly as served by /api/shop/models
+    etag: str # Strong validator derived from `body`
+    models_by_id: Dict[int, Dict[str, Any]]
+    built_at: float
+    # Content-Encoding -> (compressed body, ETag of that representation), filled on first use
+    encoded: Dict[str, Tuple[bytes, str]] = field(default_factory=dict, compare=False)
+
+    def encoded_body(self, encoding: str) -> Tuple[bytes, str]:
+        """`body` compressed with `encoding` (once per snapshot, at the highest level) and its ETag."""
+        cached = self.encoded.get(encoding)
+        if cached is None:
+            compressed = response_compressor.compress(self.body, encoding, level=MAX_LEVELS[encoding])
+            cached = self.encoded[encoding] = (compressed, f'{self.etag}-{encoding}')
+        return cached
+
+
+class CatalogCache:
+    """
+    Process-local cache of the serialized BeeperModel catalog.
+
+    Committing a transaction that wrote a BeeperModel row bumps the version and drops the
+    snapshot. Writes made by other worker processes are only picked up once the snapshot
+    reaches CATALOG_CACHE_TTL_SECONDS, so the TTL bounds cross-process staleness.
+    """
+
+    def __init__(self) -> None:
+        self.ttl_seconds = 60
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+
+    def init_app(self, app: Flask) -> None:
+        self.ttl_seconds = app.config.get('CATALOG_CACHE_TTL_SECONDS', self.ttl_seconds)
+        self.invalidate()
+        _register_invalidation_listeners(self)
+        app.extensions['catalog_cache'] = self
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def get(self) -> CatalogSnapshot:
+        """Returns the current snapshot, rebuilding it from the database if missing or expired."""
+        with self._lock:
+            snapshot = self._snapshot
+            version = self._version
+        if snapshot is not None and time.monotonic() - snapshot.built_at < self.ttl_seconds:
+            return snapshot
+
+        # Always from the primary: a lagging replica would be served to everyone, with a valid ETag, for the whole TTL
+        rows = db.session.execute(select(*BEEPER_MODEL_ROW.columns).order_by(BeeperModel.name),
+                                  bind_arguments={'bind': db.engine})
+        model_dicts = list(BEEPER_MODEL_ROW.to_dicts(rows))
+        body = current_app.json.dumps(model_dicts).encode('utf-8')
+        snapshot = CatalogSnapshot(
+            version=version,
+            body=body,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            models_by_id={model_dict['id']: model_dict for model_dict in model_dicts},
+            built_at=time.monotonic()
+        )
+        with self._lock:
+            # Don't publish a snapshot that was read while a catalog write was being committed
+            if self._version == version:
+                self._snapshot = snapshot
+        return snapshot
+
+
+catalog_cache = CatalogCache()
+
+_listeners_registered = False
+
+
+def _register_invalidation_listeners(cache: CatalogCache) -> None:
+    """Flags sessions that flush BeeperModel writes, and invalidates the cache once they commit."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+
+    def _mark_dirty(mapper: Any, connection: Any, target: BeeperModel) -> None:
+        session = Session.object_session(target)
+        if session is not None:
+            session.info[_DIRTY_FLAG] = True
+
+    def _after_commit(session: Session) -> None:
+        if session.info.pop(_DIRTY_FLAG, False):
+            cache.invalidate()
+
+    def _after_rollback(session: Session) -> None:
+        session.info.pop(_DIRTY_FLAG, None)
+
+    for mapper_event in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(BeeperModel, mapper_event, _mark_dirty)
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
+    _listeners_registered = True
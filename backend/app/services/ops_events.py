@@ -0,0 +1,295 @@
+# backend/app/services/ops_events.py
+# -*- coding: utf-8 -*-
+import json
+import os
+import select
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Flask
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from .. import db
+
+UNITS_PURCHASED = 'units_purchased'
+UNITS_ACTIVATED = 'units_activated'
+RESET = 'reset' # Client missed events it cannot get back: it should re-fetch /api/ops/beepers
+
+_PENDING_KEY = 'pending_ops_events'
+_listeners_registered = False
+
+
+class OpsEventBus:
+    """
+    Fan-out of compact sales/activation deltas to Ops Center SSE clients (GET /api/ops/events).
+
+    Events are recorded in the publishing transaction and only delivered once it commits:
+    on PostgreSQL through NOTIFY (so every worker process receives them via its LISTEN thread),
+    elsewhere through a session after_commit hook (this process only). Each process keeps the
+    latest events in a ring buffer; stream clients wait on one shared Condition and never touch
+    the database. Event IDs are '<epoch>-<seq>', where the epoch changes whenever the process's
+    buffer starts over, so a Last-Event-ID from another worker or an older process triggers a reset.
+    The standalone asyncio server (services/ops_events_server.py) reads the same buffer without
+    blocking, woken through add_waker().
+    """
+
+    def __init__(self) -> None:
+        self.channel = 'ops_events'
+        self.max_ids_per_event = 100
+        self.max_ids_per_publish = 10000
+        self.max_streams = 2
+        self.keepalive_seconds = 15.0
+        self.max_stream_seconds = 300.0
+        self.use_notify = False
+        self._engine: Any = None
+        self._logger: Any = None
+        self._stream_lock = threading.Lock()
+        self.active_streams = 0
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._pid: Optional[int] = None
+        self._wakers: List[Callable[[], None]] = []
+        self._reset_buffer(1000)
+
+    def _reset_buffer(self, size: int) -> None:
+        self._condition = threading.Condition()
+        self._events: Deque[Tuple[int, str, str]] = deque(maxlen=size) # (seq, event type, JSON data)
+        self._last_seq = 0
+        self.epoch = f'{os.getpid():x}{time.time_ns() // 1000:x}'
+
+    def init_app(self, app: Flask) -> None:
+        self.max_ids_per_event = app.config.get('OPS_EVENTS_MAX_IDS_PER_EVENT', self.max_ids_per_event)
+        self.max_ids_per_publish = app.config.get('OPS_EVENTS_MAX_IDS_PER_PUBLISH', self.max_ids_per_publish)
+        self.max_streams = app.config.get('OPS_EVENTS_MAX_STREAMS', self.max_streams)
+        self.keepalive_seconds = app.config.get('OPS_EVENTS_KEEPALIVE_SECONDS', self.keepalive_seconds)
+        self.max_stream_seconds = app.config.get('OPS_EVENTS_MAX_STREAM_SECONDS', self.max_stream_seconds)
+        self._reset_buffer(app.config.get('OPS_EVENTS_BUFFER_SIZE', 1000))
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        # LISTEN needs a dedicated server session, which PgBouncer transaction pooling cannot provide
+        self.use_notify = uri.startswith('postgresql') and not app.config.get('DB_PGBOUNCER_TRANSACTION_MODE')
+        self._logger = app.logger
+        with app.app_context():
+            self._engine = db.engine
+        _register_session_listeners(self)
+        app.extensions['ops_events'] = self
+
+    # --- Publishing (inside the caller's transaction) ---
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        payload = json.dumps(data, separators=(',', ':'), default=str)
+        if self.use_notify:
+            db.session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                               {'channel': self.channel, 'payload': f'{event_type}\n{payload}'})
+        else:
+            db.session.info.setdefault(_PENDING_KEY, []).append((event_type, payload))
+
+    def publish_units_purchased(self, user_id: int, purchase_timestamp: Any,
+                                units: Sequence[Tuple[str, int]], model_names: Dict[int, str]) -> None:
+        """Publishes new units as events grouped by model: {user_id, purchase_timestamp, model_id, model_name, unit_ids}."""
+        head = {'user_id': user_id,
+                'purchase_timestamp': purchase_timestamp.isoformat() if purchase_timestamp else None}
+        if len(units) > self.max_ids_per_publish:
+            self.publish(UNITS_PURCHASED, {**head, 'count': len(units), 'truncated': True})
+            return
+        ids_by_model: Dict[int, List[str]] = {}
+        for unit_id, model_id in units:
+            ids_by_model.setdefault(model_id, []).append(unit_id)
+        for model_id, unit_ids in ids_by_model.items():
+            for chunk in _chunks(unit_ids, self.max_ids_per_event):
+                self.publish(UNITS_PURCHASED, {**head, 'model_id': model_id,
+                                               'model_name': model_names.get(model_id), 'unit_ids': chunk})
+
+    def publish_units_activated(self, unit_ids: Sequence[str]) -> None:
+        """Publishes status transitions active -> activated as {status, unit_ids} events."""
+        if len(unit_ids) > self.max_ids_per_publish:
+            self.publish(UNITS_ACTIVATED, {'status': 'activated', 'count': len(unit_ids), 'truncated': True})
+            return
+        for chunk in _chunks(list(unit_ids), self.max_ids_per_event):
+            self.publish(UNITS_ACTIVATED, {'status': 'activated', 'unit_ids': chunk})
+
+    # --- Delivery ---
+
+    def _append(self, event_type: str, payload: str) -> None:
+        with self._condition:
+            self._last_seq += 1
+            self._events.append((self._last_seq, event_type, payload))
+            self._condition.notify_all()
+        for wake in self._wakers:
+            wake()
+
+    def add_waker(self, wake: Callable[[], None]) -> None:
+        """Registers a callback run (on the publishing thread) after every new event; it must not block."""
+        self._wakers.append(wake)
+
+    def remove_waker(self, wake: Callable[[], None]) -> None:
+        self._wakers.remove(wake)
+
+    def start(self) -> None:
+        """
+        Gives this process its own buffer and epoch, and starts its LISTEN thread (PostgreSQL).
+        Called by start_background_services, i.e. after fork in pre-fork servers.
+        """
+        if self._pid != os.getpid():
+            self._reset_buffer(self._events.maxlen or 1000) # Anything inherited belongs to the parent's epoch
+            self._pid = os.getpid()
+        if not self.use_notify or (self._listener is not None and self._listener.is_alive()):
+            return
+        self._stopping.clear()
+        self._listener = threading.Thread(target=self._listen_loop, name='ops-events-listener', daemon=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _listen_loop(self) -> None:
+        connected_before = False
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = self._engine.raw_connection()
+                connection.detach() # Long-lived; must not occupy a slot of the request pool
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                if connected_before:
+                    self._append(RESET, '{}') # Notifications sent while reconnecting are lost
+                connected_before = True
+                while not self._stopping.is_set():
+                    if select.select([dbapi_connection], [], [], 5.0) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        notification = dbapi_connection.notifies.pop(0)
+                        event_type, _, payload = notification.payload.partition('\n')
+                        self._append(event_type, payload)
+            except Exception as e:
+                if self._logger is not None:
+                    self._logger.error(f"Ops event listener error: {str(e)}. Reconnecting.")
+                self._stopping.wait(2.0)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    # --- Streaming ---
+
+    def try_open_stream(self) -> bool:
+        with self._stream_lock:
+            if self.active_streams >= self.max_streams:
+                return False
+            self.active_streams += 1
+            return True
+
+    def _close_stream(self) -> None:
+        with self._stream_lock:
+            self.active_streams -= 1
+
+    def start_cursor(self, last_event_id: Optional[str]) -> Tuple[int, bool]:
+        """Returns (sequence to continue after, whether the client must reset)."""
+        latest = self.latest_seq()
+        if not last_event_id:
+            return latest, False
+        epoch, _, seq = last_event_id.rpartition('-')
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > latest:
+            return latest, True
+        return int(seq), False
+
+    def latest_seq(self) -> int:
+        with self._condition:
+            return self._last_seq
+
+    def events_after(self, seq: int) -> Tuple[List[Tuple[int, str, str]], bool]:
+        """Buffered events after `seq`, without waiting. Returns (events, gap) where gap means some were evicted."""
+        with self._condition:
+            return self._events_after(seq)
+
+    def _events_after(self, seq: int) -> Tuple[List[Tuple[int, str, str]], bool]:
+        if self._last_seq <= seq:
+            return [], False
+        oldest = self._events[0][0]
+        if oldest > seq + 1:
+            return [], True
+        return [item for item in self._events if item[0] > seq], False
+
+    def _wait_after(self, seq: int, timeout: float) -> Tuple[List[Tuple[int, str, str]], bool]:
+        """Waits up to `timeout` for events after `seq`, then returns events_after(seq)."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_seq > seq, timeout)
+            return self._events_after(seq)
+
+    def stream(self, last_event_id: Optional[str]) -> '_EventStream':
+        """SSE response body. The caller must have reserved a slot with try_open_stream(); closing the body frees it."""
+        # Resolve the cursor now: the generator body only runs once the server starts sending
+        seq, must_reset = self.start_cursor(last_event_id)
+        return _EventStream(self, self._generate(seq, must_reset))
+
+    def _generate(self, seq: int, must_reset: bool) -> Iterator[str]:
+        yield 'retry: 3000\n\n'
+        if must_reset:
+            yield self.format_event(seq, RESET, '{}')
+        deadline = time.monotonic() + self.max_stream_seconds
+        while time.monotonic() < deadline:
+            events, gap = self._wait_after(seq, self.keepalive_seconds)
+            if gap:
+                seq = self.latest_seq()
+                yield self.format_event(seq, RESET, '{}')
+                continue
+            if not events:
+                yield ': keepalive\n\n'
+                continue
+            yield ''.join(self.format_event(*item) for item in events)
+            seq = events[-1][0]
+        # Ending periodically frees the server thread; EventSource reconnects with Last-Event-ID
+
+    def format_event(self, seq: int, event_type: str, payload: str) -> str:
+        return f'id: {self.epoch}-{seq}\nevent: {event_type}\ndata: {payload}\n\n'
+
+
+class _EventStream:
+    """Iterable SSE body whose close() (called by the WSGI server, even if never iterated) frees the stream slot."""
+
+    def __init__(self, bus: OpsEventBus, generator: Iterator[str]) -> None:
+        self._bus = bus
+        self._generator = generator
+        self._closed = False
+
+    def __iter__(self) -> Iterator[str]:
+        return self._generator
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._generator.close()
+            self._bus._close_stream()
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield list(items[start:start + size])
+
+
+def _register_session_listeners(bus: OpsEventBus) -> None:
+    """Non-PostgreSQL delivery: hold events on the session until its transaction commits."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+
+    def _after_commit(session: Session) -> None:
+        for event_type, payload in session.info.pop(_PENDING_KEY, ()):
+            bus._append(event_type, payload)
+
+    def _after_rollback(session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
+    _listeners_registered = True
+
+
+ops_events = OpsEventBus()
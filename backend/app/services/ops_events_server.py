@@ -0,0 +1,173 @@
+# backend/app/services/ops_events_server.py
+# -*- coding: utf-8 -*-
+"""
+Standalone asyncio server for the Ops Center event stream (GET /api/ops/events), started with
+`python run.py --events-server`. Every client is a coroutine on one event loop rather than a WSGI
+thread, so one process holds thousands of operators. It serves from this process's OpsEventBus,
+which receives the events of every web worker through PostgreSQL LISTEN/NOTIFY; a reverse proxy
+routes /api/ops/events here (or the frontend is built with VITE_OPS_EVENTS_URL pointing at it).
+"""
+import asyncio
+import json
+import signal
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from flask import Flask
+
+from ..utils.credential_cache import OPERATOR_KIND
+from ..utils.tokens import verify_access_token
+from .ops_events import RESET, OpsEventBus, ops_events
+
+EVENTS_PATH = '/api/ops/events'
+_MAX_HEADERS = 100
+_REASONS = {200: 'OK', 401: 'Unauthorized', 404: 'Not Found',
+            405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+
+class OpsEventServer:
+    """Serves the event stream of `bus` to any number of clients from the running event loop."""
+
+    def __init__(self, app: Flask, bus: OpsEventBus = ops_events) -> None:
+        self.app = app
+        self.bus = bus
+        self.max_streams = app.config['OPS_EVENTS_SERVER_MAX_STREAMS']
+        self.request_timeout = app.config['OPS_EVENTS_SERVER_REQUEST_TIMEOUT_SECONDS']
+        self.active_streams = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        # The bus appends on its LISTEN thread; hop onto the loop to wake the waiting clients
+        self.bus.add_waker(self._wake_threadsafe)
+        return await asyncio.start_server(self._handle, host, port, backlog=1024)
+
+    def detach(self) -> None:
+        """Stops being woken by the bus (once the loop is going away)."""
+        self.bus.remove_waker(self._wake_threadsafe)
+
+    def _wake_threadsafe(self) -> None:
+        self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        # One Event per batch of news: every waiting client holds the current one, a fresh one replaces it
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, target, headers = await asyncio.wait_for(_read_request(reader), self.request_timeout)
+            except (asyncio.TimeoutError, ValueError, asyncio.LimitOverrunError, asyncio.IncompleteReadError):
+                return
+            url = urlsplit(target)
+            if url.path != EVENTS_PATH:
+                await _send_error(writer, 404, "Not found.")
+                return
+            if method != 'GET':
+                await _send_error(writer, 405, "Method not allowed.")
+                return
+            query = parse_qs(url.query)
+            if not self._authorized(headers, query):
+                await _send_error(writer, 401, "Invalid or expired access token.")
+                return
+            if self.active_streams >= self.max_streams:
+                await _send_error(writer, 503, "Too many open event streams on this server. Retry shortly.")
+                return
+            self.active_streams += 1
+            try:
+                last_event_id = headers.get('last-event-id') or query.get('last_event_id', [None])[0]
+                await self._stream(writer, last_event_id)
+            finally:
+                self.active_streams -= 1
+        except ConnectionError:
+            pass # Client went away
+        finally:
+            writer.close()
+
+    def _authorized(self, headers: Dict[str, str], query: Dict[str, List[str]]) -> bool:
+        scheme, _, token = headers.get('authorization', '').partition(' ')
+        if scheme.lower() != 'bearer':
+            token = query.get('access_token', [''])[0]
+        if not token:
+            return False
+        with self.app.app_context():
+            return verify_access_token(token, expected_role=OPERATOR_KIND) is not None
+
+    async def _stream(self, writer: asyncio.StreamWriter, last_event_id: Optional[str]) -> None:
+        bus = self.bus
+        # Cursor first: write() may send at once, and an event published after the client sees the head must reach it
+        seq, must_reset = bus.start_cursor(last_event_id)
+        writer.write(_head(200, 'text/event-stream', {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}))
+        writer.write(b'retry: 3000\n\n')
+        if must_reset:
+            writer.write(bus.format_event(seq, RESET, '{}').encode('utf-8'))
+        deadline = self._loop.time() + bus.max_stream_seconds
+        while self._loop.time() < deadline:
+            changed = self._changed # Taken before reading, so an event appended meanwhile still wakes us
+            events, gap = bus.events_after(seq)
+            if gap:
+                seq = bus.latest_seq()
+                writer.write(bus.format_event(seq, RESET, '{}').encode('utf-8'))
+            elif events:
+                writer.write(''.join(bus.format_event(*item) for item in events).encode('utf-8'))
+                seq = events[-1][0]
+            else:
+                try:
+                    await asyncio.wait_for(changed.wait(), bus.keepalive_seconds)
+                    continue
+                except asyncio.TimeoutError:
+                    writer.write(b': keepalive\n\n')
+            await writer.drain()
+        # Ending periodically matches the WSGI route; EventSource reconnects with Last-Event-ID
+        await writer.drain()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+    """(method, target, lower-cased headers) of one HTTP/1.x request head. Raises ValueError if malformed."""
+    method, target, _ = (await reader.readuntil(b'\n')).decode('latin-1').split(' ', 2)
+    headers: Dict[str, str] = {}
+    for _ in range(_MAX_HEADERS):
+        line = (await reader.readuntil(b'\n')).decode('latin-1').strip()
+        if not line:
+            return method, target, headers
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    raise ValueError("Too many request headers.")
+
+
+def _head(status: int, content_type: str, extra: Optional[Dict[str, str]] = None) -> bytes:
+    lines = [f'HTTP/1.1 {status} {_REASONS[status]}', f'Content-Type: {content_type}', 'Connection: close',
+             'Access-Control-Allow-Origin: *'] # EventSource on the frontend's origin
+    lines.extend(f'{name}: {value}' for name, value in (extra or {}).items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def _send_error(writer: asyncio.StreamWriter, status: int, message: str) -> None:
+    body = json.dumps({'error': message}).encode('utf-8')
+    writer.write(_head(status, 'application/json', {'Content-Length': str(len(body))}) + body)
+    await writer.drain()
+
+
+def serve(app: Flask, host: str, port: int) -> None:
+    """Runs the event stream server until SIGINT/SIGTERM. The bus's LISTEN thread must be started by the caller."""
+    if not ops_events.use_notify:
+        app.logger.warning("Ops event server without PostgreSQL LISTEN/NOTIFY: it only sees events published "
+                           "in this process, i.e. none. Serve /api/ops/events from the web workers instead.")
+
+    async def main() -> None:
+        events_server = OpsEventServer(app)
+        server = await events_server.start(host, port)
+        app.logger.info(f"Ops event server listening on http://{host}:{port}{EVENTS_PATH}")
+        stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stopping.set)
+        await stopping.wait()
+        server.close() # Open streams are cancelled when asyncio.run() returns
+        events_server.detach()
+        app.logger.info("Ops event server stopped.")
+
+    asyncio.run(main())
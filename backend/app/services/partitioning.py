@@ -0,0 +1,167 @@
+# backend/app/services/partitioning.py
+# -*- coding: utf-8 -*-
+"""
+Monthly range partitioning of sold_beepers by purchase_timestamp (PostgreSQL only).
+
+Partitions are named sold_beepers_yYYYYmMM and cover [first of month, first of next month).
+A DEFAULT partition catches anything outside them, so an insert never fails for lack of a
+partition; ensure_sold_beeper_partitions() keeps the current and upcoming months created
+(at startup and via `flask db-partitions`, e.g. from cron).
+
+The primary key has to include the partition key, so it is (id, purchase_timestamp) and no
+longer makes id unique on its own. Each partition gets a unique index on id instead, which also
+serves the lookups by id (one index probe per partition, as they cannot be pruned). PostgreSQL
+cannot enforce uniqueness across partitions without the partition key: an id repeated in a
+different month would be accepted. The app never does that, as ids are UUIDv7 from uuid7().
+"""
+import datetime
+import logging
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+PARENT_TABLE = 'sold_beepers'
+DEFAULT_PARTITION = 'sold_beepers_default'
+
+# Same indexes as SoldBeeper.__table_args__; created on the parent they cascade to every partition
+_PARENT_INDEXES = (
+    ('ix_sold_beepers_status_purchase_ts', '(status, purchase_timestamp DESC)'),
+    ('ix_sold_beepers_user_purchase_ts', '(user_id, purchase_timestamp)'),
+    ('ix_sold_beepers_model_purchase_ts', '(model_id, purchase_timestamp)'),
+    ('ix_sold_beepers_purchase_ts_id', '(purchase_timestamp, id)'),
+)
+
+
+def _month_start(value: datetime.datetime) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def _add_months(month: datetime.date, count: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f'{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}'
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != 'postgresql':
+        return False
+    relkind = conn.execute(text(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = current_schema() AND c.relname = :name"
+    ), {'name': PARENT_TABLE}).scalar()
+    return relkind == 'p'
+
+
+def _existing_partitions(conn: Connection) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent JOIN pg_class child ON child.oid = i.inhrelid "
+        "JOIN pg_namespace n ON n.oid = parent.relnamespace "
+        "WHERE n.nspname = current_schema() AND parent.relname = :name"
+    ), {'name': PARENT_TABLE}).scalars())
+
+
+def _create_month_partition(conn: Connection, month: datetime.date) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    ))
+    _create_id_index(conn, partition_name(month))
+
+
+def _create_id_index(conn: Connection, partition: str, concurrently: bool = False) -> None:
+    # Per partition only: a unique index on the partitioned parent must contain purchase_timestamp
+    conn.execute(text(
+        f"CREATE UNIQUE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {partition}_id_key "
+        f"ON {partition} (id)"
+    ))
+
+
+def ensure_partition_id_indexes(conn: Connection) -> None:
+    """
+    Adds the unique index on id to every partition lacking it, CONCURRENTLY, so `conn` must be in
+    autocommit mode. Does nothing unless sold_beepers is partitioned.
+    """
+    if not is_partitioned(conn):
+        return
+    for partition in _existing_partitions(conn):
+        _create_id_index(conn, partition, concurrently=True)
+
+
+def ensure_sold_beeper_partitions(engine: Engine, months_ahead: int, logger: logging.Logger,
+                                  now: Optional[datetime.datetime] = None) -> List[str]:
+    """
+    Creates any missing partitions from the current month through `months_ahead` months ahead.
+    Returns the names created. Does nothing unless sold_beepers is partitioned.
+    """
+    current = _month_start(now or datetime.datetime.now(datetime.timezone.utc))
+    created: List[str] = []
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return created
+        existing = set(_existing_partitions(conn))
+    for offset in range(months_ahead + 1):
+        month = _add_months(current, offset)
+        if partition_name(month) in existing:
+            continue # Checked first: CREATE ... PARTITION OF locks the parent even when the table exists
+        try:
+            with engine.begin() as conn:
+                _create_month_partition(conn, month)
+            created.append(partition_name(month))
+        except Exception as e:
+            # E.g. another worker created it concurrently, or rows for that month already sit in the default partition
+            logger.warning(f"Could not create partition {partition_name(month)}: {str(e)}")
+    if created:
+        logger.info(f"Created sold_beepers partitions: {', '.join(created)}")
+    return created
+
+
+def convert_sold_beepers_to_partitioned(conn: Connection, months_ahead: int) -> None:
+    """
+    Rebuilds sold_beepers as a table partitioned by month, inside the caller's transaction.
+    The primary key becomes (id, purchase_timestamp), as PostgreSQL requires the partition key in it;
+    id stays unique within each partition only (see the module docstring). Rows without a purchase_timestamp (none are written by the app) are kept with the Unix epoch.
+    Copies every row under an exclusive lock, so run it in a maintenance window on large tables.
+    """
+    if conn.dialect.name != 'postgresql' or is_partitioned(conn):
+        return
+    conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(
+        "CREATE TABLE sold_beepers_partitioned ("
+        "id uuid NOT NULL, "
+        "model_id integer NOT NULL REFERENCES beeper_models (id), "
+        "purchase_timestamp timestamp without time zone NOT NULL, "
+        "status varchar(20) NOT NULL, "
+        "user_id integer NOT NULL REFERENCES users (id)"
+        ") PARTITION BY RANGE (purchase_timestamp)"
+    ))
+    bounds = conn.execute(text(
+        f"SELECT min(purchase_timestamp), max(purchase_timestamp) FROM {PARENT_TABLE}"
+    )).one()
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    first = _month_start(bounds[0] or now)
+    last = _add_months(_month_start(max(bounds[1] or now, now)), months_ahead)
+    month = first
+    while month <= last:
+        conn.execute(text(
+            f"CREATE TABLE {partition_name(month)} PARTITION OF sold_beepers_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        ))
+        month = _add_months(month, 1)
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF sold_beepers_partitioned DEFAULT"))
+    conn.execute(text(
+        "INSERT INTO sold_beepers_partitioned (id, model_id, purchase_timestamp, status, user_id) "
+        f"SELECT id, model_id, coalesce(purchase_timestamp, 'epoch'), status, user_id FROM {PARENT_TABLE}"
+    ))
+    conn.execute(text(f"DROP TABLE {PARENT_TABLE}")) # Frees the constraint and index names for the new parent
+    conn.execute(text(f"ALTER TABLE sold_beepers_partitioned RENAME TO {PARENT_TABLE}"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT sold_beepers_pkey PRIMARY KEY (id, purchase_timestamp)"))
+    for partition in _existing_partitions(conn):
+        _create_id_index(conn, partition)
+    for name, columns in _PARENT_INDEXES:
+        conn.execute(text(f"CREATE INDEX {name} ON {PARENT_TABLE} {columns}"))
+    conn.execute(text(f"ANALYZE {PARENT_TABLE}"))
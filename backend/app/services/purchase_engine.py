@@ -0,0 +1,80 @@
+# backend/app/services/purchase_engine.py
+# -*- coding: utf-8 -*-
+import datetime
+from dataclasses import dataclass, field
+from typing import List, NamedTuple
+
+from sqlalchemy import DateTime, Integer, delete, insert, text
+
+from .. import db
+from ..models import CartItem, SoldBeeper
+from ..utils.guid import GUID, PG_UUID7_SQL, uuid7
+from .sold_beeper_stats import record_purchased_units
+
+# PostgreSQL: expand every cart line into its units server-side and insert them in one statement,
+# so no per-unit objects or UUIDs are built in Python (ids are UUIDv7, generated in SQL).
+_PG_BULK_INSERT_SQL = text(f"""
+    INSERT INTO sold_beepers (id, model_id, user_id, status, purchase_timestamp)
+    SELECT {PG_UUID7_SQL}, line.model_id, :user_id, 'active', :purchase_timestamp
+    FROM unnest(CAST(:model_ids AS integer[]), CAST(:quantities AS integer[])) AS line(model_id, quantity)
+    CROSS JOIN LATERAL generate_series(1, line.quantity)
+    RETURNING id, model_id, purchase_timestamp
+""").columns(id=GUID(), model_id=Integer(), purchase_timestamp=DateTime()) # Typed so ids come back as strings
+
+
+class PurchasedUnit(NamedTuple):
+    id: str
+    model_id: int
+    purchase_timestamp: datetime.datetime
+
+
+@dataclass
+class PurchaseResult:
+    """Outcome of checking out a user's cart."""
+    cart_lines_count: int = 0
+    units: List[PurchasedUnit] = field(default_factory=list)
+
+    @property
+    def units_count(self) -> int:
+        return len(self.units)
+
+
+def purchase_cart(user_id: int) -> PurchaseResult:
+    """
+    Converts the user's whole cart into SoldBeeper units inside the current transaction.
+
+    The cart is claimed with DELETE ... RETURNING first, so two concurrent checkouts of the
+    same cart cannot both succeed. All units are then inserted with a single multi-row
+    INSERT ... RETURNING id, model_id, purchase_timestamp, which also feeds the stats rollup.
+    The caller commits or rolls back.
+    Returns an empty result if the cart was empty.
+    """
+    cart_lines = db.session.execute(
+        delete(CartItem).where(CartItem.user_id == user_id).returning(CartItem.model_id, CartItem.quantity),
+        execution_options={'synchronize_session': False}
+    ).all()
+    result = PurchaseResult(cart_lines_count=len(cart_lines))
+    if not cart_lines:
+        return result
+
+    purchase_timestamp = datetime.datetime.now(datetime.timezone.utc)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        rows = db.session.execute(_PG_BULK_INSERT_SQL, {
+            'user_id': user_id,
+            'purchase_timestamp': purchase_timestamp,
+            'model_ids': [line.model_id for line in cart_lines],
+            'quantities': [line.quantity for line in cart_lines]
+        })
+    else:
+        # Other backends: SQLAlchemy batches these parameter sets into multi-row VALUES ("insertmanyvalues")
+        unit_rows = [
+            {'id': str(uuid7()), 'model_id': line.model_id, 'user_id': user_id,
+             'status': 'active', 'purchase_timestamp': purchase_timestamp}
+            for line in cart_lines for _ in range(line.quantity)
+        ]
+        rows = db.session.execute(
+            insert(SoldBeeper).returning(SoldBeeper.id, SoldBeeper.model_id, SoldBeeper.purchase_timestamp), unit_rows
+        )
+    result.units = [PurchasedUnit(row.id, row.model_id, row.purchase_timestamp) for row in rows]
+    record_purchased_units((unit.model_id, unit.purchase_timestamp) for unit in result.units)
+    return result
@@ -0,0 +1,144 @@
+# backend/app/services/sold_beeper_stats.py
+# -*- coding: utf-8 -*-
+"""
+Incremental rollup behind /api/ops/stats.
+
+sold_beeper_stats holds counters per (model_id, status, purchase hour). Purchases add to the
+'active' counter of their hour; activations move units from 'active' to 'activated' in the hour
+they were purchased. Both happen in the transaction that changes sold_beepers, so the rollup is
+exactly as committed as the units themselves. rebuild_stats() recomputes it from scratch
+(migration backfill and `flask stats-rebuild`).
+
+The price is a row lock held until commit: every checkout of one model in the same hour updates
+the same counter, so with a single row per key a hot model's purchases would commit one at a
+time on PostgreSQL. Each key is therefore split over OPS_STATS_ROLLUP_SHARDS rows and every
+upsert picks one at random; readers sum the shards (a shard alone may even go negative when an
+activation lands on a different one than the purchase). Concurrent checkouts of one model only
+wait for each other when they pick the same shard.
+"""
+import datetime
+import random
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import delete, func, inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+from .. import db
+from ..models import BeeperModel, SoldBeeperStat
+
+StatKey = Tuple[int, str, datetime.datetime] # (model_id, status, purchase hour)
+
+
+def hour_bucket(timestamp: datetime.datetime) -> datetime.datetime:
+    """Truncates to the hour as a naive UTC datetime, the way purchase_timestamp is stored."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def apply_stat_deltas(deltas: Dict[StatKey, int]) -> None:
+    """Adds `deltas` to one randomly picked shard of the rollup with one multi-row upsert, in the current transaction."""
+    shard = random.randrange(max(1, current_app.config.get('OPS_STATS_ROLLUP_SHARDS', 8)))
+    rows = [{'model_id': model_id, 'status': status, 'purchase_hour': hour, 'shard': shard, 'unit_count': delta}
+            for (model_id, status, hour), delta in sorted(deltas.items()) if delta] # Fixed order: no lock-order deadlocks
+    if not rows:
+        return
+    dialect_insert = postgresql.insert if db.session.get_bind().dialect.name == 'postgresql' else sqlite.insert
+    statement = dialect_insert(SoldBeeperStat).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[SoldBeeperStat.model_id, SoldBeeperStat.status, SoldBeeperStat.purchase_hour,
+                        SoldBeeperStat.shard],
+        set_={'unit_count': SoldBeeperStat.unit_count + statement.excluded.unit_count}
+    )
+    db.session.execute(statement)
+
+
+def record_purchased_units(units: Iterable[Tuple[int, Optional[datetime.datetime]]]) -> None:
+    """Counts newly inserted (model_id, purchase_timestamp) units as active."""
+    deltas: Dict[StatKey, int] = Counter()
+    for model_id, purchase_timestamp in units:
+        if purchase_timestamp is not None:
+            deltas[(model_id, 'active', hour_bucket(purchase_timestamp))] += 1
+    apply_stat_deltas(deltas)
+
+
+def record_activated_units(units: Iterable[Tuple[int, Optional[datetime.datetime]]]) -> None:
+    """Moves (model_id, purchase_timestamp) units that went active -> activated."""
+    deltas: Dict[StatKey, int] = Counter()
+    for model_id, purchase_timestamp in units:
+        if purchase_timestamp is not None:
+            hour = hour_bucket(purchase_timestamp)
+            deltas[(model_id, 'active', hour)] -= 1
+            deltas[(model_id, 'activated', hour)] += 1
+    apply_stat_deltas(deltas)
+
+
+def _hour_expression(conn: Connection) -> str:
+    if conn.dialect.name == 'postgresql':
+        return "date_trunc('hour', purchase_timestamp)"
+    # Same text format SQLAlchemy writes for DateTime on SQLite, so upserts hit the backfilled rows
+    return "strftime('%Y-%m-%d %H:00:00.000000', purchase_timestamp)"
+
+
+def rebuild_stats(conn: Connection) -> None:
+    """Recomputes the whole rollup from sold_beepers and its archive on `conn` (one full scan, run in a transaction)."""
+    if conn.dialect.name == 'postgresql':
+        # Holds off purchases/activations until commit, so no delta is lost between the delete and the scan
+        conn.execute(text("LOCK TABLE sold_beepers IN SHARE MODE"))
+    conn.execute(delete(SoldBeeperStat))
+    hour = _hour_expression(conn)
+    units = "SELECT model_id, status, purchase_timestamp FROM sold_beepers"
+    if inspect(conn).has_table('sold_beepers_archive'): # Archived units still count as sold
+        units += " UNION ALL SELECT model_id, status, purchase_timestamp FROM sold_beepers_archive"
+    conn.execute(text(
+        f"INSERT INTO sold_beeper_stats (model_id, status, purchase_hour, shard, unit_count) "
+        f"SELECT model_id, status, {hour}, 0, COUNT(*) FROM ({units}) AS units "
+        f"WHERE purchase_timestamp IS NOT NULL GROUP BY model_id, status, {hour}"
+    ))
+
+
+def query_stats(granularity: str, since: datetime.datetime, until: datetime.datetime,
+                model_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Reads /api/ops/stats from the rollup: all-time counts per model and status, plus units purchased
+    per `granularity` ('hour' or 'day') in [since, until).
+    """
+    by_model_query = select(SoldBeeperStat.model_id, BeeperModel.name, SoldBeeperStat.status,
+                            func.sum(SoldBeeperStat.unit_count))\
+        .join(BeeperModel, BeeperModel.id == SoldBeeperStat.model_id)\
+        .group_by(SoldBeeperStat.model_id, BeeperModel.name, SoldBeeperStat.status)\
+        .order_by(SoldBeeperStat.model_id, SoldBeeperStat.status)
+    series_query = select(SoldBeeperStat.purchase_hour, func.sum(SoldBeeperStat.unit_count))\
+        .where(SoldBeeperStat.purchase_hour >= hour_bucket(since), SoldBeeperStat.purchase_hour < until)\
+        .group_by(SoldBeeperStat.purchase_hour)\
+        .order_by(SoldBeeperStat.purchase_hour)
+    if model_id is not None:
+        by_model_query = by_model_query.where(SoldBeeperStat.model_id == model_id)
+        series_query = series_query.where(SoldBeeperStat.model_id == model_id)
+
+    by_model_status: List[Dict[str, Any]] = []
+    totals_by_status: Dict[str, int] = Counter()
+    for row_model_id, model_name, status, count in db.session.execute(by_model_query):
+        if not count:
+            continue # Every unit of this model/status has moved on
+        by_model_status.append({'model_id': row_model_id, 'model_name': model_name, 'status': status, 'count': int(count)})
+        totals_by_status[status] += int(count)
+
+    purchases: Dict[datetime.datetime, int] = Counter()
+    for hour, count in db.session.execute(series_query):
+        period = hour.replace(hour=0) if granularity == 'day' else hour
+        purchases[period] += int(count)
+
+    return {
+        'by_model_status': by_model_status,
+        'totals_by_status': dict(totals_by_status),
+        'total_units': sum(totals_by_status.values()),
+        'purchases': [{'period': period.isoformat(), 'count': count}
+                      for period, count in sorted(purchases.items()) if count],
+        'granularity': granularity,
+        'since': hour_bucket(since).isoformat(),
+        'until': until.isoformat()
+    }
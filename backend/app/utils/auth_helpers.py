@@ -4,17 +4,48 @@ from flask import request, jsonify, current_app, Response as FlaskResponse # Exp
 from functools import wraps
 from typing import Callable, Optional, Union # For type hinting
 from ..models import User, Operator # Import User and Operator models
+from .. import db
+from .credential_cache import credential_cache, USER_KIND, OPERATOR_KIND
+from .tokens import TokenPrincipal, password_fingerprint, verify_access_token
+from .password_hashing import password_hasher
+from .rate_limit import login_rate_limiter
+
+def _upgrade_password_hash(principal: Union[User, Operator], password_plaintext: str) -> None:
+    """Rehashes a just-verified password if its stored hash predates PASSWORD_HASH_METHOD."""
+    if not password_hasher.needs_rehash(principal.password_hash):
+        return
+    try:
+        principal.set_password(password_plaintext)
+        db.session.commit()
+        current_app.logger.info(f"Upgraded password hash for {type(principal).__name__.lower()} '{principal.username}'.")
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f"Could not upgrade password hash for '{principal.username}': {str(e)}")
 
 # --- Credential Checking Functions ---
 def check_user_credentials(username_or_email: str, password_plaintext: str) -> Optional[User]:
     """
     Authenticates a shop user by checking username/email and password against the database.
     Returns the User object if successful, None otherwise.
+    Recently verified credentials are served from the credential cache (primary key lookup only).
     """
+    cached = credential_cache.get(USER_KIND, username_or_email, password_plaintext)
+    if cached is not None:
+        cached_user: Optional[User] = db.session.get(User, cached.principal_id)
+        if cached_user is not None and username_or_email in (cached_user.username, cached_user.email) \
+                and password_fingerprint(cached_user.password_hash) == cached.fingerprint:
+            return cached_user
+        # Deleted, renamed or re-passworded, possibly by another worker process: drop stale entries
+        credential_cache.invalidate_principal(USER_KIND, cached.principal_id)
+
+    login_rate_limiter.check(USER_KIND, username_or_email) # Raises RateLimitExceeded (429) before any hashing
     user: Optional[User] = User.query.filter(
         (User.username == username_or_email) | (User.email == username_or_email)
     ).first()
     if user and user.check_password(password_plaintext): # check_password handles hashed password
+        _upgrade_password_hash(user, password_plaintext)
+        credential_cache.put(USER_KIND, username_or_email, password_plaintext, user.id,
+                             password_fingerprint(user.password_hash))
         return user
     current_app.logger.debug(f"User credential check failed for: {username_or_email}")
     return None
@@ -23,14 +54,26 @@ def check_operator_credentials(username: str, password_plaintext: str) -> Option
     """
     Authenticates an operator by checking username and password against the database.
     Returns the Operator object if successful, None otherwise.
+    Recently verified credentials are served from the credential cache (primary key lookup only).
     """
+    cached = credential_cache.get(OPERATOR_KIND, username, password_plaintext)
+    if cached is not None:
+        cached_op: Optional[Operator] = db.session.get(Operator, cached.principal_id)
+        if cached_op is not None and cached_op.username == username \
+                and password_fingerprint(cached_op.password_hash) == cached.fingerprint:
+            return cached_op
+        credential_cache.invalidate_principal(OPERATOR_KIND, cached.principal_id)
+
+    login_rate_limiter.check(OPERATOR_KIND, username)
     op: Optional[Operator] = Operator.query.filter_by(username=username).first()
     if op and op.check_password(password_plaintext): # check_password handles hashed password
+        _upgrade_password_hash(op, password_plaintext)
+        credential_cache.put(OPERATOR_KIND, username, password_plaintext, op.id, password_fingerprint(op.password_hash))
         return op
     current_app.logger.debug(f"Operator credential check failed for: {username}")
     return None
 
-# --- Decorators for Protected Routes (Using Basic Auth from request) ---
+# --- Decorators for Protected Routes (Bearer access token, or Basic Auth from request) ---
 # Type alias for the decorated function's expected return type
 RouteResponse = Union[FlaskResponse, tuple[FlaskResponse, int]]
 DecoratedRoute = Callable[..., RouteResponse]
@@ -38,12 +81,21 @@ DecoratedRoute = Callable[..., RouteResponse]
 
 def user_basic_auth_required(f: DecoratedRoute) -> DecoratedRoute:
     """
-    Decorator for routes requiring shop user login via Basic Authentication.
-    Injects `current_user_obj: User` into the decorated function's kwargs.
+    Decorator for routes requiring shop user login via a Bearer access token or Basic Authentication.
+    Injects `current_user_obj` into the decorated function's kwargs: a TokenPrincipal for
+    Bearer tokens (verified without touching the database) or a User for Basic Auth.
     """
     @wraps(f)
     def decorated_function(*args, **kwargs) -> RouteResponse: # Use Any for args/kwargs in decorator
         auth = request.authorization
+        if auth and auth.type == 'bearer':
+            claims = verify_access_token(auth.token or '', expected_role=USER_KIND)
+            if claims is None:
+                current_app.logger.warning("User auth failed: Invalid or expired access token.")
+                return jsonify({"error": "Invalid or expired access token."}), 401
+            kwargs['current_user_obj'] = TokenPrincipal(User, claims)
+            return f(*args, **kwargs)
+
         if not auth or not auth.username or not auth.password:
             current_app.logger.warning("User auth failed: Missing Basic Auth credentials.")
             return jsonify({"error": "Authentication required. Please provide username and password."}), 401
@@ -57,14 +109,39 @@ def user_basic_auth_required(f: DecoratedRoute) -> DecoratedRoute:
         return f(*args, **kwargs)
     return decorated_function
 
+def allow_query_token(f: DecoratedRoute) -> DecoratedRoute:
+    """
+    Marks a route (below the auth decorator) as accepting its access token as ?access_token=,
+    for clients such as EventSource that cannot set headers. Keep to streaming endpoints:
+    tokens in URLs end up in access logs.
+    """
+    f.allow_query_token = True # type: ignore[attr-defined]
+    return f
+
+def _query_access_token(f: DecoratedRoute) -> Optional[str]:
+    if getattr(f, 'allow_query_token', False) and not request.authorization:
+        return request.args.get('access_token')
+    return None
+
 def operator_basic_auth_required(f: DecoratedRoute) -> DecoratedRoute:
     """
-    Decorator for routes requiring operator login via Basic Authentication.
-    Injects `current_operator_obj: Operator` into the decorated function's kwargs.
+    Decorator for routes requiring operator login via a Bearer access token or Basic Authentication.
+    Injects `current_operator_obj` into the decorated function's kwargs: a TokenPrincipal for
+    Bearer tokens (verified without touching the database) or an Operator for Basic Auth.
     """
     @wraps(f)
     def decorated_function(*args, **kwargs) -> RouteResponse: # Use Any for args/kwargs in decorator
         auth = request.authorization
+        query_token = _query_access_token(f)
+        if query_token is not None or (auth and auth.type == 'bearer'):
+            token = query_token if query_token is not None else auth.token
+            claims = verify_access_token(token or '', expected_role=OPERATOR_KIND)
+            if claims is None:
+                current_app.logger.warning("Operator auth failed: Invalid or expired access token.")
+                return jsonify({"error": "Invalid or expired access token."}), 401
+            kwargs['current_operator_obj'] = TokenPrincipal(Operator, claims)
+            return f(*args, **kwargs)
+
         if not auth or not auth.username or not auth.password:
             current_app.logger.warning("Operator auth failed: Missing Basic Auth credentials.")
             return jsonify({"error": "Operator authentication required. Please provide username and password."}), 401
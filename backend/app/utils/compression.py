@@ -0,0 +1,166 @@
+# backend/app/utils/compression.py
+# -*- coding: utf-8 -*-
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError: # Optional: 'br' is simply not offered without it
+    brotli = None
+
+try:
+    import zstandard
+except ImportError: # Optional: 'zstd' is simply not offered without it
+    zstandard = None
+
+# Text formats the API produces. Everything else (text/event-stream, application/gzip exports,
+# images, ...) is passed through untouched.
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html',
+))
+
+# Highest levels, for bodies that are compressed once and then served many times (catalog snapshots)
+MAX_LEVELS = {'gzip': 9, 'br': 11, 'zstd': 19}
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31) # wbits=31: gzip header and trailer
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        compressed = self._compressor.compress(data)
+        return compressed + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else compressed
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        compressed = self._compressor.process(data)
+        return compressed + self._compressor.flush() if flush else compressed
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        compressed = self._compressor.compress(data)
+        return compressed + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else compressed
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+_ENCODERS: Dict[str, Any] = {'gzip': _GzipEncoder}
+if brotli is not None:
+    _ENCODERS['br'] = _BrotliEncoder
+if zstandard is not None:
+    _ENCODERS['zstd'] = _ZstdEncoder
+
+
+def iter_compressed(chunks: Iterable[Any], encoding: str, level: int) -> Iterator[bytes]:
+    """
+    Compresses a stream of str/bytes chunks with `encoding` ('gzip', or 'br'/'zstd' if installed),
+    flushing after each chunk so the client receives data as soon as it is produced.
+    """
+    encoder = _ENCODERS[encoding](level)
+    for chunk in chunks:
+        compressed = encoder.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk, flush=True)
+        if compressed:
+            yield compressed
+    yield encoder.finish()
+
+
+class _CompressedStream:
+    """A streamed response body compressed by iter_compressed, passing close() on to the wrapped body."""
+
+    def __init__(self, chunks: Iterable[Any], encoding: str, level: int) -> None:
+        self._chunks = chunks
+        self._encoding = encoding
+        self._level = level
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter_compressed(self._chunks, self._encoding, self._level)
+
+    def close(self) -> None:
+        # Called by the WSGI server even if iteration never started; the wrapped body may hold a request context
+        close = getattr(self._chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class ResponseCompressor:
+    """
+    Compresses API responses with gzip, brotli ('br') or zstd, negotiated from Accept-Encoding
+    (server preference order from COMPRESSION_ALGORITHMS breaks ties). Bodies below
+    COMPRESSION_MIN_SIZE, non-text types and responses that already carry a Content-Encoding are
+    left alone. Streamed bodies are compressed incrementally.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.algorithms: List[str] = ['gzip']
+        self.min_size = 1024
+        self.levels = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+    def init_app(self, app: Flask) -> None:
+        self.enabled = app.config.get('COMPRESSION_ENABLED', True)
+        configured = app.config.get('COMPRESSION_ALGORITHMS', ['br', 'zstd', 'gzip'])
+        self.algorithms = [name for name in configured if name in _ENCODERS]
+        unavailable = [name for name in configured if name not in _ENCODERS]
+        if unavailable:
+            app.logger.info(f"Response compression: {', '.join(unavailable)} not available (package not installed).")
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', self.min_size)
+        self.levels = {'gzip': app.config.get('COMPRESSION_LEVEL_GZIP', self.levels['gzip']),
+                       'br': app.config.get('COMPRESSION_LEVEL_BR', self.levels['br']),
+                       'zstd': app.config.get('COMPRESSION_LEVEL_ZSTD', self.levels['zstd'])}
+        if self.enabled:
+            app.after_request(self._after_request)
+        app.extensions['response_compressor'] = self
+
+    def negotiate(self) -> Optional[str]:
+        """The encoding to use for the current request, or None to send the body as it is."""
+        if not self.enabled or not self.algorithms:
+            return None
+        return request.accept_encodings.best_match(self.algorithms)
+
+    def compress(self, data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+        encoder = _ENCODERS[encoding](self.levels[encoding] if level is None else level)
+        return encoder.compress(data, flush=False) + encoder.finish()
+
+    def _after_request(self, response: Response) -> Response:
+        if request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304) \
+                or response.direct_passthrough or 'Content-Encoding' in response.headers \
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES \
+                or 'no-transform' in response.headers.get('Cache-Control', ''):
+            return response
+        response.vary.add('Accept-Encoding')
+        if not response.is_streamed and (response.content_length or 0) < self.min_size:
+            return response
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _CompressedStream(response.response, encoding, self.levels[encoding])
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(self.compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak: # The compressed bytes differ, so a strong validator no longer holds
+            response.set_etag(etag, weak=True)
+        return response
+
+
+response_compressor = ResponseCompressor()
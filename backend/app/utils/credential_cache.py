@@ -0,0 +1,171 @@
+# backend/app/utils/credential_cache.py
+# -*- coding: utf-8 -*-
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Set, Tuple
+
+from flask import Flask
+from sqlalchemy import event
+
+# Principal kinds understood by the cache. Keeps user and operator entries apart even
+# when a user and an operator happen to share a username and password.
+USER_KIND = 'user'
+OPERATOR_KIND = 'operator'
+
+PrincipalKey = Tuple[str, int]  # (kind, principal id)
+
+
+class CachedCredential(NamedTuple):
+    principal_id: int
+    fingerprint: str # tokens.password_fingerprint of the password hash the credentials were verified against
+
+
+class CredentialCache:
+    """
+    Bounded, TTL-based cache of recently verified Basic Auth credentials.
+
+    Entries are keyed by an HMAC-SHA256 digest of (kind, identifier, password) using the
+    app's SECRET_KEY, so plaintext passwords are never held in memory by the cache.
+    A hit maps straight to the principal's primary key, letting the auth helpers skip
+    the PBKDF2 check entirely. Model events drop a principal's entries when its password,
+    username or email changes or the row is deleted, but only in the process making the
+    change; other worker processes notice on their next hit, as the auth helpers reload the
+    row and reject an entry whose password fingerprint no longer matches it.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 300) -> None:
+        self.enabled = True
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._secret = b''
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[PrincipalKey, str, float]]" = OrderedDict()
+        self._by_principal: Dict[PrincipalKey, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, app: Flask) -> None:
+        self.enabled = app.config.get('CREDENTIAL_CACHE_ENABLED', True)
+        self.max_entries = app.config.get('CREDENTIAL_CACHE_MAX_ENTRIES', self.max_entries)
+        self.ttl_seconds = app.config.get('CREDENTIAL_CACHE_TTL_SECONDS', self.ttl_seconds)
+        self._secret = str(app.config['SECRET_KEY']).encode('utf-8')
+        self.clear()
+        _register_invalidation_listeners(self)
+        app.extensions['credential_cache'] = self
+
+    def _digest(self, kind: str, identifier: str, password: str) -> str:
+        message = '\x00'.join((kind, identifier, password)).encode('utf-8')
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def get(self, kind: str, identifier: str, password: str) -> Optional[CachedCredential]:
+        """Returns the cached principal id and password fingerprint for a credential pair, or None on a miss."""
+        if not self.enabled:
+            return None
+        digest = self._digest(kind, identifier, password)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal_key, fingerprint, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(digest)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return CachedCredential(principal_key[1], fingerprint)
+
+    def put(self, kind: str, identifier: str, password: str, principal_id: int, fingerprint: str) -> None:
+        """Records a credential pair that has just been verified against the database."""
+        if not self.enabled or self.max_entries <= 0:
+            return
+        digest = self._digest(kind, identifier, password)
+        principal_key = (kind, principal_id)
+        with self._lock:
+            if digest in self._entries:
+                self._remove(digest)
+            self._entries[digest] = (principal_key, fingerprint, time.monotonic() + self.ttl_seconds)
+            self._by_principal.setdefault(principal_key, set()).add(digest)
+            while len(self._entries) > self.max_entries:
+                oldest_digest = next(iter(self._entries))
+                self._remove(oldest_digest)
+                self.evictions += 1
+
+    def invalidate_principal(self, kind: str, principal_id: Optional[int]) -> None:
+        """Drops every cached credential pair that resolves to the given principal."""
+        if principal_id is None:
+            return
+        with self._lock:
+            digests = self._by_principal.pop((kind, principal_id), set())
+            for digest in digests:
+                self._entries.pop(digest, None)
+            self.invalidations += len(digests)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_principal.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def _remove(self, digest: str) -> None:
+        # Caller must hold self._lock
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        principal_digests = self._by_principal.get(entry[0])
+        if principal_digests is not None:
+            principal_digests.discard(digest)
+            if not principal_digests:
+                del self._by_principal[entry[0]]
+
+
+credential_cache = CredentialCache()
+
+_listeners_registered = False
+
+
+def _register_invalidation_listeners(cache: CredentialCache) -> None:
+    """Hooks model events so password/identity changes and deletes evict cached credentials."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from ..models import User, Operator
+
+    def _on_identity_change(kind: str):
+        def handler(target: Any, value: Any, oldvalue: Any, initiator: Any) -> None:
+            if value != oldvalue:
+                cache.invalidate_principal(kind, target.id)
+        return handler
+
+    def _on_delete(kind: str):
+        def handler(mapper: Any, connection: Any, target: Any) -> None:
+            cache.invalidate_principal(kind, target.id)
+        return handler
+
+    for attribute in (User.password_hash, User.username, User.email):
+        event.listen(attribute, 'set', _on_identity_change(USER_KIND))
+    for attribute in (Operator.password_hash, Operator.username):
+        event.listen(attribute, 'set', _on_identity_change(OPERATOR_KIND))
+    event.listen(User, 'after_delete', _on_delete(USER_KIND))
+    event.listen(Operator, 'after_delete', _on_delete(OPERATOR_KIND))
+    _listeners_registered = True
@@ -0,0 +1,152 @@
+# backend/app/utils/db_pool.py
+# -*- coding: utf-8 -*-
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Mapping, Optional
+
+from flask import Flask
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+
+# QueuePool keyword arguments that NullPool (PgBouncer transaction mode) does not accept
+_QUEUE_POOL_ONLY_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_use_lifo')
+
+
+class PoolCounters:
+    """Counters for one engine's connection pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class PoolMetrics:
+    """
+    Process-local connection pool counters (each pre-fork worker has its own pools), kept per pool
+    so the primary and every read replica bind are reported separately.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: 'weakref.WeakKeyDictionary[Pool, PoolCounters]' = weakref.WeakKeyDictionary()
+
+    def counters(self, pool: Pool) -> PoolCounters:
+        counters = self._counters.get(pool)
+        if counters is None:
+            with self._lock:
+                counters = self._counters.setdefault(pool, PoolCounters())
+        return counters
+
+    def snapshot(self, engine: Engine) -> Dict[str, Any]:
+        pool = engine.pool
+        counters = self.counters(pool)
+        with counters._lock:
+            stats: Dict[str, Any] = {
+                'pid': os.getpid(),
+                'pool_class': type(pool).__name__,
+                'checkouts': counters.checkouts,
+                'wait_seconds_total': round(counters.wait_seconds_total, 6),
+                'wait_seconds_avg': round(counters.wait_seconds_total / counters.checkouts, 6) if counters.checkouts else None,
+                'wait_seconds_max': round(counters.wait_seconds_max, 6),
+                'timeouts': counters.timeouts,
+                'connects': counters.connects,
+                'invalidations': counters.invalidations
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0) # Negative while the pool is still filling up
+            })
+        return stats
+
+    def snapshot_all(self, engines: Mapping[Optional[str], Engine]) -> Dict[str, Dict[str, Any]]:
+        """snapshot() of every engine (Flask-SQLAlchemy's db.engines), keyed by bind name; the primary is 'default'."""
+        return {engine_label(bind_key): self.snapshot(engine) for bind_key, engine in engines.items()}
+
+
+def engine_label(bind_key: Optional[str]) -> str:
+    return bind_key or 'default'
+
+
+pool_metrics = PoolMetrics()
+_instrumented_engines: 'weakref.WeakSet[Engine]' = weakref.WeakSet()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    # Log under sqlalchemy.pool like the stock pools, not as a child of the Flask app logger
+    _sqla_logger_namespace = 'sqlalchemy.pool.impl.InstrumentedQueuePool'
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.counters(self).increment('timeouts')
+            raise
+        pool_metrics.counters(self).record_wait(time.perf_counter() - started)
+        return connection
+
+
+def configure_engine_options(app: Flask) -> None:
+    """
+    Finalises SQLALCHEMY_ENGINE_OPTIONS before db.init_app: picks the pool class and drops
+    options it does not accept. In-memory SQLite keeps Flask-SQLAlchemy's own pool setup.
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if uri.startswith('sqlite') and (uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+        return
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if app.config.get('DB_PGBOUNCER_TRANSACTION_MODE'):
+        # PgBouncer owns pooling: hold no idle connections here, so server connections return to it after each use
+        for key in _QUEUE_POOL_ONLY_OPTIONS:
+            options.pop(key, None)
+        options['poolclass'] = NullPool
+        options['pool_pre_ping'] = False # Every checkout is already a fresh PgBouncer client connection
+    else:
+        options['poolclass'] = InstrumentedQueuePool
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def register_pool_listeners(engine: Engine) -> None:
+    """Counts new DBAPI connections and invalidations (e.g. pre-ping finding a connection dead after a restart)."""
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(engine)
+
+    # engine.pool is looked up on every event: dispose() (e.g. after fork) swaps in a new pool
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        pool_metrics.counters(engine.pool).increment('connects')
+
+    def on_invalidate(dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        pool_metrics.counters(engine.pool).increment('invalidations')
+
+    def on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        pool_metrics.counters(engine.pool).record_wait(0.0)
+
+    event.listen(engine, 'connect', on_connect)
+    event.listen(engine, 'invalidate', on_invalidate)
+    if not isinstance(engine.pool, InstrumentedQueuePool):
+        event.listen(engine, 'checkout', on_checkout) # Still count checkouts without wait timing
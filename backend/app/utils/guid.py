@@ -0,0 +1,83 @@
+# backend/app/utils/guid.py
+# -*- coding: utf-8 -*-
+import os
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+# UUIDv7 as a PostgreSQL expression: a random v4 UUID whose first 48 bits are replaced by the Unix
+# time in milliseconds and whose version nibble is switched from 4 to 7 (bits 52 and 53).
+PG_UUID7_SQL = ("encode(set_bit(set_bit(overlay(uuid_send(gen_random_uuid()) placing "
+                "substring(int8send(floor(extract(epoch from clock_timestamp()) * 1000)::bigint) from 3) "
+                "from 1 for 6), 52, 1), 53, 1), 'hex')::uuid")
+
+
+class GUID(TypeDecorator):
+    """
+    UUID column that reads and writes canonical strings ('xxxxxxxx-xxxx-...').
+    Stored natively as `uuid` on PostgreSQL and as 16 raw bytes everywhere else.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Any) -> Any:
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        if value is None:
+            return None
+        parsed = value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        return str(parsed) if dialect.name == 'postgresql' else parsed.bytes
+
+    def process_result_value(self, value: Any, dialect: Any) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, (bytes, memoryview)):
+            return str(uuid.UUID(bytes=bytes(value)))
+        return str(value) if isinstance(value, uuid.UUID) else str(uuid.UUID(value))
+
+
+def normalize_guid(value: Any) -> Optional[str]:
+    """Canonical string form of a UUID given in any accepted spelling, or None if it is not one."""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if not isinstance(value, str):
+        return None
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return None
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit millisecond timestamp, then random bits.
+    Within one millisecond the 12 bits after the version act as a counter, so IDs made by this
+    process sort in creation order and consecutive inserts land next to each other in the index.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            _uuid7_counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF # Leave headroom for increments
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF: # Counter exhausted: borrow the next millisecond
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        timestamp_ms, counter = _uuid7_last_ms, _uuid7_counter
+    random_bits = int.from_bytes(os.urandom(8), 'big') & 0x3FFFFFFFFFFFFFFF
+    value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | random_bits
+    return uuid.UUID(int=value)
@@ -0,0 +1,92 @@
+# backend/app/utils/json_provider.py
+# -*- coding: utf-8 -*-
+import time
+from typing import Any, Dict, Optional
+
+from flask import Flask, Response, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError: # Optional: without it everything is encoded by the stdlib json module
+    orjson = None
+
+# Per-request accumulator read by app/utils/metrics.py
+SERIALIZATION_SECONDS_KEY = '_json_serialization_seconds'
+
+# json.dumps keyword arguments the orjson path can honour; anything else goes to the stdlib encoder
+_ORJSON_KWARGS = frozenset(('default', 'ensure_ascii', 'sort_keys', 'indent', 'separators'))
+
+
+def _add_serialization_time(started: float) -> None:
+    if has_request_context():
+        elapsed = time.perf_counter() - started
+        setattr(g, SERIALIZATION_SECONDS_KEY, g.get(SERIALIZATION_SECONDS_KEY, 0.0) + elapsed)
+
+
+class TimingJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes with orjson when it is installed (JSON_BACKEND 'auto' or 'orjson';
+    'stdlib' turns it off) and adds the time spent encoding to the current request's total.
+    Values orjson would encode differently from Flask (datetimes, dataclasses) still go through
+    Flask's default(), so the output is the same apart from non-ASCII text being sent as UTF-8
+    instead of \\u escapes.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        super().__init__(app)
+        backend = app.config.get('JSON_BACKEND', 'auto')
+        if backend == 'orjson' and orjson is None:
+            app.logger.warning("JSON_BACKEND is 'orjson' but orjson is not installed; using the stdlib encoder.")
+        self.use_orjson = orjson is not None and backend != 'stdlib'
+
+    def _orjson_dumps(self, obj: Any, kwargs: Dict[str, Any]) -> Optional[bytes]:
+        """orjson encoding of `obj` for json.dumps-style `kwargs`, or None when the stdlib encoder must do it."""
+        if not self.use_orjson or not _ORJSON_KWARGS.issuperset(kwargs):
+            return None
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        indent = kwargs.get('indent')
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        elif indent is not None or tuple(kwargs.get('separators') or (',', ':')) != (',', ':'):
+            return None
+        try:
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option)
+        except orjson.JSONEncodeError:
+            return None # E.g. non-string dict keys or integers beyond 64 bits: the stdlib encoder decides
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            encoded = self._orjson_dumps(obj, kwargs)
+            return encoded.decode('utf-8') if encoded is not None else super().dumps(obj, **kwargs)
+        finally:
+            _add_serialization_time(started)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if self.use_orjson and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass # Let the stdlib parser accept what it accepts (e.g. NaN) and word the error
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Same as Flask's jsonify(), but orjson's bytes go into the response without a str round trip."""
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args: Dict[str, Any] = {'indent': 2}
+        else:
+            dump_args = {'separators': (',', ':')}
+        started = time.perf_counter()
+        try:
+            body = self._orjson_dumps(obj, dump_args)
+            if body is None:
+                body = super().dumps(obj, **dump_args).encode('utf-8')
+        finally:
+            _add_serialization_time(started)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,156 @@
+# backend/app/utils/log_pipeline.py
+# -*- coding: utf-8 -*-
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+from typing import List, Optional
+
+from flask import Flask
+from flask.logging import default_handler
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'pid': record.process,
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class InfoSamplingFilter(logging.Filter):
+    """Keeps a random `rate` fraction of INFO/DEBUG records; WARNING and above always pass."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records (and counts them) instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """
+    Moves app log I/O off request threads: app.logger only enqueues records, and a listener
+    thread formats and writes them to the log file and stderr.
+
+    init_app only reads the settings. start() runs in every serving process, i.e. after fork in
+    pre-fork servers: it opens that process's handlers, starts its listener thread and only then
+    routes app.logger through the queue (until then Flask's stderr handler stays in place, e.g. in
+    the gunicorn master). Processes sharing one log file must not rotate it themselves, so under
+    a pre-fork server the file is a WatchedFileHandler that reopens it after an external
+    logrotate (LOG_FILE_ROTATION 'auto'); a single process rotates by size.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._app: Optional[Flask] = None
+        self._handler: Optional[DroppingQueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def dropped(self) -> int:
+        return self._handler.dropped if self._handler is not None else 0
+
+    def init_app(self, app: Flask) -> None:
+        self._app = app
+        app.extensions['log_pipeline'] = self
+        atexit.register(self.stop)
+
+    def start(self) -> None:
+        """Starts this process's handlers and listener thread and switches app.logger to the queue."""
+        with self._lock:
+            app = self._app
+            if app is None or self._pid == os.getpid():
+                return
+            # Anything inherited from the parent (queue, its lock, open files) stays the parent's
+            handler = DroppingQueueHandler(queue.Queue(app.config.get('LOG_QUEUE_SIZE', 10000)))
+            sample_rate = app.config.get('LOG_INFO_SAMPLE_RATE', 1.0)
+            if sample_rate < 1.0:
+                handler.addFilter(InfoSamplingFilter(sample_rate))
+            self._listener = QueueListener(handler.queue, *self._build_targets(app), respect_handler_level=True)
+            self._listener.start()
+            app.logger.removeHandler(default_handler) # Flask's stderr handler writes synchronously
+            if self._handler is not None:
+                app.logger.removeHandler(self._handler)
+            app.logger.addHandler(handler)
+            self._handler = handler
+            self._pid = os.getpid()
+
+    def _build_targets(self, app: Flask) -> List[logging.Handler]:
+        formatter: logging.Formatter = (JsonFormatter() if app.config.get('LOG_FORMAT') == 'json'
+                                        else logging.Formatter(TEXT_FORMAT))
+        targets: List[logging.Handler] = []
+        log_dir = app.config.get('LOG_DIR', 'logs')
+        log_file_path = os.path.join(log_dir, 'strategic_beeper.log')
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            if _rotation_mode(app) == 'external':
+                file_handler: logging.Handler = WatchedFileHandler(log_file_path, encoding='utf-8')
+            else:
+                file_handler = RotatingFileHandler(log_file_path, maxBytes=app.config['LOG_FILE_MAX_BYTES'],
+                                                   backupCount=app.config['LOG_FILE_BACKUP_COUNT'], encoding='utf-8')
+            file_handler.setFormatter(formatter)
+            targets.append(file_handler)
+        except OSError as e:
+            app.logger.error(f"Could not set up file logging to {log_file_path}: {e}. Logging to stderr only.")
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(formatter)
+        targets.append(stream_handler)
+        return targets
+
+    def stop(self) -> None:
+        """Flushes queued records and stops the listener thread of this process."""
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+                for target in self._listener.handlers:
+                    target.close()
+                self._listener = None
+                self._pid = None
+
+
+def _rotation_mode(app: Flask) -> str:
+    """'size' (RotatingFileHandler) or 'external' (WatchedFileHandler, rotated by e.g. logrotate)."""
+    mode = app.config.get('LOG_FILE_ROTATION', 'auto')
+    if mode == 'auto':
+        from .. import PREFORK_SERVER_ENV # Circular at module level
+        return 'external' if os.environ.get(PREFORK_SERVER_ENV) == '1' else 'size'
+    return mode
+
+
+log_pipeline = LogPipeline()
@@ -0,0 +1,224 @@
+# backend/app/utils/metrics.py
+# -*- coding: utf-8 -*-
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .json_provider import SERIALIZATION_SECONDS_KEY
+
+_REQUEST_STATE_KEY = '_request_metrics'
+_CURSOR_START_KEY = 'request_metrics_cursor_start'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class _RequestState:
+    """Counters accumulated while one request is being handled."""
+    __slots__ = ('started', 'sql_count', 'sql_seconds')
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values (Prometheus semantics)."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Iterable[float]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {} # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        # Caller must hold the registry lock
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self._series.items()):
+            label_text = _format_labels(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{_format_number(bound)}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {_format_number(series[-2])}')
+            lines.append(f'{self.name}_count{{{label_text}}} {series[-1]}')
+        return lines
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request instrumentation published at /metrics in Prometheus text format.
+
+    Records wall time (until the view returns; streamed bodies are not included), SQL statement
+    count and time, JSON serialization time and response size. Values are per worker process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests_total: Dict[Tuple[str, str, str], int] = {}
+        self.duration = Histogram('http_request_duration_seconds', 'Time spent handling the request.',
+                                  ('endpoint', 'method'), LATENCY_BUCKETS)
+        self.sql_queries = Histogram('http_request_sql_queries', 'SQL statements executed per request.',
+                                     ('endpoint', 'method'), SQL_COUNT_BUCKETS)
+        self.sql_duration = Histogram('http_request_sql_duration_seconds', 'Time spent executing SQL per request.',
+                                      ('endpoint', 'method'), LATENCY_BUCKETS)
+        self.serialization = Histogram('http_response_serialization_seconds', 'Time spent encoding JSON per request.',
+                                       ('endpoint', 'method'), LATENCY_BUCKETS)
+        self.response_size = Histogram('http_response_size_bytes', 'Response body size (non-streamed responses).',
+                                       ('endpoint', 'method'), SIZE_BUCKETS)
+
+    def init_app(self, app: Flask, engines: Iterable[Engine]) -> None:
+        """`engines`: every engine requests may use (db.engines.values(): the primary and any read replicas)."""
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        for engine in engines:
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'), 'metrics', self._metrics_view, methods=['GET'])
+        app.extensions['request_metrics'] = self
+
+    def _before_request(self) -> None:
+        setattr(g, _REQUEST_STATE_KEY, _RequestState())
+
+    def _after_request(self, response: Response) -> Response:
+        state: Optional[_RequestState] = g.get(_REQUEST_STATE_KEY)
+        if state is None:
+            return response
+        elapsed = time.perf_counter() - state.started
+        serialization_seconds = g.get(SERIALIZATION_SECONDS_KEY, 0.0)
+        labels = (request.endpoint or 'unmatched', request.method)
+        size = None if response.is_streamed else response.content_length
+        with self._lock:
+            key = labels + (str(response.status_code),)
+            self.requests_total[key] = self.requests_total.get(key, 0) + 1
+            self.duration.observe(labels, elapsed)
+            self.sql_queries.observe(labels, state.sql_count)
+            self.sql_duration.observe(labels, state.sql_seconds)
+            self.serialization.observe(labels, serialization_seconds)
+            if size is not None:
+                self.response_size.observe(labels, size)
+
+        if current_app.debug:
+            response.headers['Server-Timing'] = ', '.join((
+                f'db;dur={state.sql_seconds * 1000:.2f};desc="{state.sql_count} queries"',
+                f'json;dur={serialization_seconds * 1000:.2f}',
+                f'app;dur={elapsed * 1000:.2f}'
+            ))
+        return response
+
+    def render(self) -> str:
+        lines = ['# HELP http_requests_total Requests handled, by endpoint, method and status.',
+                 '# TYPE http_requests_total counter']
+        with self._lock:
+            for (endpoint, method, status), count in sorted(self.requests_total.items()):
+                label_text = _format_labels((('endpoint', endpoint), ('method', method), ('status', status)))
+                lines.append(f'http_requests_total{{{label_text}}} {count}')
+            for histogram in (self.duration, self.sql_queries, self.sql_duration, self.serialization,
+                              self.response_size):
+                lines.extend(histogram.render())
+        lines.extend(_process_gauges())
+        return '\n'.join(lines) + '\n'
+
+    def _metrics_view(self) -> Response:
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+request_metrics = RequestMetrics()
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                           executemany: bool) -> None:
+    conn.info.setdefault(_CURSOR_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                          executemany: bool) -> None:
+    starts = conn.info.get(_CURSOR_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    # Job worker threads run SQL outside any request; only count statements issued by a request
+    if has_request_context():
+        state: Optional[_RequestState] = g.get(_REQUEST_STATE_KEY)
+        if state is not None:
+            state.sql_count += 1
+            state.sql_seconds += elapsed
+
+
+def _process_gauges() -> List[str]:
+    """Credential cache, rate limiter, log pipeline and connection pool series for this worker process."""
+    from .. import db
+    from .credential_cache import credential_cache
+    from .db_pool import pool_metrics
+    from .log_pipeline import log_pipeline
+    from .rate_limit import login_rate_limiter
+
+    series: List[Tuple[str, str, str, float]] = [
+        ('process_pid', 'gauge', 'Worker process ID these metrics belong to.', os.getpid())
+    ]
+    cache_stats = credential_cache.stats()
+    series.append(('credential_cache_entries', 'gauge', 'Verified-credential cache entries.', cache_stats['size']))
+    for key in ('hits', 'misses', 'evictions', 'invalidations'):
+        series.append((f'credential_cache_{key}_total', 'counter', f'Verified-credential cache {key}.',
+                       cache_stats[key]))
+    series.append(('login_rate_limit_rejections_total', 'counter', 'Password checks rejected with 429.',
+                   login_rate_limiter.rejections))
+    series.append(('log_records_dropped_total', 'counter', 'App log records dropped because the log queue was full.',
+                   log_pipeline.dropped))
+    lines = []
+    for name, metric_type, help_text, value in series:
+        lines.extend((f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}', f'{name} {_format_number(value)}'))
+
+    # One series per engine: the primary ('default') and each read replica bind
+    pool_stats = pool_metrics.snapshot_all(db.engines)
+    pool_series: List[Tuple[str, str, str, str]] = [
+        (f'db_pool_{key}', 'gauge', f'Database connection pool {key}.', key)
+        for key in ('size', 'checked_out', 'checked_in', 'overflow', 'wait_seconds_max')
+    ] + [
+        (f'db_pool_{key}_total', 'counter', f'Database connection pool {key}.',
+         'wait_seconds_total' if key == 'wait_seconds' else key)
+        for key in ('checkouts', 'timeouts', 'connects', 'invalidations', 'wait_seconds')
+    ]
+    for name, metric_type, help_text, stats_key in pool_series:
+        values = [(engine, stats[stats_key]) for engine, stats in pool_stats.items() if stats.get(stats_key) is not None]
+        if not values:
+            continue
+        lines.extend((f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}'))
+        lines.extend(f'{name}{{{_format_labels((("engine", engine),))}}} {_format_number(value)}'
+                     for engine, value in values)
+    return lines
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    return ','.join(f'{name}="{_escape_label(value)}"' for name, value in pairs)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
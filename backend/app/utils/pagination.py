@@ -0,0 +1,51 @@
+# backend/app/utils/pagination.py
+# -*- coding: utf-8 -*-
+import base64
+import datetime
+import json
+from typing import Optional, Tuple
+
+from flask import Response, jsonify, request
+
+TOTAL_COUNT_HEADER = 'X-Total-Count'
+
+
+def parse_limit(raw_limit: Optional[str], default: int, maximum: int) -> int:
+    """
+    Parses a `limit` query parameter. Raises ValueError if it is not a positive integer.
+    Values above `maximum` are clamped rather than rejected.
+    """
+    if raw_limit is None or raw_limit == '':
+        return default
+    limit = int(raw_limit)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer.")
+    return min(limit, maximum)
+
+
+def encode_cursor(timestamp: datetime.datetime, row_id: str) -> str:
+    """Encodes a (timestamp, id) keyset position as an opaque, URL-safe cursor string."""
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, str]:
+    """Decodes a cursor produced by encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp_str, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.datetime.fromisoformat(timestamp_str), str(row_id)
+    except (TypeError, ValueError, UnicodeError) as e: # binascii.Error and JSONDecodeError are ValueErrors
+        raise ValueError("Malformed pagination cursor.") from e
+
+
+def count_requested() -> bool:
+    """True for HEAD requests and `count_only=true`: the caller should answer with count_response()."""
+    return request.method == 'HEAD' or request.args.get('count_only', '').lower() in ('1', 'true')
+
+
+def count_response(total: int) -> Response:
+    """{"total_count": n} with the same number in X-Total-Count (the only part a HEAD response keeps)."""
+    response = jsonify({"total_count": total})
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    return response
@@ -0,0 +1,145 @@
+# backend/app/utils/password_hashing.py
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from flask import Flask, jsonify
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+DEFAULT_HASH_METHOD = 'pbkdf2:sha256'
+_SCRYPT_DEFAULTS = ('32768', '8', '1') # n, r, p as used by werkzeug.security
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are already queued; surfaced to clients as 503."""
+
+
+def normalize_hash_method(method: str) -> str:
+    """Expands a werkzeug method spec to the exact prefix it writes into hashes, e.g. 'pbkdf2:sha256:1000000'."""
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        hash_name = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else str(DEFAULT_PBKDF2_ITERATIONS)
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if parts[0] == 'scrypt':
+        return ':'.join(['scrypt'] + parts[1:] + list(_SCRYPT_DEFAULTS[len(parts) - 1:]))
+    return method
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification off the web threads.
+
+    With PASSWORD_HASH_WORKERS > 0 the work goes to a ProcessPoolExecutor, so a login storm
+    uses up to that many extra cores instead of the request threads of this worker. At most
+    PASSWORD_HASH_MAX_PENDING operations may be queued or running; callers beyond that wait up
+    to PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS and then get PasswordHasherBusy (HTTP 503).
+    With 0 workers, outside an app (e.g. scripts) and in a process that has not called start()
+    (e.g. seeding in a preloading gunicorn master) hashing runs inline.
+    """
+
+    def __init__(self) -> None:
+        self.method = DEFAULT_HASH_METHOD
+        self.target_prefix = normalize_hash_method(DEFAULT_HASH_METHOD)
+        self.workers = 0
+        self.queue_timeout = 2.0
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started_pid: Optional[int] = None
+        self._executor_lock = threading.Lock()
+        self._logger: Any = None
+
+    def init_app(self, app: Flask) -> None:
+        self.method = app.config.get('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD)
+        self.target_prefix = normalize_hash_method(self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS', self.queue_timeout)
+        max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING') or max(self.workers, 1) * 8
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._logger = app.logger
+        app.register_error_handler(PasswordHasherBusy, _busy_response)
+        app.extensions['password_hasher'] = self
+
+    def start(self) -> None:
+        """
+        Enables the process pool for this process; it is created on first use. Called from
+        start_background_services, i.e. in each worker after a pre-fork server forks.
+        """
+        if self.workers > 0 and 'forkserver' not in multiprocessing.get_all_start_methods():
+            # Windows: spawned pool processes would re-run run.py, i.e. create_app, in each of them
+            if self._logger is not None:
+                self._logger.info("Password hashing runs inline: no forkserver start method on this platform.")
+            return
+        with self._executor_lock:
+            if self._started_pid != os.getpid():
+                self._executor = None # Belongs to the parent process
+                self._started_pid = os.getpid()
+
+    def hash_password(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify_password(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True if the hash was made with a different method or work factor than PASSWORD_HASH_METHOD."""
+        return password_hash.split('$', 1)[0] != self.target_prefix
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None and self._started_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.workers <= 0 or self._slots is None or self._started_pid != os.getpid():
+            return func(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy()
+        try:
+            executor = self._get_executor()
+            try:
+                return executor.submit(func, *args).result()
+            except BrokenProcessPool:
+                # A pool process died (e.g. OOM-killed); the whole pool is unusable. Replace it and retry once.
+                self._replace_broken_executor(executor)
+                future: Future = self._get_executor().submit(func, *args)
+                return future.result()
+        finally:
+            self._slots.release()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Not fork: this process already runs request, log and job threads. forkserver children
+                # come from a clean single-threaded server (they import __main__ as '__mp_main__', see run.py).
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+            return self._executor
+
+    def _replace_broken_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            if self._executor is broken: # Other threads hitting the same failure replace it only once
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        if self._logger is not None:
+            self._logger.error("Password hashing process pool broke; replaced it.")
+
+
+def _mp_context() -> Any:
+    context = multiprocessing.get_context('forkserver')
+    # The default preload would import __main__ (run.py) into the fork server itself
+    context.set_forkserver_preload(['werkzeug.security'])
+    return context
+
+
+def _busy_response(error: PasswordHasherBusy) -> Any:
+    response = jsonify({"error": "Authentication service is busy. Please retry shortly."})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
+password_hasher = PasswordHasher()
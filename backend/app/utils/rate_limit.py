@@ -0,0 +1,189 @@
+# backend/app/utils/rate_limit.py
+# -*- coding: utf-8 -*-
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from flask import Flask, jsonify, request
+
+
+@dataclass(frozen=True)
+class BucketPolicy:
+    """Token bucket: `burst` attempts at once, refilled at `per_minute` attempts per minute."""
+    burst: float
+    per_minute: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.per_minute / 60.0
+
+
+class RateLimitExceeded(Exception):
+    """Raised before any password hashing when a client or identifier is out of tokens (HTTP 429)."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def _refill(tokens: float, updated: float, now: float, policy: BucketPolicy) -> float:
+    return min(policy.burst, tokens + (now - updated) * policy.refill_per_second)
+
+
+def _retry_after(tokens: float, policy: BucketPolicy) -> float:
+    if policy.refill_per_second <= 0:
+        return 60.0
+    return (1.0 - tokens) / policy.refill_per_second
+
+
+class MemoryBucketStore:
+    """
+    Per-process bucket store: (tokens, updated) tuples in an LRU-ordered dict holding at most
+    `max_keys` buckets. Evicting the least recently used bucket is safe at any time: a bucket
+    refills while unused, so the ones evicted first are the ones closest to full.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        # One lock for a handful of dict operations; CPython has no compare-and-swap to build a lock-free bucket on
+        self._lock = threading.Lock()
+
+    def take(self, key: str, policy: BucketPolicy, now: float) -> Tuple[bool, float]:
+        """Consumes one token. Returns (allowed, retry_after_seconds)."""
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (policy.burst, now))
+            tokens = _refill(tokens, updated, now, policy)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now) # Re-inserted: most recently used
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else _retry_after(tokens, policy)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SqliteBucketStore:
+    """
+    Bucket store shared by all worker processes on one host, in a local SQLite file (WAL mode).
+    Each take() is one short IMMEDIATE transaction.
+    """
+
+    def __init__(self, path: str, idle_seconds: float) -> None:
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self._takes = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                         "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: Optional[sqlite3.Connection] = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key: str, policy: BucketPolicy, now: float) -> Tuple[bool, float]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = _refill(row[0], row[1], now, policy) if row else policy.burst
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            conn.execute("INSERT INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                         (key, tokens, now))
+            self._takes += 1
+            if self._takes % 1000 == 0 and math.isfinite(self.idle_seconds):
+                # Fully refilled buckets carry no state; keep the table from growing without bound
+                conn.execute("DELETE FROM rate_limit_buckets WHERE updated < ?", (now - self.idle_seconds,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, 0.0 if allowed else _retry_after(tokens, policy)
+
+
+class LoginRateLimiter:
+    """
+    Throttles password checks per client IP, per (login identifier, client IP) and per identifier.
+    The credential checkers call check() on a credential cache miss, i.e. right before hashing.
+    The (identifier, IP) bucket is the tight one: guessing wrong on someone's username from one
+    address cannot lock the real user out from theirs. The identifier-wide bucket has a larger
+    burst and bounds guessing on one account from many addresses.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.ip_policy = BucketPolicy(burst=30, per_minute=30)
+        self.identifier_policy = BucketPolicy(burst=10, per_minute=10)
+        self.account_policy = BucketPolicy(burst=50, per_minute=20)
+        self.trusted_proxies = 0
+        self.store: Any = None
+        self._rejections_lock = threading.Lock()
+        self.rejections = 0
+
+    def init_app(self, app: Flask) -> None:
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        self.ip_policy = BucketPolicy(app.config['RATE_LIMIT_IP_BURST'], app.config['RATE_LIMIT_IP_PER_MINUTE'])
+        self.identifier_policy = BucketPolicy(app.config['RATE_LIMIT_IDENTIFIER_BURST'],
+                                              app.config['RATE_LIMIT_IDENTIFIER_PER_MINUTE'])
+        self.account_policy = BucketPolicy(app.config['RATE_LIMIT_ACCOUNT_BURST'],
+                                           app.config['RATE_LIMIT_ACCOUNT_PER_MINUTE'])
+        self.trusted_proxies = app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0)
+        if app.config.get('RATE_LIMIT_BACKEND', 'memory') == 'sqlite':
+            # After this long unused, a bucket of any policy has refilled completely
+            idle_seconds = max(policy.burst / policy.refill_per_second if policy.refill_per_second > 0 else math.inf
+                               for policy in (self.ip_policy, self.identifier_policy, self.account_policy))
+            self.store = SqliteBucketStore(app.config['RATE_LIMIT_SQLITE_PATH'], idle_seconds)
+        else:
+            self.store = MemoryBucketStore(app.config.get('RATE_LIMIT_MAX_KEYS', 100000))
+        app.register_error_handler(RateLimitExceeded, _rate_limited_response)
+        app.extensions['login_rate_limiter'] = self
+
+    def check(self, kind: str, identifier: str) -> None:
+        """Consumes one attempt from each bucket of this client IP and identifier; raises RateLimitExceeded if any is empty."""
+        if not self.enabled or self.store is None:
+            return
+        now = time.time() # Wall clock: buckets in the SQLite store are shared between processes
+        client_ip = self.client_ip()
+        identifier_key = f'id:{kind}:{identifier.strip().lower()}'
+        results = [self.store.take(f'ip:{client_ip}', self.ip_policy, now),
+                   self.store.take(f'{identifier_key}:{client_ip}', self.identifier_policy, now),
+                   self.store.take(identifier_key, self.account_policy, now)]
+        if not all(allowed for allowed, _ in results):
+            with self._rejections_lock:
+                self.rejections += 1
+            raise RateLimitExceeded(max(retry for _, retry in results))
+
+    def client_ip(self) -> str:
+        # Behind N trusted reverse proxies the client is the Nth address from the end of X-Forwarded-For
+        if self.trusted_proxies > 0:
+            forwarded = request.access_route
+            if len(forwarded) >= self.trusted_proxies:
+                return forwarded[-self.trusted_proxies]
+        return request.remote_addr or 'unknown'
+
+
+def _rate_limited_response(error: RateLimitExceeded) -> Any:
+    response = jsonify({"error": "Too many authentication attempts. Please try again later."})
+    response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response, 429
+
+
+login_rate_limiter = LoginRateLimiter()
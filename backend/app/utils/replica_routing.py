@@ -0,0 +1,176 @@
+# backend/app/utils/replica_routing.py
+# -*- coding: utf-8 -*-
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.selectable import CompoundSelect
+
+from .rate_limit import login_rate_limiter
+
+REPLICA_BIND_PREFIX = 'replica_'
+_WROTE_FLAG = 'db_wrote'
+
+
+class MemoryStickyStore:
+    """Per-process map of client key -> time until which its reads stay on the primary."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, keys: List[str], until: float, now: float) -> None:
+        with self._lock:
+            for key in keys:
+                self._until[key] = until
+            if len(self._until) > self.max_keys:
+                self._until = {key: value for key, value in self._until.items() if value > now}
+
+    def is_sticky(self, keys: List[str], now: float) -> bool:
+        return any(self._until.get(key, 0.0) > now for key in keys)
+
+
+class SqliteStickyStore:
+    """Sticky windows shared by all worker processes on one host, in a local SQLite file (WAL mode)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._marks = 0
+        self._local = threading.local()
+        self._connect().execute("CREATE TABLE IF NOT EXISTS replica_sticky (key TEXT PRIMARY KEY, until REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: Optional[sqlite3.Connection] = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def mark(self, keys: List[str], until: float, now: float) -> None:
+        conn = self._connect()
+        conn.executemany("INSERT INTO replica_sticky (key, until) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET until = max(until, excluded.until)",
+                         [(key, until) for key in keys])
+        self._marks += 1
+        if self._marks % 1000 == 0:
+            conn.execute("DELETE FROM replica_sticky WHERE until < ?", (now,))
+
+    def is_sticky(self, keys: List[str], now: float) -> bool:
+        placeholders = ','.join('?' * len(keys))
+        row = self._connect().execute(
+            f"SELECT 1 FROM replica_sticky WHERE key IN ({placeholders}) AND until > ? LIMIT 1", (*keys, now)
+        ).fetchone()
+        return row is not None
+
+
+class ReplicaRouter:
+    """
+    Sends the plain SELECTs of GET/HEAD requests to the ops and shop blueprints to a read replica
+    (SQLALCHEMY_BINDS keys starting with 'replica_'). Everything else uses the primary: writes, flushes,
+    SELECT ... FOR UPDATE, reads after a write in the same transaction, and reads by a client (IP or
+    authenticated principal) that committed a write less than DB_REPLICA_STICKY_SECONDS ago.
+    """
+
+    def __init__(self) -> None:
+        self.bind_keys: List[str] = []
+        self.blueprints = ('ops', 'shop')
+        self.sticky_seconds = 5.0
+        self.store: Any = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.bind_keys)
+
+    def init_app(self, app: Flask) -> None:
+        self.bind_keys = sorted(key for key in (app.config.get('SQLALCHEMY_BINDS') or {})
+                                if key and key.startswith(REPLICA_BIND_PREFIX))
+        self.sticky_seconds = app.config.get('DB_REPLICA_STICKY_SECONDS', self.sticky_seconds)
+        if app.config.get('DB_REPLICA_STICKY_BACKEND', 'memory') == 'sqlite':
+            self.store = SqliteStickyStore(app.config['DB_REPLICA_STICKY_SQLITE_PATH'])
+        else:
+            self.store = MemoryStickyStore(app.config['DB_REPLICA_STICKY_MAX_KEYS'])
+        app.extensions['replica_router'] = self
+        if self.enabled:
+            app.logger.info(f"Read replica routing enabled for {', '.join(self.bind_keys)}.")
+
+    def read_engine(self, session: Any, clause: Any) -> Any:
+        """The replica engine for `clause`, or None to use the primary."""
+        if not self.enabled or not has_request_context():
+            return None
+        if not isinstance(clause, (Select, CompoundSelect)) or clause._for_update_arg is not None:
+            return None
+        if session.info.get(_WROTE_FLAG) or request.method not in ('GET', 'HEAD') \
+                or request.blueprint not in self.blueprints:
+            return None
+        bind_key = g.get('_db_replica_bind_key')
+        if bind_key is None:
+            # Decided once per request, so all of a request's reads see the same replica
+            sticky = self.store.is_sticky(self._client_keys(), time.time())
+            bind_key = '' if sticky else random.choice(self.bind_keys)
+            g._db_replica_bind_key = bind_key
+        if not bind_key:
+            return None
+        return current_app.extensions['sqlalchemy'].engines[bind_key]
+
+    def mark_write(self) -> None:
+        """Keeps this request's client on the primary for the sticky window, in every worker sharing the store."""
+        if not self.enabled or not has_request_context():
+            return
+        now = time.time() # Wall clock: the SQLite store is shared between processes
+        self.store.mark(self._client_keys(), now + self.sticky_seconds, now)
+        g._db_replica_bind_key = ''
+
+    def _client_keys(self) -> List[str]:
+        keys = [f'ip:{login_rate_limiter.client_ip()}'] # Same client IP resolution (trusted proxies) as rate limiting
+        auth = request.authorization
+        if auth is not None and auth.type == 'bearer' and auth.token:
+            from .tokens import verify_access_token # Imports the models, which need `db` to exist first
+            claims = verify_access_token(auth.token)
+            if claims is not None:
+                keys.append(f"{claims['role']}:{claims['sub']}")
+        elif auth is not None and auth.username:
+            keys.append(f'basic:{auth.username.strip().lower()}')
+        return keys
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """Flask-SQLAlchemy session that lets replica_router pick a read replica per statement."""
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, bind: Any = None, **kwargs: Any) -> Any:
+        if bind is None and not self._flushing:
+            replica_engine = replica_router.read_engine(self, clause)
+            if replica_engine is not None:
+                return replica_engine
+            if clause is not None and not isinstance(clause, (Select, CompoundSelect)):
+                self.info[_WROTE_FLAG] = True # DML or raw SQL: later reads in this transaction must see it
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session: RoutingSession, flush_context: Any) -> None:
+    session.info[_WROTE_FLAG] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session: RoutingSession) -> None:
+    if session.info.pop(_WROTE_FLAG, False):
+        replica_router.mark_write()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session: RoutingSession) -> None:
+    session.info.pop(_WROTE_FLAG, None)
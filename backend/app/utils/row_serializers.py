@@ -0,0 +1,88 @@
+# backend/app/utils/row_serializers.py
+# -*- coding: utf-8 -*-
+"""
+Response dicts built straight from the Row tuples of column-only select()s: the same keys and values
+as the models' to_dict(), without creating ORM objects or identity-map entries for every row.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ..models import BeeperModel, CartItem, SoldBeeper
+
+
+def _isoformat(value: Any) -> str:
+    return value.isoformat()
+
+
+class RowSerializer:
+    """
+    Fields are (key, column) or (key, column, converter) tuples. Select `columns` in that order;
+    converters are applied to non-NULL values only. Extra columns selected after them are ignored.
+    """
+
+    def __init__(self, *fields: Tuple[Any, ...]) -> None:
+        self._fields = fields
+        self.keys: Tuple[str, ...] = tuple(field[0] for field in fields)
+        self.columns: Tuple[Any, ...] = tuple(field[1] for field in fields)
+        self._converters: Tuple[Tuple[int, Callable[[Any], Any]], ...] = tuple(
+            (index, field[2]) for index, field in enumerate(fields) if len(field) > 2
+        )
+
+    def to_dict(self, row: Iterable[Any]) -> Dict[str, Any]:
+        if not self._converters:
+            return dict(zip(self.keys, row))
+        values = list(row)
+        for index, convert in self._converters:
+            value: Optional[Any] = values[index]
+            if value is not None:
+                values[index] = convert(value)
+        return dict(zip(self.keys, values))
+
+    def to_dicts(self, rows: Iterable[Iterable[Any]]) -> Iterator[Dict[str, Any]]:
+        return map(self.to_dict, rows)
+
+    def project(self, keys: Iterable[str]) -> 'RowSerializer':
+        """Serializer for the listed keys only (in declaration order); unknown keys are ignored."""
+        wanted = set(keys)
+        return RowSerializer(*(field for field in self._fields if field[0] in wanted))
+
+
+def parse_fields(raw_value: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Field names from a `fields=a,b,c` query argument, or None when it is absent (all fields).
+    Raises ValueError if it names no field or a field not in `allowed`.
+    """
+    if raw_value is None:
+        return None
+    fields = [name.strip() for name in raw_value.split(',') if name.strip()]
+    if not fields or any(name not in allowed for name in fields):
+        raise ValueError(f"Invalid 'fields'. Use a comma-separated subset of: {', '.join(allowed)}.")
+    return fields
+
+
+# SoldBeeper.to_dict(); select it joined to SoldBeeper.model_info
+SOLD_BEEPER_ROW = RowSerializer(
+    ('id', SoldBeeper.id),
+    ('model_id', SoldBeeper.model_id),
+    ('model_name', BeeperModel.name),
+    ('purchase_timestamp', SoldBeeper.purchase_timestamp, _isoformat),
+    ('status', SoldBeeper.status),
+    ('user_id', SoldBeeper.user_id),
+)
+
+# CartItem.to_dict() without model_details (see services/cart.py)
+CART_ITEM_ROW = RowSerializer(
+    ('cart_item_id', CartItem.id),
+    ('user_id', CartItem.user_id),
+    ('model_id', CartItem.model_id),
+    ('quantity', CartItem.quantity),
+    ('added_at', CartItem.added_at, _isoformat),
+)
+
+# BeeperModel.to_dict()
+BEEPER_MODEL_ROW = RowSerializer(
+    ('id', BeeperModel.id),
+    ('name', BeeperModel.name),
+    ('description', BeeperModel.description),
+    ('price', BeeperModel.price),
+    ('image_url', BeeperModel.image_url),
+)
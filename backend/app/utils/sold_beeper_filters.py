@@ -0,0 +1,67 @@
+# backend/app/utils/sold_beeper_filters.py
+# -*- coding: utf-8 -*-
+import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from ..models import SoldBeeper
+
+# Filters shared by the ops listing, activation jobs and anything else that selects sold beepers
+SoldBeeperFilters = Dict[str, Any]
+
+
+def parse_utc_datetime(raw_value: str) -> datetime.datetime:
+    """ISO 8601 date or datetime; naive values are taken as UTC. Returns naive UTC like stored timestamps."""
+    parsed = datetime.datetime.fromisoformat(raw_value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_sold_beeper_filters(source: Mapping[str, Any]) -> Tuple[Optional[SoldBeeperFilters], Optional[str]]:
+    """
+    Parses `status`, `model_id`, `user_id` and the purchase_timestamp range `since` (inclusive) /
+    `until` (exclusive, ISO 8601) from query args or a JSON object. Range bounds are kept as ISO strings
+    so filters stay JSON-serializable (activation jobs store them).
+    Returns (filters, None) on success or (None, error message) on invalid input.
+    """
+    filters: SoldBeeperFilters = {}
+    status_filter = source.get('status')
+    if status_filter:
+        filters['status'] = str(status_filter)
+    for key in ('model_id', 'user_id'):
+        raw_value = source.get(key)
+        if raw_value is None or raw_value == '':
+            continue
+        if isinstance(raw_value, bool):
+            return None, f"Invalid {key} format for filtering."
+        try:
+            filters[key] = int(raw_value)
+        except (TypeError, ValueError):
+            return None, f"Invalid {key} format for filtering."
+    for key in ('since', 'until'):
+        raw_value = source.get(key)
+        if raw_value is None or raw_value == '':
+            continue
+        try:
+            filters[key] = parse_utc_datetime(str(raw_value)).isoformat()
+        except ValueError:
+            return None, f"Invalid {key} format for filtering. Use ISO 8601, e.g. 2024-05-01T00:00:00Z."
+    return filters, None
+
+
+def apply_sold_beeper_filters(query: Any, filters: SoldBeeperFilters) -> Any:
+    """
+    Applies parsed filters to a Query or Select over SoldBeeper. On a partitioned sold_beepers,
+    `since`/`until` let PostgreSQL skip the months outside the range.
+    """
+    if 'status' in filters:
+        query = query.filter(SoldBeeper.status == filters['status'])
+    if 'model_id' in filters:
+        query = query.filter(SoldBeeper.model_id == filters['model_id'])
+    if 'user_id' in filters:
+        query = query.filter(SoldBeeper.user_id == filters['user_id'])
+    if 'since' in filters:
+        query = query.filter(SoldBeeper.purchase_timestamp >= datetime.datetime.fromisoformat(filters['since']))
+    if 'until' in filters:
+        query = query.filter(SoldBeeper.purchase_timestamp < datetime.datetime.fromisoformat(filters['until']))
+    return query
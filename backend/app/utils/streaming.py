@@ -0,0 +1,58 @@
+# backend/app/utils/streaming.py
+# -*- coding: utf-8 -*-
+import csv
+import io
+from typing import Any, Iterable, Iterator, Sequence
+
+from flask import current_app
+
+
+def iter_json_array(items: Iterable[Any], batch_size: int = 500) -> Iterator[str]:
+    """
+    Yields a JSON array incrementally, encoding `batch_size` items per chunk.
+    Meant to be wrapped in `stream_with_context` so large results never sit in memory as a whole.
+    """
+    dumps = current_app.json.dumps
+    yield '['
+    batch = []
+    first_chunk = True
+    for item in items:
+        batch.append(dumps(item))
+        if len(batch) >= batch_size:
+            yield ('' if first_chunk else ',') + ','.join(batch)
+            first_chunk = False
+            batch = []
+    if batch:
+        yield ('' if first_chunk else ',') + ','.join(batch)
+    yield ']'
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence[Any]], batch_size: int = 500) -> Iterator[str]:
+    """Yields CSV text (header line first), `batch_size` rows per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def iter_ndjson(items: Iterable[Any], batch_size: int = 500) -> Iterator[str]:
+    """Yields newline-delimited JSON, one item per line, `batch_size` lines per chunk."""
+    dumps = current_app.json.dumps
+    batch = []
+    for item in items:
+        batch.append(dumps(item))
+        if len(batch) >= batch_size:
+            yield '\n'.join(batch) + '\n'
+            batch = []
+    if batch:
+        yield '\n'.join(batch) + '\n'
+
@@ -0,0 +1,93 @@
+# backend/app/utils/tokens.py
+# -*- coding: utf-8 -*-
+import hashlib
+import hmac
+from typing import Any, Dict, Optional, Type, Union
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from .. import db
+from ..models import User, Operator
+
+# Separate salts keep access and refresh tokens from being accepted in place of each other.
+ACCESS_TOKEN_SALT = 'strategic-beeper-access-token'
+REFRESH_TOKEN_SALT = 'strategic-beeper-refresh-token'
+
+Principal = Union[User, Operator]
+
+
+def _serializer(salt: str) -> URLSafeTimedSerializer:
+    # Timestamped payloads signed with HMAC-SHA256, keyed with the app's SECRET_KEY
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=salt,
+                                  signer_kwargs={'digest_method': hashlib.sha256})
+
+
+def password_fingerprint(password_hash: str) -> str:
+    """
+    Short keyed digest of the stored password hash, embedded in refresh tokens.
+    Changing the password changes the fingerprint, which revokes outstanding refresh tokens.
+    """
+    key = str(current_app.config['SECRET_KEY']).encode('utf-8')
+    return hmac.new(key, password_hash.encode('utf-8'), hashlib.sha256).hexdigest()[:16]
+
+
+def issue_tokens(role: str, principal: Principal) -> Dict[str, Any]:
+    """Issues a signed access/refresh token pair for an authenticated user or operator."""
+    claims = {'sub': principal.id, 'name': principal.username, 'role': role}
+    refresh_claims = dict(claims, pwf=password_fingerprint(principal.password_hash))
+    return {
+        'access_token': _serializer(ACCESS_TOKEN_SALT).dumps(claims),
+        'refresh_token': _serializer(REFRESH_TOKEN_SALT).dumps(refresh_claims),
+        'token_type': 'Bearer',
+        'expires_in': current_app.config['ACCESS_TOKEN_TTL_SECONDS']
+    }
+
+
+def _load_claims(token: str, salt: str, max_age: int, expected_role: Optional[str]) -> Optional[Dict[str, Any]]:
+    try:
+        claims = _serializer(salt).loads(token, max_age=max_age)
+    except BadSignature: # SignatureExpired is a subclass of BadSignature
+        return None
+    if not isinstance(claims, dict) or 'sub' not in claims or 'role' not in claims:
+        return None
+    if expected_role is not None and claims['role'] != expected_role:
+        return None
+    return claims
+
+
+def verify_access_token(token: str, expected_role: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Statelessly verifies an access token. Returns its claims, or None if invalid/expired."""
+    return _load_claims(token, ACCESS_TOKEN_SALT, current_app.config['ACCESS_TOKEN_TTL_SECONDS'], expected_role)
+
+
+def verify_refresh_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verifies a refresh token's signature and age. Callers must still check the password fingerprint."""
+    return _load_claims(token, REFRESH_TOKEN_SALT, current_app.config['REFRESH_TOKEN_TTL_SECONDS'], None)
+
+
+class TokenPrincipal:
+    """
+    Identity decoded from a verified access token, injected by the auth decorators.
+    `id` and `username` come straight from the token claims; any other attribute
+    loads the underlying User/Operator row on first access.
+    """
+
+    def __init__(self, model: Type[Principal], claims: Dict[str, Any]) -> None:
+        self._model = model
+        self._row: Optional[Principal] = None
+        self.id: int = claims['sub']
+        self.username: str = claims['name']
+        self.role: str = claims['role']
+
+    def load(self) -> Optional[Principal]:
+        """Loads (once) and returns the ORM row behind this token, or None if it was deleted."""
+        if self._row is None:
+            self._row = db.session.get(self._model, self.id)
+        return self._row
+
+    def __getattr__(self, name: str) -> Any:
+        row = self.load()
+        if row is None:
+            raise AttributeError(f"{self._model.__name__} {self.id} no longer exists (attribute '{name}').")
+        return getattr(row, name)
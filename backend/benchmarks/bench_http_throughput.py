@@ -0,0 +1,107 @@
+# backend/benchmarks/bench_http_throughput.py
+# -*- coding: utf-8 -*-
+"""
+Closed-loop HTTP throughput benchmark for a running backend (dev server or gunicorn).
+
+Each of --concurrency threads keeps one keep-alive connection open and issues requests
+back to back for --duration seconds. Reports requests/sec and latency percentiles per endpoint.
+
+Usage (see benchmarks/README.md for the full dev-vs-production comparison):
+    python benchmarks/bench_http_throughput.py --url http://127.0.0.1:5001 --concurrency 32 --duration 30
+"""
+import argparse
+import base64
+import http.client
+import json
+import statistics
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional
+
+ENDPOINTS = ('/api/shop/models', '/api/ops/beepers')
+
+
+def login_operator(base_url: str, username: str, password: str) -> Optional[str]:
+    """Returns a Bearer access token, or None if the server predates token login."""
+    parsed = urllib.parse.urlsplit(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+    conn.request('POST', '/api/auth/login/operator', body=json.dumps({'username': username, 'password': password}),
+                 headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    payload = json.loads(response.read() or b'{}')
+    conn.close()
+    if response.status != 200:
+        raise SystemExit(f"Operator login failed ({response.status}): {payload}")
+    return payload.get('access_token')
+
+
+def worker(base_url: str, path: str, headers: Dict[str, str], deadline: float,
+           latencies: List[float], errors: List[int]) -> None:
+    parsed = urllib.parse.urlsplit(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+            else:
+                latencies.append(time.perf_counter() - started)
+        except (OSError, http.client.HTTPException):
+            errors.append(0)
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+    conn.close()
+
+
+def run_endpoint(base_url: str, path: str, headers: Dict[str, str], concurrency: int, duration: float) -> None:
+    latencies: List[float] = []
+    errors: List[int] = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=worker, args=(base_url, path, headers, deadline, latencies, errors))
+               for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if not latencies:
+        print(f"{path:<40} no successful responses ({len(errors)} errors, e.g. {errors[:3]})")
+        return
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{path:<40} {len(latencies) / elapsed:>10.1f} req/s   p50 {quantiles[49] * 1000:>7.1f} ms   "
+          f"p99 {quantiles[98] * 1000:>7.1f} ms   errors {len(errors)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5001', help='backend base URL')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent keep-alive connections')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds per endpoint')
+    parser.add_argument('--operator', default='admin', help='operator username for /api/ops endpoints')
+    parser.add_argument('--operator-password', default='op_password123')
+    parser.add_argument('--basic-auth', action='store_true', help='send Basic Auth instead of a Bearer token')
+    parser.add_argument('--ops-query', default='limit=100', help="query string for /api/ops/beepers ('' for full list)")
+    parser.add_argument('endpoints', nargs='*', default=list(ENDPOINTS), help='paths to benchmark')
+    args = parser.parse_args()
+
+    if args.basic_auth:
+        credentials = base64.b64encode(f"{args.operator}:{args.operator_password}".encode()).decode()
+        ops_headers = {'Authorization': f'Basic {credentials}'}
+    else:
+        ops_headers = {'Authorization': f'Bearer {login_operator(args.url, args.operator, args.operator_password)}'}
+
+    print(f"{args.url}: {args.concurrency} connections, {args.duration:.0f}s per endpoint")
+    for path in args.endpoints:
+        headers = ops_headers if path.startswith('/api/ops') else {}
+        if path == '/api/ops/beepers' and args.ops_query:
+            path = f"{path}?{args.ops_query}"
+        run_endpoint(args.url, path, headers, args.concurrency, args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# backend/benchmarks/bench_json_serialization.py
+# -*- coding: utf-8 -*-
+"""
+Serialization cost of a large /api/ops/beepers payload: ORM entities + to_dict() vs. column-only
+Row tuples + SOLD_BEEPER_ROW, each encoded with the stdlib json module and with orjson.
+
+Loads --rows sold beepers into an in-memory SQLite database, then for every combination times
+(1) the query plus dict building and (2) the JSON encoding through TimingJSONProvider.response(),
+i.e. what jsonify() does. The orjson rows are skipped if orjson is not installed.
+No PostgreSQL or running server is needed.
+
+Usage (from backend/):
+    python benchmarks/bench_json_serialization.py --rows 100000 --repeats 5
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import contains_eager  # noqa: E402
+
+from app import db  # noqa: E402
+from app.models import BeeperModel, SoldBeeper, User  # noqa: E402
+from app.utils.guid import uuid7  # noqa: E402
+from app.utils.json_provider import TimingJSONProvider, orjson  # noqa: E402
+from app.utils.row_serializers import SOLD_BEEPER_ROW  # noqa: E402
+
+
+def make_app(rows: int) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(BeeperModel), [
+            {'name': f'Bench model {index}', 'description': 'Benchmark model', 'price': 99.5 + index}
+            for index in range(10)
+        ])
+        db.session.add(User(username='bench_user', email='bench_user@bench.local', password_hash='x'))
+        db.session.flush()
+        user_id = db.session.scalar(select(User.id))
+        model_ids = list(db.session.scalars(select(BeeperModel.id)))
+        started_at = datetime.datetime(2024, 1, 1)
+        db.session.execute(insert(SoldBeeper), [
+            {'id': str(uuid7()), 'model_id': model_ids[index % len(model_ids)], 'user_id': user_id,
+             'status': 'activated' if index % 3 == 0 else 'active',
+             'purchase_timestamp': started_at + datetime.timedelta(seconds=index)}
+            for index in range(rows)
+        ])
+        db.session.commit()
+    return app
+
+
+def orm_dicts() -> List[Dict[str, Any]]:
+    # What GET /api/ops/beepers did before the column-only query
+    beepers = db.session.query(SoldBeeper).join(SoldBeeper.model_info)\
+        .options(contains_eager(SoldBeeper.model_info))\
+        .order_by(SoldBeeper.purchase_timestamp.desc(), SoldBeeper.id.desc()).all()
+    return [beeper.to_dict() for beeper in beepers]
+
+
+def row_dicts() -> List[Dict[str, Any]]:
+    statement = select(*SOLD_BEEPER_ROW.columns).join(SoldBeeper.model_info)\
+        .order_by(SoldBeeper.purchase_timestamp.desc(), SoldBeeper.id.desc())
+    return list(SOLD_BEEPER_ROW.to_dicts(db.session.execute(statement)))
+
+
+def median_seconds(action: Callable[[], Any], repeats: int) -> Tuple[float, Any]:
+    timings = []
+    result = None
+    for _ in range(repeats):
+        db.session.expunge_all() # Every run hydrates from scratch, as a fresh request would
+        started = time.perf_counter()
+        result = action()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000, help='sold beepers in the payload')
+    parser.add_argument('--repeats', type=int, default=5, help='timed runs per step (median reported)')
+    args = parser.parse_args()
+
+    app = make_app(args.rows)
+    backends = ['stdlib'] + (['orjson'] if orjson is not None else [])
+    results = []
+    with app.app_context():
+        for label, build in (('ORM + to_dict()', orm_dicts), ('Row + SOLD_BEEPER_ROW', row_dicts)):
+            build_seconds, items = median_seconds(build, args.repeats)
+            for backend in backends:
+                app.config['JSON_BACKEND'] = backend
+                provider = TimingJSONProvider(app)
+                encode_seconds, response = median_seconds(lambda: provider.response(items), args.repeats)
+                results.append((label, backend, build_seconds, encode_seconds, len(response.get_data())))
+    if orjson is None:
+        print("orjson is not installed; only the stdlib encoder was measured.")
+
+    print(f"\n{args.rows:,} rows, median of {args.repeats} runs")
+    print(f"{'rows from':<24} {'encoder':<8} {'build ms':>10} {'encode ms':>10} {'total ms':>10} {'MiB':>7}")
+    for label, backend, build_seconds, encode_seconds, size in results:
+        print(f"{label:<24} {backend:<8} {build_seconds * 1000:>10.1f} {encode_seconds * 1000:>10.1f} "
+              f"{(build_seconds + encode_seconds) * 1000:>10.1f} {size / 1048576:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# backend/benchmarks/bench_sold_beeper_indexes.py
+# -*- coding: utf-8 -*-
+"""
+Query-plan and latency benchmark for the sold_beepers hot-column indexes (migration 2).
+
+Generates a synthetic multi-million-row dataset in the configured PostgreSQL database and runs
+the ops listing queries twice: once with the hot-column indexes dropped and once with them
+recreated. For each query it prints the median latency and the top plan node.
+
+Usage (from backend/, against a disposable database):
+    FLASK_CONFIG=development python benchmarks/bench_sold_beeper_indexes.py --rows 3000000
+    python benchmarks/bench_sold_beeper_indexes.py --skip-generate --show-plans
+    python benchmarks/bench_sold_beeper_indexes.py --skip-generate --cleanup
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.migrations import _add_hot_column_indexes  # noqa: E402
+
+BENCH_USER_PREFIX = 'bench_user_'
+HOT_INDEXES = (
+    'ix_sold_beepers_status_purchase_ts', 'ix_sold_beepers_user_purchase_ts',
+    'ix_sold_beepers_model_purchase_ts', 'ix_sold_beepers_purchase_ts_id', 'ix_cart_items_user_added_at',
+)
+
+# (label, SQL) pairs mirroring what /api/ops/beepers and /api/shop/cart issue
+QUERIES: List[Tuple[str, str]] = [
+    ('status=active, newest 100',
+     "SELECT * FROM sold_beepers WHERE status = 'active' ORDER BY purchase_timestamp DESC LIMIT 100"),
+    ('user_id filter, newest 100',
+     "SELECT * FROM sold_beepers WHERE user_id = :user_id ORDER BY purchase_timestamp DESC LIMIT 100"),
+    ('model_id filter, newest 100',
+     "SELECT * FROM sold_beepers WHERE model_id = :model_id ORDER BY purchase_timestamp DESC LIMIT 100"),
+    ('keyset page (deep cursor)',
+     "SELECT * FROM sold_beepers WHERE (purchase_timestamp, id) < (:cursor_ts, :cursor_id) "
+     "ORDER BY purchase_timestamp DESC, id DESC LIMIT 100"),
+    ('count(status=activated)',
+     "SELECT count(*) FROM sold_beepers WHERE status = 'activated'"),
+]
+
+
+def generate_dataset(rows: int, users: int) -> None:
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (username, email, password_hash, created_at) "
+            "SELECT :p || g, :p || g || '@bench.local', 'benchmark-not-a-real-hash', now() "
+            "FROM generate_series(1, :users) AS g ON CONFLICT DO NOTHING"
+        ), {'p': BENCH_USER_PREFIX, 'users': users})
+        user_min, user_max = conn.execute(text(
+            "SELECT min(id), max(id) FROM users WHERE username LIKE :p || '%'"), {'p': BENCH_USER_PREFIX}).one()
+        model_ids = list(conn.execute(text("SELECT id FROM beeper_models ORDER BY id")).scalars())
+        started = time.perf_counter()
+        conn.execute(text(
+            "INSERT INTO sold_beepers (id, model_id, user_id, status, purchase_timestamp) "
+            "SELECT gen_random_uuid()::text, (CAST(:model_ids AS integer[]))[1 + (g % :model_count)], "
+            "       :user_min + (g % (:user_max - :user_min + 1)), "
+            "       CASE WHEN random() < 0.3 THEN 'activated' ELSE 'active' END, "
+            "       now() - random() * interval '730 days' "
+            "FROM generate_series(1, :rows) AS g"
+        ), {'model_ids': model_ids, 'model_count': len(model_ids), 'user_min': user_min,
+            'user_max': user_max, 'rows': rows})
+    print(f"Generated {rows:,} sold_beepers rows in {time.perf_counter() - started:.1f}s.")
+
+
+def query_params() -> Dict[str, object]:
+    with db.engine.connect() as conn:
+        user_id = conn.execute(text(
+            "SELECT user_id FROM sold_beepers GROUP BY user_id ORDER BY count(*) DESC LIMIT 1")).scalar()
+        model_id = conn.execute(text("SELECT min(id) FROM beeper_models")).scalar()
+        cursor_ts, cursor_id = conn.execute(text(
+            "SELECT purchase_timestamp, id FROM sold_beepers ORDER BY purchase_timestamp OFFSET "
+            "(SELECT count(*) / 2 FROM sold_beepers) LIMIT 1")).one()
+    return {'user_id': user_id, 'model_id': model_id, 'cursor_ts': cursor_ts, 'cursor_id': cursor_id}
+
+
+def run_queries(params: Dict[str, object], repeats: int, show_plans: bool) -> Dict[str, Tuple[float, str]]:
+    results = {}
+    with db.engine.connect() as conn:
+        conn.execute(text("ANALYZE sold_beepers"))
+        for label, sql in QUERIES:
+            bound = {k: v for k, v in params.items() if f':{k}' in sql}
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                conn.execute(text(sql), bound).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            plan = list(conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), bound).scalars())
+            results[label] = (statistics.median(timings), plan[0].strip())
+            if show_plans:
+                print(f"\n-- {label}\n" + "\n".join(plan))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=3_000_000, help='sold_beepers rows to generate')
+    parser.add_argument('--users', type=int, default=50_000, help='benchmark users to spread purchases over')
+    parser.add_argument('--repeats', type=int, default=7, help='timed runs per query (median reported)')
+    parser.add_argument('--skip-generate', action='store_true', help='reuse previously generated data')
+    parser.add_argument('--show-plans', action='store_true', help='print full EXPLAIN ANALYZE output')
+    parser.add_argument('--cleanup', action='store_true', help='delete generated benchmark rows and exit')
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_CONFIG', 'development'))
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            sys.exit("This benchmark requires PostgreSQL (generate_series, EXPLAIN ANALYZE).")
+        if args.cleanup:
+            with db.engine.begin() as conn:
+                conn.execute(text("DELETE FROM sold_beepers WHERE user_id IN "
+                                  "(SELECT id FROM users WHERE username LIKE :p || '%')"), {'p': BENCH_USER_PREFIX})
+                conn.execute(text("DELETE FROM users WHERE username LIKE :p || '%'"), {'p': BENCH_USER_PREFIX})
+            print("Benchmark data removed.")
+            return
+        if not args.skip_generate:
+            generate_dataset(args.rows, args.users)
+        params = query_params()
+
+        with db.engine.begin() as conn:
+            for index_name in HOT_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        before = run_queries(params, args.repeats, args.show_plans)
+
+        started = time.perf_counter()
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            _add_hot_column_indexes(conn)
+        print(f"\nRebuilt hot-column indexes in {time.perf_counter() - started:.1f}s.")
+        after = run_queries(params, args.repeats, args.show_plans)
+
+    print(f"\n{'query':<30} {'before ms':>10} {'after ms':>10} {'speedup':>8}  plan before -> after")
+    for label, _ in QUERIES:
+        before_ms, before_plan = before[label]
+        after_ms, after_plan = after[label]
+        speedup = before_ms / after_ms if after_ms else float('inf')
+        print(f"{label:<30} {before_ms:>10.2f} {after_ms:>10.2f} {speedup:>7.1f}x  "
+              f"{before_plan.split('  (')[0]} -> {after_plan.split('  (')[0]}")
+
+
+if __name__ == '__main__':
+    main()
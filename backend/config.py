@@ -23,6 +23,109 @@ class Config:
     DEBUG = False
     TESTING = False
 
+    # Verified-credential cache for the Basic Auth decorators (skips PBKDF2 on repeat requests)
+    CREDENTIAL_CACHE_ENABLED = os.environ.get('CREDENTIAL_CACHE_ENABLED', 'true').lower() == 'true'
+    CREDENTIAL_CACHE_MAX_ENTRIES = int(os.environ.get('CREDENTIAL_CACHE_MAX_ENTRIES', '1024'))
+    CREDENTIAL_CACHE_TTL_SECONDS = int(os.environ.get('CREDENTIAL_CACHE_TTL_SECONDS', '300'))
+
+    # Password hashing (app/utils/password_hashing.py). Stored hashes made with a different method or
+    # work factor are upgraded on the next successful login. PASSWORD_HASH_WORKERS=0 hashes inline.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2')) # Processes per app worker
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '0')) # 0: 8 per hash worker
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS', '2'))
+
+    # Login throttling: token buckets per client IP, per (login identifier, client IP) and per identifier
+    # (ACCOUNT: all addresses together), checked before any password hashing. 'memory' is per worker process; 'sqlite' shares buckets between workers on a host.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory').lower()
+    RATE_LIMIT_SQLITE_PATH = os.environ.get('RATE_LIMIT_SQLITE_PATH', 'rate_limit.sqlite3')
+    RATE_LIMIT_IP_BURST = float(os.environ.get('RATE_LIMIT_IP_BURST', '30'))
+    RATE_LIMIT_IP_PER_MINUTE = float(os.environ.get('RATE_LIMIT_IP_PER_MINUTE', '30'))
+    RATE_LIMIT_IDENTIFIER_BURST = float(os.environ.get('RATE_LIMIT_IDENTIFIER_BURST', '10'))
+    RATE_LIMIT_IDENTIFIER_PER_MINUTE = float(os.environ.get('RATE_LIMIT_IDENTIFIER_PER_MINUTE', '10'))
+    RATE_LIMIT_ACCOUNT_BURST = float(os.environ.get('RATE_LIMIT_ACCOUNT_BURST', '50'))
+    RATE_LIMIT_ACCOUNT_PER_MINUTE = float(os.environ.get('RATE_LIMIT_ACCOUNT_PER_MINUTE', '20'))
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000')) # 'memory': least recently used buckets beyond this are dropped
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', '0')) # Reverse proxies adding X-Forwarded-For
+
+    # Per-endpoint request/SQL timing histograms served in Prometheus format (per worker process)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_PATH = os.environ.get('METRICS_PATH', '/metrics')
+
+    # App log pipeline (non-debug): records are queued and written by a listener thread
+    LOG_DIR = os.environ.get('LOG_DIR', 'logs')
+    LOG_FILE_MAX_BYTES = int(os.environ.get('LOG_FILE_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_FILE_BACKUP_COUNT = int(os.environ.get('LOG_FILE_BACKUP_COUNT', '10'))
+    # 'size' rotates by LOG_FILE_MAX_BYTES in-process; 'external' reopens the file after logrotate (no copytruncate
+    # needed). 'auto' picks 'external' under gunicorn, whose workers all write the one file and must not rotate it
+    LOG_FILE_ROTATION = os.environ.get('LOG_FILE_ROTATION', 'auto').lower()
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower() # 'text' or 'json' (one object per line)
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000')) # Records beyond this are dropped, not blocked on
+    LOG_INFO_SAMPLE_RATE = float(os.environ.get('LOG_INFO_SAMPLE_RATE', '1.0')) # Fraction of INFO/DEBUG records kept
+
+    # Signed session tokens issued by /api/auth/login/* (HMAC with SECRET_KEY)
+    ACCESS_TOKEN_TTL_SECONDS = int(os.environ.get('ACCESS_TOKEN_TTL_SECONDS', '900'))
+    REFRESH_TOKEN_TTL_SECONDS = int(os.environ.get('REFRESH_TOKEN_TTL_SECONDS', str(7 * 24 * 3600)))
+
+    # JSON encoding of API responses (app/utils/json_provider.py): 'auto' uses orjson when it is
+    # installed, 'orjson' asks for it explicitly, 'stdlib' always uses the json module
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto').lower()
+
+    # Response compression (app/utils/compression.py), negotiated from Accept-Encoding. Algorithms in
+    # server preference order; 'br' and 'zstd' need the optional brotli / zstandard packages.
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_ALGORITHMS = [name.strip() for name in os.environ.get('COMPRESSION_ALGORITHMS', 'br,zstd,gzip').split(',') if name.strip()]
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')) # Bytes; smaller bodies are sent as they are
+    COMPRESSION_LEVEL_GZIP = int(os.environ.get('COMPRESSION_LEVEL_GZIP', '6'))
+    COMPRESSION_LEVEL_BR = int(os.environ.get('COMPRESSION_LEVEL_BR', '4'))
+    COMPRESSION_LEVEL_ZSTD = int(os.environ.get('COMPRESSION_LEVEL_ZSTD', '3'))
+
+    # Beeper catalog (/api/shop/models): in-process cache lifetime and HTTP Cache-Control max-age
+    CATALOG_CACHE_TTL_SECONDS = int(os.environ.get('CATALOG_CACHE_TTL_SECONDS', '60'))
+    CATALOG_HTTP_MAX_AGE = int(os.environ.get('CATALOG_HTTP_MAX_AGE', '60'))
+
+    # /api/ops/beepers keyset pagination and streaming
+    OPS_BEEPERS_PAGE_DEFAULT_LIMIT = int(os.environ.get('OPS_BEEPERS_PAGE_DEFAULT_LIMIT', '100'))
+    OPS_BEEPERS_PAGE_MAX_LIMIT = int(os.environ.get('OPS_BEEPERS_PAGE_MAX_LIMIT', '1000'))
+    OPS_BEEPERS_STREAM_BATCH_SIZE = int(os.environ.get('OPS_BEEPERS_STREAM_BATCH_SIZE', '1000'))
+    OPS_BEEPERS_EXPORT_GZIP_LEVEL = int(os.environ.get('OPS_BEEPERS_EXPORT_GZIP_LEVEL', '6')) # /api/ops/beepers/export?gzip=1
+
+    # /api/ops/stats default purchase series window when no `since` is given
+    OPS_STATS_DEFAULT_DAYS = int(os.environ.get('OPS_STATS_DEFAULT_DAYS', '30')) # granularity=day
+    OPS_STATS_DEFAULT_HOURS = int(os.environ.get('OPS_STATS_DEFAULT_HOURS', '48')) # granularity=hour
+    # Rows per (model, status, hour) counter in sold_beeper_stats; more shards, fewer checkouts waiting on one row lock
+    OPS_STATS_ROLLUP_SHARDS = int(os.environ.get('OPS_STATS_ROLLUP_SHARDS', '8'))
+
+    # Cart lines accepted by one PUT /api/shop/cart
+    CART_BATCH_MAX_ITEMS = int(os.environ.get('CART_BATCH_MAX_ITEMS', '100'))
+
+    # Ops Center Server-Sent Events (/api/ops/events). Served by the web workers, each open stream holds
+    # one server thread, so OPS_EVENTS_MAX_STREAMS stays below the threads per worker. For many operators
+    # run `python run.py --events-server` (one asyncio process, no thread per client; needs PostgreSQL
+    # NOTIFY) and route /api/ops/events to OPS_EVENTS_SERVER_PORT.
+    OPS_EVENTS_BUFFER_SIZE = int(os.environ.get('OPS_EVENTS_BUFFER_SIZE', '1000')) # Events kept for Last-Event-ID resume
+    OPS_EVENTS_MAX_STREAMS = int(os.environ.get('OPS_EVENTS_MAX_STREAMS', '2')) # Per worker process
+    OPS_EVENTS_KEEPALIVE_SECONDS = float(os.environ.get('OPS_EVENTS_KEEPALIVE_SECONDS', '15'))
+    OPS_EVENTS_MAX_STREAM_SECONDS = float(os.environ.get('OPS_EVENTS_MAX_STREAM_SECONDS', '300')) # Then client reconnects
+    OPS_EVENTS_MAX_IDS_PER_EVENT = int(os.environ.get('OPS_EVENTS_MAX_IDS_PER_EVENT', '100')) # Fits PostgreSQL's 8 KB NOTIFY limit
+    OPS_EVENTS_MAX_IDS_PER_PUBLISH = int(os.environ.get('OPS_EVENTS_MAX_IDS_PER_PUBLISH', '10000')) # Larger: count only
+    OPS_EVENTS_SERVER_HOST = os.environ.get('OPS_EVENTS_SERVER_HOST', '0.0.0.0')
+    OPS_EVENTS_SERVER_PORT = int(os.environ.get('OPS_EVENTS_SERVER_PORT', '5002'))
+    OPS_EVENTS_SERVER_MAX_STREAMS = int(os.environ.get('OPS_EVENTS_SERVER_MAX_STREAMS', '10000')) # Mind the open-file limit
+    OPS_EVENTS_SERVER_REQUEST_TIMEOUT_SECONDS = float(os.environ.get('OPS_EVENTS_SERVER_REQUEST_TIMEOUT_SECONDS', '10'))
+
+    # Max IDs per set-based UPDATE in /api/ops/beepers/activate
+    ACTIVATION_CHUNK_SIZE = int(os.environ.get('ACTIVATION_CHUNK_SIZE', '5000'))
+
+    # Background activation jobs (/api/ops/jobs); the activation_jobs table acts as the queue
+    ACTIVATION_JOB_AUTOSTART = os.environ.get('ACTIVATION_JOB_AUTOSTART', 'true').lower() == 'true'
+    ACTIVATION_JOB_WORKERS = int(os.environ.get('ACTIVATION_JOB_WORKERS', '2'))
+    ACTIVATION_JOB_BATCH_SIZE = int(os.environ.get('ACTIVATION_JOB_BATCH_SIZE', '1000'))
+    ACTIVATION_JOB_POLL_SECONDS = float(os.environ.get('ACTIVATION_JOB_POLL_SECONDS', '2'))
+    ACTIVATION_JOB_STALE_SECONDS = int(os.environ.get('ACTIVATION_JOB_STALE_SECONDS', '60'))
+    ACTIVATION_JOB_MAX_ATTEMPTS = int(os.environ.get('ACTIVATION_JOB_MAX_ATTEMPTS', '3'))
+
     # Database Configuration - values are fetched from environment variables
     # with sensible defaults for local development.
     DB_USER = os.environ.get('DB_USER', 'postgres')
@@ -40,6 +143,45 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD if DB_PASSWORD else ""}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
+    # Apply pending schema migrations (app/migrations.py) at startup; otherwise run `flask db-upgrade`
+    DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', 'true').lower() == 'true'
+
+    # Monthly partitions of sold_beepers (PostgreSQL) created ahead of time at startup and by `flask db-partitions`
+    DB_PARTITION_MONTHS_AHEAD = int(os.environ.get('DB_PARTITION_MONTHS_AHEAD', '3'))
+    # `flask archive-sold-beepers`: activated units older than this move out of sold_beepers
+    ARCHIVE_MIN_AGE_DAYS = int(os.environ.get('ARCHIVE_MIN_AGE_DAYS', '365'))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '5000'))
+
+    # Connection pool, per worker process: total connections <= workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    # Connecting through PgBouncer in transaction-pooling mode: no app-side pooling (NullPool),
+    # and session-level features such as the migration advisory lock are skipped
+    DB_PGBOUNCER_TRANSACTION_MODE = os.environ.get('DB_PGBOUNCER_TRANSACTION_MODE', 'false').lower() == 'true'
+
+    # Optional read replicas (comma-separated URIs), registered as SQLALCHEMY_BINDS 'replica_0', 'replica_1', ...
+    # GET/HEAD requests to /api/ops and /api/shop read from one of them (app/utils/replica_routing.py), except
+    # for clients that committed a write within DB_REPLICA_STICKY_SECONDS; keep that above the usual replica lag.
+    DB_REPLICA_URIS = [uri.strip() for uri in os.environ.get('DB_REPLICA_URIS', '').split(',') if uri.strip()]
+    SQLALCHEMY_BINDS = {f'replica_{index}': uri for index, uri in enumerate(DB_REPLICA_URIS)}
+    DB_REPLICA_STICKY_SECONDS = float(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5'))
+    # 'sqlite' shares sticky windows between the worker processes of one host (like RATE_LIMIT_BACKEND)
+    DB_REPLICA_STICKY_BACKEND = os.environ.get('DB_REPLICA_STICKY_BACKEND', 'memory').lower()
+    DB_REPLICA_STICKY_SQLITE_PATH = os.environ.get('DB_REPLICA_STICKY_SQLITE_PATH', 'replica_sticky.sqlite3')
+    DB_REPLICA_STICKY_MAX_KEYS = int(os.environ.get('DB_REPLICA_STICKY_MAX_KEYS', '100000')) # 'memory': expired windows are pruned beyond this
+
+    # Passed to create_engine; app/utils/db_pool.py picks the pool class at startup
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+    }
+
 
 class DevelopmentConfig(Config):
     """Development-specific configuration."""
@@ -53,6 +195,12 @@ class TestingConfig(Config):
     DB_NAME_TEST = os.environ.get('DB_NAME_TEST', 'strategic_beep_test_db')
     SQLALCHEMY_DATABASE_URI = f'postgresql://{Config.DB_USER}:{Config.DB_PASSWORD if Config.DB_PASSWORD else ""}@{Config.DB_HOST}:{Config.DB_PORT}/{DB_NAME_TEST}'
     SECRET_KEY = 'test_secret_key_for_testing_only_123!' # Fixed key for predictable test behavior
+    ACTIVATION_JOB_AUTOSTART = False # Tests drive the job runner explicitly
+    PASSWORD_HASH_WORKERS = 0 # Hash inline; no helper processes in tests
+    RATE_LIMIT_ENABLED = False # Tests log in repeatedly from one address
+    # Replica stand-in: a second local database (e.g. strategic_beep_test_replica_db); unset disables routing
+    DB_REPLICA_URIS = [uri for uri in [os.environ.get('DB_REPLICA_URI_TEST', '')] if uri]
+    SQLALCHEMY_BINDS = {f'replica_{index}': uri for index, uri in enumerate(DB_REPLICA_URIS)}
 
 class ProductionConfig(Config):
     """Production-specific configuration."""
@@ -61,7 +209,13 @@ class ProductionConfig(Config):
     SECRET_KEY = os.environ.get('SECRET_KEY')
     if not SECRET_KEY or SECRET_KEY == 'dev_default_super_secret_key_123!':
         raise ValueError("CRITICAL: Insecure or missing SECRET_KEY for production environment.")
-    
+
+    # Recycle connections before typical load balancer / firewall idle timeouts drop them
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '300'))
+    DB_POOL_PRE_PING = True # Detect connections killed by a Postgres restart before handing them out
+    SQLALCHEMY_ENGINE_OPTIONS = dict(Config.SQLALCHEMY_ENGINE_OPTIONS, pool_recycle=DB_POOL_RECYCLE,
+                                     pool_pre_ping=DB_POOL_PRE_PING)
+
     # Example: Use DATABASE_URL from environment if provided (e.g., by Heroku, Render)
     # SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', Config.SQLALCHEMY_DATABASE_URI)
     # Ensure DATABASE_URL is properly formatted if used, e.g., by replacing 'postgres://' with 'postgresql://'
@@ -0,0 +1,54 @@
+# backend/gunicorn.conf.py
+# Production WSGI server settings. Used by `python run.py --production`, or directly:
+#     gunicorn -c gunicorn.conf.py run:app
+# Every setting can be overridden through the environment variables below.
+import multiprocessing
+import os
+
+# create_app checks this so the preloaded master never starts background threads (see post_fork)
+os.environ['STRATEGIC_BEEPER_PREFORK_SERVER'] = '1'
+
+bind = f"{os.environ.get('FLASK_RUN_HOST', '0.0.0.0')}:{os.environ.get('FLASK_RUN_PORT', '5001')}"
+
+# Pre-fork workers, sized from the CPU count unless WEB_CONCURRENCY is set
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Threads per worker; requests mostly wait on PostgreSQL, so a few threads per process pay off
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+# Ops Center event streams hold a thread each here; many operators belong on `python run.py --events-server`
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Load create_app once in the master (migrations run once, workers fork with the app already imported).
+# Note: with preload, SIGHUP restarts workers but does not reload code; use USR2 + QUIT on the
+# old master for zero-downtime code upgrades, or set GUNICORN_PRELOAD=false to make HUP reload code.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+# Recycle workers periodically to bound memory growth; jitter avoids restarting them all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Gives each worker its own DB connections and background threads."""
+    from app import db, start_background_services
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        # Connections inherited from the master must not be shared; drop them without closing the master's sockets.
+        # db.engines covers the primary and every read replica bind.
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    start_background_services(app)
+
+
+def worker_exit(server, worker):
+    """Hands this worker's running activation job back to the queue (restarts, reloads, max_requests)."""
+    from app.services.activation_jobs import activation_job_runner
+
+    activation_job_runner.stop()
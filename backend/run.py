@@ -1,13 +1,59 @@
 # backend/run.py
 import os
-from app import create_app # Import the application factory
+import sys
 
 # Determine the configuration name (e.g., 'development', 'production')
 # This defaults to 'development' if the FLASK_CONFIG environment variable is not set.
 config_name = os.getenv('FLASK_CONFIG', 'development')
 
-# Create the Flask app instance using the factory with the chosen configuration
-app = create_app(config_name)
+
+def run_production_server() -> None:
+    """
+    Replaces this process with a pre-fork gunicorn master configured by gunicorn.conf.py
+    (multi-worker, threaded, preloaded create_app). Not available on Windows.
+    """
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(backend_dir)
+    gunicorn_args = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(backend_dir, 'gunicorn.conf.py'), 'run:app']
+    try:
+        import gunicorn # noqa: F401 - only checking availability before exec
+    except ImportError:
+        sys.exit("Production mode requires gunicorn (pip install -r requirements.txt; Linux/macOS only).")
+    print(f"Starting Strategic Beeper backend under gunicorn in '{config_name}' mode")
+    os.execv(sys.executable, gunicorn_args)
+
+
+def run_events_server() -> None:
+    """
+    Serves the Ops Center event stream (/api/ops/events) from one asyncio process instead of the
+    web workers' threads. Runs no activation jobs; only the LISTEN thread feeding the stream.
+    """
+    from app import PREFORK_SERVER_ENV, create_app
+    from app.services.ops_events import ops_events
+    from app.services.ops_events_server import serve
+    os.environ[PREFORK_SERVER_ENV] = '1' # Keep create_app from starting the web workers' background services
+    events_app = create_app(config_name)
+    ops_events.start()
+    serve(events_app, events_app.config['OPS_EVENTS_SERVER_HOST'], events_app.config['OPS_EVENTS_SERVER_PORT'])
+
+
+# Event stream server: `python run.py --events-server` (alongside the web server).
+if __name__ == '__main__' and '--events-server' in sys.argv[1:]:
+    run_events_server()
+    sys.exit(0)
+
+# Production mode: `python run.py --production` or SERVER_MODE=production.
+# Checked before create_app so the dev process does not build an app it is about to replace.
+if __name__ == '__main__' and ('--production' in sys.argv[1:] or os.getenv('SERVER_MODE') == 'production'):
+    run_production_server()
+
+from app import create_app # Import the application factory
+
+# Create the Flask app instance using the factory with the chosen configuration.
+# This is also the WSGI entry point used by gunicorn (run:app).
+# Password hashing pool processes import this file as '__mp_main__'; they must not build an app.
+if __name__ != '__mp_main__':
+    app = create_app(config_name)
 
 if __name__ == '__main__':
     # The seed_initial_data_if_empty function is now called within create_app
@@ -31,6 +77,6 @@ if __name__ == '__main__':
     # (e.g., app.config['DEBUG'] which is True for DevelopmentConfig)
     app.logger.info(f"Starting Strategic Beeper backend on http://{host}:{port} in '{config_name}' mode (Debug: {app.debug})")
     
-    # Run the Flask development server
+    # Run the Flask development server (single process; use --production for the pre-fork server)
     # use_reloader=True is default when debug=True, helps with development by auto-restarting on code changes.
-    app.run(host=host, port=port) 
+    app.run(host=host, port=port)
@@ -0,0 +1,122 @@
+# backend/tests/conftest.py
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures. Each test gets its own SQLite database files under tmp_path (no PostgreSQL
+needed); the read-replica stand-in is a second SQLite file copied from the primary.
+
+Run from backend/:
+    python -m pytest tests
+"""
+import shutil
+from typing import Any, Callable, Dict, Iterable, List
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import config
+from app import create_app, db
+from app.models import User
+
+TEST_USER = {'username': 'test_user', 'email': 'test_user@test.local', 'password': 'test_password123'}
+TEST_OPERATOR = {'username': 'admin', 'password': 'op_password123'} # Seeded by create_app
+
+
+class QueryCounter:
+    """Records the statements executed on each of the given engines, keyed by engine label."""
+
+    def __init__(self, engines: Dict[str, Engine]) -> None:
+        self.statements: Dict[str, List[str]] = {label: [] for label in engines}
+        self._listeners = []
+        for label, engine in engines.items():
+            def record(conn: Any, cursor: Any, statement: str, *args: Any, _label: str = label) -> None:
+                self.statements[_label].append(statement)
+            event.listen(engine, 'before_cursor_execute', record)
+            self._listeners.append((engine, record))
+
+    def reset(self) -> None:
+        for statements in self.statements.values():
+            statements.clear()
+
+    def __getitem__(self, label: str) -> int:
+        return len(self.statements[label])
+
+    def close(self) -> None:
+        for engine, count in self._listeners:
+            event.remove(engine, 'before_cursor_execute', count)
+
+
+def _create_test_user(app: Flask) -> None:
+    with app.app_context():
+        user = User(username=TEST_USER['username'], email=TEST_USER['email'])
+        user.set_password(TEST_USER['password'])
+        db.session.add(user)
+        db.session.commit()
+        db.session.remove()
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch) -> Callable[..., Flask]:
+    """
+    Factory for a migrated and seeded 'testing' app on a fresh SQLite file. `replicas=1` adds a
+    replica_0 bind holding a copy of the primary taken after seeding; `config_overrides` are set
+    on TestingConfig before create_app.
+    """
+    def factory(replicas: int = 0, **config_overrides: Any) -> Flask:
+        primary_path = tmp_path / 'primary.sqlite3'
+        monkeypatch.setattr(config.TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{primary_path}')
+        monkeypatch.setattr(config.TestingConfig, 'SQLALCHEMY_BINDS', {})
+        monkeypatch.setattr(config.TestingConfig, 'DB_REPLICA_URIS', [])
+        seed_app = create_app('testing')
+        _create_test_user(seed_app)
+        with seed_app.app_context():
+            db.engine.dispose()
+        if not replicas and not config_overrides:
+            return seed_app
+
+        binds = {}
+        for index in range(replicas):
+            replica_path = tmp_path / f'replica_{index}.sqlite3'
+            shutil.copyfile(primary_path, replica_path)
+            binds[f'replica_{index}'] = f'sqlite:///{replica_path}'
+        monkeypatch.setattr(config.TestingConfig, 'SQLALCHEMY_BINDS', binds)
+        monkeypatch.setattr(config.TestingConfig, 'DB_REPLICA_URIS', list(binds.values()))
+        for name, value in config_overrides.items():
+            monkeypatch.setattr(config.TestingConfig, name, value, raising=False)
+        return create_app('testing')
+    return factory
+
+
+@pytest.fixture
+def count_queries() -> Iterable[Callable[[Flask], QueryCounter]]:
+    """count_queries(app) -> QueryCounter on every engine of `app` ('default', 'replica_0', ...)."""
+    counters = []
+
+    def factory(app: Flask) -> QueryCounter:
+        from app.utils.db_pool import engine_label
+        with app.app_context():
+            engines = {engine_label(bind_key): engine for bind_key, engine in db.engines.items()}
+        counter = QueryCounter(engines)
+        counters.append(counter)
+        return counter
+    yield factory
+    for counter in counters:
+        counter.close()
+
+
+def login(client: Any, operator: bool = False) -> Dict[str, str]:
+    """Authorization header with a fresh access token for the test user (or the seeded operator)."""
+    if operator:
+        response = client.post('/api/auth/login/operator', json=TEST_OPERATOR)
+    else:
+        response = client.post('/api/auth/login/user',
+                               json={'identifier': TEST_USER['username'], 'password': TEST_USER['password']})
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def first_model_id(app: Flask) -> int:
+    from app.models import BeeperModel
+    with app.app_context():
+        return db.session.query(BeeperModel.id).order_by(BeeperModel.id).first()[0]
@@ -0,0 +1,69 @@
+# backend/tests/test_activation_jobs.py
+# -*- coding: utf-8 -*-
+import datetime
+import os
+import runpy
+import threading
+
+from sqlalchemy import insert, select
+
+from app import PREFORK_SERVER_ENV, db
+from app.models import ActivationJob, SoldBeeper, User
+from app.services import activation_jobs
+from app.services.activation_jobs import ActivationJobRunner, activation_job_runner, submit_activation_job
+from app.utils.guid import uuid7
+from conftest import first_model_id
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNITS = 5
+
+
+def _queue_job(app):
+    model_id = first_model_id(app)
+    with app.app_context():
+        user_id = db.session.scalar(select(User.id))
+        unit_ids = [str(uuid7()) for _ in range(UNITS)]
+        db.session.execute(insert(SoldBeeper), [
+            {'id': unit_id, 'model_id': model_id, 'user_id': user_id, 'status': 'active',
+             'purchase_timestamp': datetime.datetime(2024, 1, 1)} for unit_id in unit_ids
+        ])
+        job = submit_activation_job(operator_id=1, beeper_ids=unit_ids)
+        db.session.commit()
+        return job.id
+
+
+def test_stopped_runner_requeues_its_job(make_app, monkeypatch):
+    app = make_app(ACTIVATION_JOB_WORKERS=1, ACTIVATION_JOB_BATCH_SIZE=1, ACTIVATION_JOB_POLL_SECONDS=0.05)
+    job_id = _queue_job(app)
+    runner = ActivationJobRunner()
+    runner.init_app(app)
+    in_first_batch = threading.Event()
+    process_next_batch = activation_jobs.process_next_batch
+
+    def first_batch_waits_for_stop(*args, **kwargs):
+        # Holds the worker inside its first batch until stop() was called, like a shutdown mid-job
+        in_first_batch.set()
+        runner._stopping.wait(5)
+        return process_next_batch(*args, **kwargs)
+    monkeypatch.setattr(activation_jobs, 'process_next_batch', first_batch_waits_for_stop)
+
+    runner.start()
+    assert in_first_batch.wait(5)
+    runner.stop()
+
+    assert not runner.running
+    with app.app_context():
+        job = db.session.get(ActivationJob, job_id)
+        assert (job.status, job.worker_id) == ('queued', None)
+        assert job.batches_completed == 1 # The batch in progress was finished, not abandoned
+
+
+def test_gunicorn_workers_stop_the_runner_on_exit(monkeypatch):
+    monkeypatch.setenv(PREFORK_SERVER_ENV, '1') # Set by gunicorn.conf.py; restored afterwards
+    stopped = []
+    monkeypatch.setattr(activation_job_runner, 'stop', lambda: stopped.append(True))
+    settings = runpy.run_path(os.path.join(BACKEND_DIR, 'gunicorn.conf.py'))
+
+    settings['worker_exit'](None, None)
+
+    assert stopped == [True]
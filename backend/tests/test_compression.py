@@ -0,0 +1,39 @@
+# backend/tests/test_compression.py
+# -*- coding: utf-8 -*-
+import gzip
+import zlib
+
+from app.utils.compression import iter_compressed
+from conftest import login
+
+
+def test_iter_compressed_flushes_every_chunk():
+    decompressor = zlib.decompressobj(31)
+    received = [decompressor.decompress(data) for data in iter_compressed(['first,', b'second'], 'gzip', 6)]
+
+    assert received[:2] == [b'first,', b'second'] # Readable before the stream ends
+    assert b''.join(received) + decompressor.flush() == b'first,second'
+
+
+def test_gzip_export_is_a_gzip_file_left_alone_by_the_middleware(make_app):
+    app = make_app(COMPRESSION_MIN_SIZE=0)
+    client = app.test_client()
+    headers = dict(login(client, operator=True), **{'Accept-Encoding': 'gzip'})
+
+    response = client.get('/api/ops/beepers/export?gzip=1', headers=headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/gzip'
+    assert 'Content-Encoding' not in response.headers
+    assert gzip.decompress(response.get_data()).decode('utf-8').startswith('id,')
+
+
+def test_streamed_json_is_compressed_by_the_middleware(make_app):
+    app = make_app()
+    client = app.test_client()
+    headers = dict(login(client, operator=True), **{'Accept-Encoding': 'gzip'})
+
+    response = client.get('/api/ops/beepers?stream=true', headers=headers)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == b'[]'
@@ -0,0 +1,41 @@
+# backend/tests/test_credential_cache.py
+# -*- coding: utf-8 -*-
+from sqlalchemy import delete, update
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import User
+from app.utils.credential_cache import credential_cache
+from conftest import TEST_USER
+
+LOGIN = {'identifier': TEST_USER['username'], 'password': TEST_USER['password']}
+
+
+def _change_elsewhere(app, statement):
+    # A Core statement fires no ORM events, like a change made by another worker process
+    with app.app_context():
+        db.session.execute(statement)
+        db.session.commit()
+
+
+def test_password_changed_by_another_process_is_not_served_from_cache(make_app):
+    app = make_app()
+    client = app.test_client()
+    assert client.post('/api/auth/login/user', json=LOGIN).status_code == 200
+    assert credential_cache.stats()['size'] == 1
+
+    _change_elsewhere(app, update(User).where(User.username == TEST_USER['username'])
+                      .values(password_hash=generate_password_hash('new_password456', 'pbkdf2:sha256:1000')))
+
+    assert client.post('/api/auth/login/user', json=LOGIN).status_code == 401
+    assert credential_cache.stats()['size'] == 0
+
+
+def test_account_deleted_by_another_process_is_not_served_from_cache(make_app):
+    app = make_app()
+    client = app.test_client()
+    assert client.post('/api/auth/login/user', json=LOGIN).status_code == 200
+
+    _change_elsewhere(app, delete(User).where(User.username == TEST_USER['username']))
+
+    assert client.post('/api/auth/login/user', json=LOGIN).status_code == 401
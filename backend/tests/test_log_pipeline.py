@@ -0,0 +1,49 @@
+# backend/tests/test_log_pipeline.py
+# -*- coding: utf-8 -*-
+import threading
+from logging.handlers import RotatingFileHandler, WatchedFileHandler
+
+import pytest
+from flask import Flask
+
+from app import PREFORK_SERVER_ENV
+from app.utils.log_pipeline import DroppingQueueHandler, LogPipeline
+
+@pytest.fixture
+def pipeline_app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(LOG_DIR=str(tmp_path), LOG_FILE_MAX_BYTES=1024, LOG_FILE_BACKUP_COUNT=1,
+                      LOG_FILE_ROTATION='auto')
+    pipeline = LogPipeline()
+    yield app, pipeline
+    pipeline.stop()
+
+
+def test_init_app_leaves_logging_to_the_process_that_starts(pipeline_app):
+    # E.g. a preloading gunicorn master: nothing for the forked workers to inherit
+    app, pipeline = pipeline_app
+    threads_before = threading.active_count()
+
+    pipeline.init_app(app)
+
+    assert threading.active_count() == threads_before
+    assert not any(isinstance(handler, DroppingQueueHandler) for handler in app.logger.handlers)
+
+    pipeline.start()
+
+    assert threading.active_count() == threads_before + 1
+    assert any(isinstance(handler, DroppingQueueHandler) for handler in app.logger.handlers)
+
+@pytest.mark.parametrize('prefork, expected', [('1', WatchedFileHandler), (None, RotatingFileHandler)])
+def test_workers_of_a_prefork_server_do_not_rotate_the_shared_file(pipeline_app, monkeypatch, prefork, expected):
+    app, pipeline = pipeline_app
+    if prefork:
+        monkeypatch.setenv(PREFORK_SERVER_ENV, prefork)
+    else:
+        monkeypatch.delenv(PREFORK_SERVER_ENV, raising=False)
+
+    pipeline.init_app(app)
+    pipeline.start()
+
+    file_handlers = [target for target in pipeline._listener.handlers if hasattr(target, 'baseFilename')]
+    assert [type(target) for target in file_handlers] == [expected]
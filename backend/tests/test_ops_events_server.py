@@ -0,0 +1,110 @@
+# backend/tests/test_ops_events_server.py
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.services.ops_events import UNITS_ACTIVATED, ops_events
+from app.services.ops_events_server import EVENTS_PATH, OpsEventServer
+from conftest import login
+
+FAN_OUT_CLIENTS = 500
+
+
+@pytest.fixture
+def events_server():
+    """Starts an OpsEventServer for an app on its own event loop thread; yields its port."""
+    started = []
+
+    def start(app):
+        loop = asyncio.new_event_loop()
+        server_obj = OpsEventServer(app)
+        server = loop.run_until_complete(server_obj.start('127.0.0.1', 0))
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        started.append((loop, server, server_obj, thread))
+        return server.sockets[0].getsockname()[1]
+    yield start
+    for loop, server, server_obj, thread in started:
+        server_obj.detach()
+        asyncio.run_coroutine_threadsafe(_shut_down(server), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+async def _shut_down(server):
+    server.close()
+    streams = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in streams:
+        task.cancel()
+    await asyncio.gather(*streams, return_exceptions=True)
+
+
+async def _open_stream(port, token):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {EVENTS_PATH}?access_token={token} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    head = await reader.readuntil(b'retry: 3000\n\n')
+    return reader, writer, head
+
+
+def _publish_activation(app, unit_ids):
+    # As a web worker would: the event is delivered once the publishing transaction commits
+    with app.app_context():
+        db.session.execute(text('SELECT 1')) # Opens the transaction the event rides on
+        ops_events.publish(UNITS_ACTIVATED, {'status': 'activated', 'unit_ids': unit_ids})
+        db.session.commit()
+
+
+def test_one_event_reaches_every_client_without_a_thread_each(make_app, events_server):
+    app = make_app()
+    token = login(app.test_client(), operator=True)['Authorization'].split(' ', 1)[1]
+    port = events_server(app)
+    threads_before = threading.active_count()
+
+    async def fan_out():
+        streams = await asyncio.gather(*(_open_stream(port, token) for _ in range(FAN_OUT_CLIENTS)))
+        assert all(head.startswith(b'HTTP/1.1 200 OK') for _, _, head in streams)
+        assert threading.active_count() == threads_before
+
+        await asyncio.get_running_loop().run_in_executor(None, _publish_activation, app, ['unit-1'])
+        received = await asyncio.wait_for(
+            asyncio.gather(*(reader.readuntil(b'\n\n') for reader, _, _ in streams)), 10)
+        for writer in (writer for _, writer, _ in streams):
+            writer.close()
+        return received
+
+    received = asyncio.run(fan_out())
+
+    assert len(received) == FAN_OUT_CLIENTS
+    for message in received:
+        lines = dict(line.split(': ', 1) for line in message.decode().strip().split('\n'))
+        assert lines['event'] == UNITS_ACTIVATED
+        assert json.loads(lines['data'])['unit_ids'] == ['unit-1']
+
+
+def test_rejects_missing_token_and_streams_over_the_cap(make_app, events_server):
+    app = make_app(OPS_EVENTS_SERVER_MAX_STREAMS=1)
+    token = login(app.test_client(), operator=True)['Authorization'].split(' ', 1)[1]
+    port = events_server(app)
+
+    async def connect():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET {EVENTS_PATH} HTTP/1.1\r\n\r\n'.encode())
+        unauthorized = await reader.read()
+        first = await _open_stream(port, token)
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET {EVENTS_PATH}?access_token={token} HTTP/1.1\r\n\r\n'.encode())
+        over_cap = await reader.read()
+        first[1].close()
+        return unauthorized, over_cap
+
+    unauthorized, over_cap = asyncio.run(connect())
+
+    assert unauthorized.startswith(b'HTTP/1.1 401')
+    assert over_cap.startswith(b'HTTP/1.1 503')
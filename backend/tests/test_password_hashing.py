@@ -0,0 +1,49 @@
+# backend/tests/test_password_hashing.py
+# -*- coding: utf-8 -*-
+import os
+import signal
+
+import pytest
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from app.utils.password_hashing import PasswordHasher
+
+PASSWORD = 'correct horse battery staple'
+
+
+@pytest.fixture
+def hasher():
+    app = Flask(__name__)
+    app.config.update(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', PASSWORD_HASH_WORKERS=2)
+    password_hasher = PasswordHasher()
+    password_hasher.init_app(app)
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+def test_hashes_inline_until_started_in_this_process(hasher):
+    # E.g. seeding in a preloading gunicorn master: no pool for the workers to inherit
+    assert hasher.verify_password(generate_password_hash(PASSWORD, 'pbkdf2:sha256:1000'), PASSWORD)
+    assert hasher._executor is None
+
+
+def test_pool_uses_forkserver_processes(hasher):
+    hasher.start()
+    assert hasher._executor is None # Created on first use
+
+    assert hasher.verify_password(hasher.hash_password(PASSWORD), PASSWORD)
+    assert hasher._executor._mp_context.get_start_method() == 'forkserver'
+
+
+def test_replaces_a_broken_pool_and_retries(hasher):
+    hasher.start()
+    stored = hasher.hash_password(PASSWORD)
+    broken = hasher._executor
+    for process in list(broken._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+    assert hasher.verify_password(stored, PASSWORD)
+    assert hasher._executor is not broken
+    assert hasher.verify_password(stored, PASSWORD)
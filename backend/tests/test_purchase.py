@@ -0,0 +1,19 @@
+# backend/tests/test_purchase.py
+# -*- coding: utf-8 -*-
+from conftest import first_model_id, login
+
+
+def test_purchase_returns_every_created_unit_id(make_app):
+    app = make_app()
+    client = app.test_client()
+    headers = login(client)
+    assert client.post('/api/shop/cart/add', json={'model_id': first_model_id(app), 'quantity': 1500},
+                       headers=headers).status_code == 200
+
+    response = client.post('/api/shop/purchase', headers=headers)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['units_purchased_count'] == 1500
+    assert len(set(body['purchased_unit_ids'])) == 1500
+    assert client.get('/api/shop/cart', headers=headers).get_json() == []
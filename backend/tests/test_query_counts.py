@@ -0,0 +1,109 @@
+# backend/tests/test_query_counts.py
+# -*- coding: utf-8 -*-
+import datetime
+
+from sqlalchemy import insert, select
+
+from app import db
+from app.models import BeeperModel, CartItem, SoldBeeper, User
+from app.utils.guid import uuid7
+from conftest import TEST_USER, first_model_id, login
+
+
+def _add_models(app, count):
+    with app.app_context():
+        db.session.add_all(BeeperModel(name=f'Query count model {index}', price=10.0) for index in range(count))
+        db.session.commit()
+        return list(db.session.scalars(select(BeeperModel.id).order_by(BeeperModel.id)))
+
+
+def _test_user_id(app):
+    with app.app_context():
+        return db.session.scalar(select(User.id).where(User.username == TEST_USER['username']))
+
+
+def _fill_cart(app, model_ids):
+    user_id = _test_user_id(app)
+    with app.app_context():
+        db.session.execute(insert(CartItem), [{'user_id': user_id, 'model_id': model_id, 'quantity': 1}
+                                              for model_id in model_ids])
+        db.session.commit()
+
+
+def _add_sold_beepers(app, count):
+    user_id = _test_user_id(app)
+    model_id = first_model_id(app)
+    started_at = datetime.datetime(2024, 1, 1)
+    with app.app_context():
+        db.session.execute(insert(SoldBeeper), [
+            {'id': str(uuid7()), 'model_id': model_id, 'user_id': user_id, 'status': 'active',
+             'purchase_timestamp': started_at + datetime.timedelta(minutes=index)}
+            for index in range(count)
+        ])
+        db.session.commit()
+
+
+def _queries_for(client, counter, url, headers):
+    client.get(url, headers=headers) # Warm per-process caches (catalog snapshot, credentials)
+    counter.reset()
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return counter['default'], response.get_json()
+
+
+def test_cart_listing_query_count_does_not_grow_with_lines(make_app, count_queries):
+    app = make_app()
+    model_ids = _add_models(app, 30)
+    client = app.test_client()
+    headers = login(client)
+    queries = count_queries(app)
+
+    _fill_cart(app, model_ids[:1])
+    one_line_queries, items = _queries_for(client, queries, '/api/shop/cart', headers)
+    assert len(items) == 1
+    _fill_cart(app, model_ids[1:])
+    many_lines_queries, items = _queries_for(client, queries, '/api/shop/cart', headers)
+    assert len(items) == len(model_ids)
+    assert all(item['model_details'] is not None for item in items)
+
+    assert many_lines_queries == one_line_queries
+
+
+def test_ops_listing_query_count_does_not_grow_with_rows(make_app, count_queries):
+    app = make_app()
+    client = app.test_client()
+    headers = login(client, operator=True)
+    queries = count_queries(app)
+
+    _add_sold_beepers(app, 1)
+    one_row_queries, items = _queries_for(client, queries, '/api/ops/beepers', headers)
+    assert len(items) == 1
+    _add_sold_beepers(app, 200)
+    many_rows_queries, items = _queries_for(client, queries, '/api/ops/beepers', headers)
+    assert len(items) == 201
+    assert all(item['model_name'] for item in items)
+
+    assert many_rows_queries == one_row_queries
+
+
+def test_cart_item_update_and_remove_do_not_load_models(make_app, count_queries):
+    app = make_app()
+    model_id = first_model_id(app)
+    client = app.test_client()
+    headers = login(client)
+    _fill_cart(app, [model_id])
+    client.get('/api/shop/cart', headers=headers) # Catalog snapshot built
+    queries = count_queries(app)
+
+    response = client.put(f'/api/shop/cart/item/{model_id}', json={'quantity': 3}, headers=headers)
+
+    assert response.status_code == 200
+    item = response.get_json()
+    assert item['quantity'] == 3
+    assert item['model_details']['id'] == model_id
+    assert not any('beeper_models' in statement for statement in queries.statements['default'])
+
+    queries.reset()
+    assert client.delete(f'/api/shop/cart/item/{model_id}', headers=headers).status_code == 200
+    assert client.delete(f'/api/shop/cart/item/{model_id}', headers=headers).status_code == 404
+    assert not any('beeper_models' in statement for statement in queries.statements['default'])
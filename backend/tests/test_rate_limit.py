@@ -0,0 +1,57 @@
+# backend/tests/test_rate_limit.py
+# -*- coding: utf-8 -*-
+import pytest
+from flask import Flask
+
+from app.utils.rate_limit import BucketPolicy, LoginRateLimiter, MemoryBucketStore, RateLimitExceeded
+
+
+@pytest.fixture
+def limiter():
+    app = Flask(__name__)
+    app.config.update(RATE_LIMIT_IP_BURST=100, RATE_LIMIT_IP_PER_MINUTE=100,
+                      RATE_LIMIT_IDENTIFIER_BURST=3, RATE_LIMIT_IDENTIFIER_PER_MINUTE=3,
+                      RATE_LIMIT_ACCOUNT_BURST=10, RATE_LIMIT_ACCOUNT_PER_MINUTE=10)
+    rate_limiter = LoginRateLimiter()
+    rate_limiter.init_app(app)
+    return app, rate_limiter
+
+
+def _check_from(app, rate_limiter, ip, identifier):
+    with app.test_request_context(environ_base={'REMOTE_ADDR': ip}):
+        rate_limiter.check('user', identifier)
+
+
+def test_guessing_a_username_does_not_lock_out_its_owner(limiter):
+    app, rate_limiter = limiter
+    for _ in range(3):
+        _check_from(app, rate_limiter, '203.0.113.9', 'victim')
+    with pytest.raises(RateLimitExceeded):
+        _check_from(app, rate_limiter, '203.0.113.9', 'Victim ')
+
+    _check_from(app, rate_limiter, '198.51.100.7', 'victim') # The owner, from their own address
+
+
+def test_guessing_one_account_from_many_addresses_is_throttled(limiter):
+    app, rate_limiter = limiter
+    attempts = 0
+    with pytest.raises(RateLimitExceeded):
+        for index in range(100):
+            _check_from(app, rate_limiter, f'203.0.113.{index}', 'victim') # Every address stays under its own limit
+            attempts += 1
+
+    assert attempts == 10
+
+
+def test_memory_store_is_capped_and_evicts_least_recently_used():
+    store = MemoryBucketStore(max_keys=100)
+    policy = BucketPolicy(burst=1, per_minute=1)
+    assert store.take('kept', policy, 0.0) == (True, 0.0)
+
+    for index in range(1000):
+        store.take(f'unique-{index}', policy, 1.0)
+        store.take('kept', policy, 1.0) # Recently used: never evicted
+
+    assert len(store) == 100
+    assert store.take('kept', policy, 1.0)[0] is False
+    assert store.take('unique-0', policy, 1.0)[0] is True # Evicted, so it starts over full
@@ -0,0 +1,74 @@
+# backend/tests/test_replica_routing.py
+# -*- coding: utf-8 -*-
+import time
+
+from app import db
+from app.models import BeeperModel
+from conftest import first_model_id, login
+
+
+def test_get_reads_go_to_replica(make_app, count_queries):
+    app = make_app(replicas=1)
+    client = app.test_client()
+    headers = login(client)
+    client.get('/api/shop/models') # The shared catalog snapshot is always built on the primary
+    queries = count_queries(app)
+
+    response = client.get('/api/shop/cart', headers=headers)
+
+    assert response.status_code == 200
+    assert queries['replica_0'] > 0
+    assert queries['default'] == 0
+
+
+def test_post_stays_on_primary(make_app, count_queries):
+    app = make_app(replicas=1)
+    client = app.test_client()
+    headers = login(client)
+    queries = count_queries(app)
+
+    response = client.post('/api/shop/cart/add', json={'model_id': first_model_id(app), 'quantity': 2}, headers=headers)
+
+    assert response.status_code == 200
+    assert queries['default'] > 0
+    assert queries['replica_0'] == 0
+
+
+def test_reads_after_write_stick_to_primary(make_app, count_queries):
+    # The replica is a copy taken before the write and is never updated, so a cart line is only
+    # visible when the read goes to the primary
+    app = make_app(replicas=1, DB_REPLICA_STICKY_SECONDS=0.5)
+    client = app.test_client()
+    headers = login(client)
+    model_id = first_model_id(app)
+    assert client.post('/api/shop/cart/add', json={'model_id': model_id}, headers=headers).status_code == 200
+    queries = count_queries(app)
+
+    response = client.get('/api/shop/cart', headers=headers)
+
+    assert [item['model_id'] for item in response.get_json()] == [model_id]
+    assert queries['default'] > 0
+    assert queries['replica_0'] == 0
+
+    time.sleep(0.6) # Sticky window over: back to the (stale) replica
+    queries.reset()
+    response = client.get('/api/shop/cart', headers=headers)
+
+    assert response.get_json() == []
+    assert queries['replica_0'] > 0
+    assert queries['default'] == 0
+
+
+def test_catalog_snapshot_is_built_from_the_primary(make_app, count_queries):
+    # Shared by every client for the cache TTL, so it must not come from a replica that is behind
+    app = make_app(replicas=1)
+    client = app.test_client()
+    with app.app_context():
+        db.session.add(BeeperModel(name='Added after the replica copy', price=10.0))
+        db.session.commit() # Invalidates the catalog cache
+    queries = count_queries(app)
+
+    response = client.get('/api/shop/models')
+
+    assert 'Added after the replica copy' in [model['name'] for model in response.get_json()]
+    assert queries['replica_0'] == 0
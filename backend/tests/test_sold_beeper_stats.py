@@ -0,0 +1,56 @@
+# backend/tests/test_sold_beeper_stats.py
+# -*- coding: utf-8 -*-
+import datetime
+import logging
+
+from sqlalchemy import func, insert, select, text
+
+from app import db
+from app.migrations import run_migrations
+from app.models import SoldBeeper, SoldBeeperStat, User
+from app.services.sold_beeper_stats import query_stats, record_activated_units, record_purchased_units
+from app.utils.guid import uuid7
+from conftest import first_model_id
+
+HOUR = datetime.datetime(2024, 1, 1, 10)
+
+
+def test_counters_are_spread_over_shards_and_summed_by_readers(make_app):
+    app = make_app(OPS_STATS_ROLLUP_SHARDS=4)
+    model_id = first_model_id(app)
+    with app.app_context():
+        for _ in range(40): # One checkout each
+            record_purchased_units([(model_id, HOUR)])
+        for _ in range(10):
+            record_activated_units([(model_id, HOUR)])
+        db.session.commit()
+
+        shards = db.session.scalar(select(func.count(SoldBeeperStat.shard.distinct())))
+        stats = query_stats('hour', HOUR, HOUR + datetime.timedelta(hours=1), model_id=model_id)
+
+    assert shards > 1
+    assert stats['totals_by_status'] == {'active': 30, 'activated': 10}
+    assert stats['purchases'] == [{'period': HOUR.isoformat(), 'count': 40}]
+
+
+def test_migration_rebuilds_an_unsharded_rollup(make_app):
+    app = make_app()
+    model_id = first_model_id(app)
+    with app.app_context():
+        user_id = db.session.scalar(select(User.id))
+        db.session.execute(insert(SoldBeeper), [
+            {'id': str(uuid7()), 'model_id': model_id, 'user_id': user_id, 'status': 'active',
+             'purchase_timestamp': HOUR} for _ in range(3)
+        ])
+        db.session.commit()
+        with db.engine.begin() as conn: # The table as migration 3 created it
+            conn.execute(text("DROP TABLE sold_beeper_stats"))
+            conn.execute(text("CREATE TABLE sold_beeper_stats (model_id INTEGER NOT NULL, status VARCHAR(20) NOT NULL, "
+                              "purchase_hour DATETIME NOT NULL, unit_count BIGINT NOT NULL, "
+                              "PRIMARY KEY (model_id, status, purchase_hour))"))
+            conn.execute(text("DELETE FROM schema_migrations WHERE version = 8"))
+
+        assert run_migrations(db.engine, logging.getLogger(__name__)) == 1
+        stats = query_stats('hour', HOUR, HOUR + datetime.timedelta(hours=1), model_id=model_id)
+
+    assert stats['totals_by_status'] == {'active': 3}
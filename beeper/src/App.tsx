@@ -35,10 +35,10 @@ import {
   registerUser as apiRegisterUser,
   getCart as apiGetCart,
   addToCart as apiAddToCart,
-  removeFromCart as apiRemoveFromCart,
-  updateCartItemQuantity as apiUpdateCartItemQuantity,
+  setCartQuantities as apiSetCartQuantities,
   purchaseBeepersFromCart as apiPurchaseBeepersFromCart,
   getBeeperModels as apiGetBeeperModels,
+  setAuthSessionHandlers,
 } from "./services/api";
 import { useStyles } from "./AppStyles";
 
@@ -121,7 +121,7 @@ const App: React.FC = () => {
 
   const handleLoginSuccess = useCallback(
     (
-      creds: { username: string; password_plaintext: string },
+      creds: NonNullable<AppAuthState["credentials"]>,
       entityDetails: UserData | OperatorData,
       role: "user" | "operator"
     ) => {
@@ -152,6 +152,26 @@ const App: React.FC = () => {
     navigate("/login");
   }, [navigate, openSnackbar]);
 
+  // services/api.ts renews expired access tokens with the refresh token and reports the outcome here
+  useEffect(() => {
+    setAuthSessionHandlers({
+      onTokensRefreshed: (credentials) =>
+        setAuthState((prev) =>
+          // Ignore a refresh that finishes after logout or a different login
+          prev.credentials?.username === credentials.username
+            ? { ...prev, credentials }
+            : prev
+        ),
+      onSessionExpired: () => {
+        setAuthState(initialAuthState);
+        setCartItems([]);
+        openSnackbar("תוקף ההתחברות פג. אנא התחבר מחדש.", "warning");
+        navigate("/login");
+      },
+    });
+    return () => setAuthSessionHandlers(null);
+  }, [navigate, openSnackbar]);
+
   useEffect(() => {
     if (authState.role === "user" && authState.credentials) {
       fetchCartItems(authState.credentials);
@@ -197,8 +217,11 @@ const App: React.FC = () => {
       return;
     setCartLoading(true);
     try {
-      await apiRemoveFromCart(modelId, authState.credentials);
-      await fetchCartItems(authState.credentials); // Refetch entire cart
+      const backendCart = await apiSetCartQuantities(
+        [{ model_id: modelId, quantity: 0 }],
+        authState.credentials
+      ); // Responds with the updated cart, so no refetch
+      setCartItems(transformBackendCartToFrontend(backendCart));
       openSnackbar("מוצר נמחק מעגלה.", "info");
     } catch (err) {
       const error = err as Error;
@@ -224,12 +247,11 @@ const App: React.FC = () => {
     }
     setCartLoading(true);
     try {
-      await apiUpdateCartItemQuantity(
-        modelId,
-        newQuantity,
+      const backendCart = await apiSetCartQuantities(
+        [{ model_id: modelId, quantity: newQuantity }],
         authState.credentials
-      );
-      await fetchCartItems(authState.credentials); // Refetch entire cart
+      ); // Responds with the updated cart, so no refetch
+      setCartItems(transformBackendCartToFrontend(backendCart));
       openSnackbar("כמות מוצר עודכנה בהצלחה.", "success");
     } catch (err) {
       const error = err as Error;
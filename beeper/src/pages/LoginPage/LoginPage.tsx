@@ -11,12 +11,20 @@ import {
   Switch,
   FormControlLabel,
 } from "@mui/material";
-import { UserData, OperatorData, SnackbarSeverity } from "../../types";
+import {
+  AppAuthState,
+  UserData,
+  OperatorData,
+  SnackbarSeverity,
+  UserLoginApiResponse,
+  OperatorLoginApiResponse,
+} from "../../types";
+import { credentialsFromTokens } from "../../services/api";
 import { useStyles } from "./LoginPageStyles";
 
 interface LoginPageProps {
   onLoginSuccess: (
-    credentials: { username: string; password_plaintext: string },
+    credentials: NonNullable<AppAuthState["credentials"]>,
     entityDetails: UserData | OperatorData,
     role: "user" | "operator"
   ) => void;
@@ -24,11 +32,11 @@ interface LoginPageProps {
   apiLoginUser: (
     identifier: string,
     password_plaintext: string
-  ) => Promise<{ message: string; user: UserData; role: "user" }>;
+  ) => Promise<UserLoginApiResponse>;
   apiLoginOperator: (
     username: string,
     password_plaintext: string
-  ) => Promise<{ message: string; operator: OperatorData; role: "operator" }>;
+  ) => Promise<OperatorLoginApiResponse>;
 }
 
 export const LoginPage: React.FC<LoginPageProps> = ({
@@ -60,14 +68,14 @@ export const LoginPage: React.FC<LoginPageProps> = ({
       if (isOperatorLogin) {
         const response = await apiLoginOperator(identifier, password);
         onLoginSuccess(
-          { username: identifier, password_plaintext: password },
+          credentialsFromTokens(response.operator.username, response),
           response.operator,
           "operator"
         );
       } else {
         const response = await apiLoginUser(identifier, password);
         onLoginSuccess(
-          { username: response.user.username, password_plaintext: password }, // Use actual username from response for user
+          credentialsFromTokens(response.user.username, response), // Actual username, not the email typed
           response.user,
           "user"
         );
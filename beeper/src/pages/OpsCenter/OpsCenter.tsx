@@ -19,7 +19,11 @@ import CheckCircleOutlineIcon from "@mui/icons-material/CheckCircleOutline";
 import HighlightOffIcon from "@mui/icons-material/HighlightOff";
 import PlayArrowIcon from "@mui/icons-material/PlayArrow";
 import SearchIcon from "@mui/icons-material/Search";
-import { getSoldBeepers, activateBeepers } from "../../services/api";
+import {
+  getSoldBeepers,
+  activateBeepers,
+  openOpsEventStream,
+} from "../../services/api";
 import { SoldBeeper, AppAuthState, SnackbarSeverity } from "../../types";
 import { useStyles } from "./OpsCenterStyles";
 
@@ -62,6 +66,52 @@ export const OpsCenter: React.FC<OpsCenterProps> = ({
     fetchBeepers();
   }, [fetchBeepers]);
 
+  // Live deltas: apply purchases/activations without re-fetching the list
+  useEffect(() => {
+    const source = openOpsEventStream(operatorCredentials, {
+      onUnitsPurchased: (event) => {
+        if (
+          event.truncated ||
+          !event.unit_ids ||
+          event.model_id === undefined
+        ) {
+          fetchBeepers();
+          return;
+        }
+        const modelId = event.model_id;
+        const newBeepers = event.unit_ids.map(
+          (id): SoldBeeper => ({
+            id,
+            model_id: modelId,
+            model_name: event.model_name ?? "",
+            purchase_timestamp: event.purchase_timestamp ?? "",
+            status: "active",
+            user_id: event.user_id,
+          })
+        );
+        setBeepers((prev) => {
+          const known = new Set(prev.map((b) => b.id));
+          return [...newBeepers.filter((b) => !known.has(b.id)), ...prev];
+        });
+      },
+      onUnitsActivated: (event) => {
+        if (event.truncated || !event.unit_ids) {
+          fetchBeepers();
+          return;
+        }
+        const activated = new Set(event.unit_ids);
+        setBeepers((prev) =>
+          prev.map(
+            (b): SoldBeeper =>
+              activated.has(b.id) ? { ...b, status: "activated" } : b
+          )
+        );
+      },
+      onReset: fetchBeepers,
+    });
+    return () => source?.close();
+  }, [operatorCredentials, fetchBeepers]);
+
   const handleSelectAllClick = (event: React.ChangeEvent<HTMLInputElement>) => {
     if (event.target.checked) {
       const newSelectedIds = filteredBeepers.map((n) => n.id);
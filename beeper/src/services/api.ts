@@ -4,9 +4,12 @@ import {
   ApiErrorResponse, // Type for what backend cart routes return
   ApiResponseMessage,
   AppAuthState, // For Operator login response
+  AuthTokens,
   BackendCartItem,
   BeeperModel,
   OperatorLoginApiResponse,
+  OpsUnitsActivatedEvent,
+  OpsUnitsPurchasedEvent,
   PurchaseApiResponse,
   SoldBeeper, // For credentials type
   UserLoginApiResponse,
@@ -14,47 +17,102 @@ import {
 } from "../types";
 
 const API_BASE_URL = "http://localhost:5001/api"; // Ensure this matches your backend port
+// Set VITE_OPS_EVENTS_URL when the event stream runs on its own server (python run.py --events-server)
+const OPS_EVENTS_URL: string =
+  import.meta.env.VITE_OPS_EVENTS_URL ?? `${API_BASE_URL}/ops/events`;
 
-const createBasicAuthHeader = (
-  credentials: AppAuthState["credentials"]
-): HeadersInit => {
-  if (
-    !credentials ||
-    !credentials.username ||
-    !credentials.password_plaintext
-  ) {
-    console.warn(
-      "Attempted to create auth header with incomplete credentials."
-    );
-    return {}; // Return empty, backend should reject with 401
+type Credentials = NonNullable<AppAuthState["credentials"]>;
+
+// App.tsx registers these: it stores refreshed tokens, and logs out when the refresh token is rejected
+export interface AuthSessionHandlers {
+  onTokensRefreshed: (credentials: Credentials) => void;
+  onSessionExpired: () => void;
+}
+
+let sessionHandlers: AuthSessionHandlers | null = null;
+
+export const setAuthSessionHandlers = (
+  handlers: AuthSessionHandlers | null
+): void => {
+  sessionHandlers = handlers;
+};
+
+// Builds the credentials kept in app state from a login or refresh response
+export const credentialsFromTokens = (
+  username: string,
+  tokens: AuthTokens
+): Credentials => ({
+  username,
+  access_token: tokens.access_token,
+  refresh_token: tokens.refresh_token,
+  access_token_expires_at: Date.now() + tokens.expires_in * 1000,
+});
+
+// Requests that get a 401 at the same time share one refresh call
+const pendingRefreshes = new Map<string, Promise<Credentials | null>>();
+
+// Exchanges the refresh token for a new token pair. Resolves to null (and ends the session)
+// if the refresh token was rejected, e.g. expired or revoked by a password change.
+export const refreshCredentials = (
+  credentials: Credentials
+): Promise<Credentials | null> => {
+  const pending = pendingRefreshes.get(credentials.refresh_token);
+  if (pending) {
+    return pending;
   }
-  return {
-    Authorization:
-      "Basic " +
-      btoa(`${credentials.username}:${credentials.password_plaintext}`),
-  };
+  const refresh = fetch(`${API_BASE_URL}/auth/refresh`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ refresh_token: credentials.refresh_token }),
+  })
+    .then(async (response) => {
+      if (!response.ok) {
+        sessionHandlers?.onSessionExpired();
+        return null;
+      }
+      const tokens = (await response.json()) as AuthTokens;
+      const refreshed = credentialsFromTokens(credentials.username, tokens);
+      sessionHandlers?.onTokensRefreshed(refreshed);
+      return refreshed;
+    })
+    .finally(() => pendingRefreshes.delete(credentials.refresh_token));
+  pendingRefreshes.set(credentials.refresh_token, refresh);
+  return refresh;
 };
 
 const fetchApi = async <T>(
   endpoint: string,
   options: RequestInit = {},
-  authCredentials?: AppAuthState["credentials"] // Optional credentials for Basic Auth
+  authCredentials?: AppAuthState["credentials"] // Optional session tokens (sent as a Bearer token)
 ): Promise<T> => {
-  const headers: HeadersInit = {
-    "Content-Type": "application/json", // Default, can be overridden
-    ...options.headers,
+  const buildHeaders = (accessToken?: string): HeadersInit => {
+    const headers: HeadersInit = {
+      "Content-Type": "application/json", // Default, can be overridden
+      ...options.headers,
+    };
+    if (accessToken) {
+      Object.assign(headers, { Authorization: `Bearer ${accessToken}` });
+    }
+    return headers;
   };
 
-  if (authCredentials) {
-    Object.assign(headers, createBasicAuthHeader(authCredentials));
-  }
-
   try {
-    const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+    let response = await fetch(`${API_BASE_URL}${endpoint}`, {
       ...options,
-      headers,
+      headers: buildHeaders(authCredentials?.access_token),
     });
 
+    // Access tokens are short-lived; renew an expired one with the refresh token and retry once.
+    if (response.status === 401 && authCredentials) {
+      const refreshed = await refreshCredentials(authCredentials);
+      if (refreshed) {
+        response = await fetch(`${API_BASE_URL}${endpoint}`, {
+          ...options,
+          headers: buildHeaders(refreshed.access_token),
+        });
+      }
+    }
+
     if (!response.ok) {
       let errorPayload: ApiErrorResponse = {
         error: `HTTP error! Status: ${response.status} - ${response.statusText}`,
@@ -132,7 +190,7 @@ export const registerUser = (
     body: JSON.stringify({ username, email, password: password_plaintext }),
   });
 
-// --- User Cart API Calls (Requires User Basic Auth) ---
+// --- User Cart API Calls (Requires a user access token) ---
 export const getCart = (
   credentials: AppAuthState["credentials"]
 ): Promise<BackendCartItem[]> =>
@@ -166,6 +224,20 @@ export const updateCartItemQuantity = (
     credentials
   );
 
+// Sets several cart lines in one request (quantity 0 removes a line); resolves to the whole updated cart
+export const setCartQuantities = (
+  items: { model_id: number; quantity: number }[],
+  credentials: AppAuthState["credentials"]
+): Promise<BackendCartItem[]> =>
+  fetchApi<BackendCartItem[]>(
+    "/shop/cart",
+    {
+      method: "PUT",
+      body: JSON.stringify({ items }),
+    },
+    credentials
+  );
+
 export const removeFromCart = (
   modelId: number,
   credentials: AppAuthState["credentials"]
@@ -197,12 +269,53 @@ export const loginOperator = (
     body: JSON.stringify({ username, password: password_plaintext }),
   });
 
-// --- Operator Protected API Calls (Requires Operator Basic Auth) ---
+// --- Operator Protected API Calls (Requires an operator access token) ---
 export const getSoldBeepers = (
   credentials: AppAuthState["credentials"]
 ): Promise<SoldBeeper[]> =>
   fetchApi<SoldBeeper[]>("/ops/beepers", { method: "GET" }, credentials);
 
+export interface OpsEventHandlers {
+  onUnitsPurchased: (event: OpsUnitsPurchasedEvent) => void;
+  onUnitsActivated: (event: OpsUnitsActivatedEvent) => void;
+  onReset: () => void; // Missed events: re-fetch the full list
+}
+
+// EventSource cannot send headers, so the access token goes in the query string.
+// The browser reconnects by itself and resumes with Last-Event-ID. A 401 closes the stream
+// for good; once the token has expired it is refreshed, and the new credentials reopen it.
+export const openOpsEventStream = (
+  credentials: AppAuthState["credentials"],
+  handlers: OpsEventHandlers
+): EventSource | null => {
+  if (!credentials) {
+    return null;
+  }
+  const source = new EventSource(
+    `${OPS_EVENTS_URL}?access_token=${encodeURIComponent(
+      credentials.access_token
+    )}`
+  );
+  source.addEventListener("units_purchased", (e) =>
+    handlers.onUnitsPurchased(JSON.parse((e as MessageEvent).data))
+  );
+  source.addEventListener("units_activated", (e) =>
+    handlers.onUnitsActivated(JSON.parse((e as MessageEvent).data))
+  );
+  source.addEventListener("reset", () => handlers.onReset());
+  source.addEventListener("error", () => {
+    if (
+      source.readyState === EventSource.CLOSED &&
+      Date.now() >= credentials.access_token_expires_at
+    ) {
+      refreshCredentials(credentials).catch((error) =>
+        console.error("Could not refresh the access token:", error)
+      );
+    }
+  });
+  return source;
+};
+
 export const activateBeepers = (
   beeperIds: string[],
   credentials: AppAuthState["credentials"]
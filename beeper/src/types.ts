@@ -36,12 +36,20 @@ export interface OperatorData {
   username: string;
 }
 
+// Signed session tokens issued at login. The password itself is never kept after login:
+// an expired access token is renewed with the refresh token (see services/api.ts).
+export interface SessionCredentials {
+  username: string;
+  access_token: string;
+  refresh_token: string;
+  access_token_expires_at: number; // Milliseconds since the epoch
+}
+
 // Simplified Authentication State for App.tsx
 export interface AppAuthState {
   isAuthenticated: boolean;
   isLoading: boolean; // For async operations like login/register
-  // Store plaintext credentials for Basic Auth (ONLY FOR THIS SIMPLIFIED PROJECT)
-  credentials: { username: string; password_plaintext: string } | null;
+  credentials: SessionCredentials | null;
   role: "user" | "operator" | null;
   loggedInEntityDetails: UserData | OperatorData | null; // Details of the logged-in entity
 }
@@ -68,15 +76,23 @@ export interface BackendCartItem {
 
 export type SnackbarSeverity = "success" | "error" | "warning" | "info";
 
+// Signed session tokens returned by the login endpoints
+export interface AuthTokens {
+  access_token: string;
+  refresh_token: string;
+  token_type: "Bearer";
+  expires_in: number; // Access token lifetime in seconds
+}
+
 // Specific type for the response from user login API
-export interface UserLoginApiResponse {
+export interface UserLoginApiResponse extends AuthTokens {
   message: string;
   user: UserData;
   role: "user"; // Backend confirms the role
 }
 
 // Specific type for the response from operator login API
-export interface OperatorLoginApiResponse {
+export interface OperatorLoginApiResponse extends AuthTokens {
   message: string;
   operator: OperatorData;
   role: "operator"; // Backend confirms the role
@@ -95,9 +111,29 @@ export interface ActivateBeepersApiResponse {
   errors: string[] | null;
 }
 
+// Server-Sent Events from /api/ops/events (deltas for the Ops Center table)
+export interface OpsUnitsPurchasedEvent {
+  user_id: number;
+  purchase_timestamp: string | null;
+  model_id?: number;
+  model_name?: string | null;
+  unit_ids?: string[];
+  count?: number; // Set with `truncated` when the purchase was too large to list
+  truncated?: boolean;
+}
+
+export interface OpsUnitsActivatedEvent {
+  status: "activated";
+  unit_ids?: string[];
+  count?: number;
+  truncated?: boolean;
+}
+
 // Specific type for purchase API response
 export interface PurchaseApiResponse {
   message: string;
-  items_purchased_count?: number; // Example, adjust to actual backend response
-  purchased_beepers?: SoldBeeper[];
+  items_purchased_count: number; // Number of cart lines purchased
+  units_purchased_count: number; // Number of individual beeper units created
+  purchase_timestamp: string | null;
+  purchased_unit_ids: string[];
 }